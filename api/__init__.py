@@ -1,11 +1,15 @@
 # src/api/__init__.py
 from .qp_gen_routes import router as qp_router
 from .evaluation_routes import evaluation_router
+from .metrics_routes import metrics_router
+from .admin_routes import admin_router
 from .error_handlers import add_error_handlers
 
 __all__ = [
     "qp_router",
     "evaluation_router",
+    "metrics_router",
+    "admin_router",
     "add_error_handlers"
 ]
 
@@ -0,0 +1,87 @@
+# src/api/admin_routes.py
+import asyncio
+from typing import Any, Dict, List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from config.settings import settings
+from utils.flight_recorder import flight_recorder
+from utils.profiling import request_profiler
+from utils.validators import validate_admin_token
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject requests without a valid X-Admin-Token header."""
+    if not validate_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=403,
+            detail={
+                "message": "Admin access required",
+                "details": ["Send a valid X-Admin-Token header; admin endpoints are disabled when ADMIN_TOKEN is unset"]
+            }
+        )
+
+
+admin_router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)]
+)
+
+def _profile_not_found(profile_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail={"message": "Profile not found", "details": [profile_id]}
+    )
+
+@admin_router.get("/profiles", response_model=List[Dict[str, Any]])
+async def list_profiles():
+    """
+    List stored request profiles, newest first.
+
+    Profile a request by sending it with ``X-Profile: true`` and a valid
+    ``X-Admin-Token``; its id comes back in the ``X-Profile-ID`` header.
+    """
+    return await asyncio.to_thread(request_profiler.list)
+
+@admin_router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: Literal["text", "pstats"] = Query("text"),
+    sort: Literal["cumulative", "tottime", "calls"] = Query("cumulative"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """
+    Get a request profile.
+
+    ``format=text`` returns the top functions as pstats text; ``format=pstats``
+    downloads the raw profile for snakeviz, gprof2dot or ``python -m pstats``.
+    """
+    if format == "pstats":
+        path = request_profiler.path(profile_id)
+        if path is None:
+            raise _profile_not_found(profile_id)
+        return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+    summary = await asyncio.to_thread(request_profiler.summary, profile_id, sort, limit)
+    if summary is None:
+        raise _profile_not_found(profile_id)
+    return PlainTextResponse(summary)
+
+@admin_router.get("/flight-recorder", response_model=Dict[str, Any])
+async def dump_flight_recorder(
+    limit: int = Query(100, ge=1, le=settings.FLIGHT_RECORDER_SIZE),
+    slow_only: bool = Query(False)
+):
+    """
+    Dump this worker's flight recorder, newest first.
+
+    Each entry is one finished request or background job with its per-stage
+    timings, LLM calls per task (queue wait, inference, load time and tokens)
+    with the slowest calls, and request and response sizes. Full traces of
+    requests over the slow threshold are in the slow-request log.
+    """
+    return {
+        "slow_threshold_ms": settings.SLOW_REQUEST_THRESHOLD_MS,
+        "slow_request_log": str(settings.SLOW_REQUEST_LOG_FILE),
+        "entries": flight_recorder.dump(limit, slow_only)
+    }
@@ -1,15 +1,29 @@
 # src/api/evaluation_routes.py
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Literal
 from datetime import datetime
+from pydantic import TypeAdapter, ValidationError as PydanticValidationError
+from starlette.background import BackgroundTask
+import json
+import shutil
 
 from models.evaluation_models import (
+    AnswerKeyItem,
     AnswersEvaluationRequest,
-    EvaluationResult
+    EvaluationMode,
+    EvaluationResult,
+    GroupedEvaluationRequest
 )
+from models.job_models import JobResponse
 from services.evaluation_services import EvaluationService
-from utils.exceptions import ValidationError, LLMServiceError
+from services.bulk_evaluation_service import BulkEvaluationService
+from services.answer_sheet_service import AnswerSheetService
+from services.job_service import job_service
+from utils.exceptions import ValidationError, LLMServiceError, PayloadTooLargeError
 from utils.logger import logger, log_async_function_call
+from utils.tracing import tracer
 
 # Create router with prefix
 evaluation_router = APIRouter(
@@ -19,7 +33,10 @@ evaluation_router = APIRouter(
 
 @evaluation_router.post("/evaluate-answers", response_model=Dict[str, Any])
 @log_async_function_call
-async def evaluate_answers(request: AnswersEvaluationRequest):
+async def evaluate_answers(
+    request: AnswersEvaluationRequest,
+    include_trace: bool = Query(False, description="Add the per-stage timing breakdown to metadata.trace")
+):
     """
     Evaluate student answers against expected answers using few-shot prompting.
     
@@ -27,6 +44,7 @@ async def evaluate_answers(request: AnswersEvaluationRequest):
         request (AnswersEvaluationRequest): Contains:
             - number_of_pairs: Number of answer pairs to evaluate
             - answer_pairs: List of expected and student answer pairs
+        include_trace: Whether to return the request's timing breakdown
             
     Returns:
         Dict containing:
@@ -47,6 +65,8 @@ async def evaluate_answers(request: AnswersEvaluationRequest):
         
         evaluation_service = EvaluationService()
         result = await evaluation_service.evaluate_answers(request)
+        if include_trace:
+            result["metadata"]["trace"] = tracer.breakdown()
         
         logger.info("Successfully completed answer evaluation", {
             "successful_evaluations": result["metadata"]["successful_evaluations"],
@@ -99,6 +119,256 @@ async def evaluate_answers(request: AnswersEvaluationRequest):
             "timestamp": datetime.utcnow().isoformat()
         })
 
+@evaluation_router.post("/evaluate-groups", response_model=Dict[str, Any])
+@log_async_function_call
+async def evaluate_groups(
+    request: GroupedEvaluationRequest,
+    include_trace: bool = Query(False, description="Add the per-stage timing breakdown to metadata.trace")
+):
+    """
+    Evaluate many student answers against each key answer.
+
+    Use this when a class answers the same questions: each key answer is sent once
+    with all of its student answers, and key-specific work (normalization, keyword
+    rubric, prompt prefix, embedding) is done once per key.
+
+    Raises:
+        HTTPException:
+            - 400: For validation errors
+            - 503: For LLM service errors
+            - 500: For unexpected errors
+    """
+    try:
+        logger.info("Received grouped answer evaluation request", {
+            "groups": len(request.groups),
+            "number_of_pairs": sum(len(g.student_answers) for g in request.groups),
+            "endpoint": "/evaluate-groups"
+        })
+        result = await EvaluationService().evaluate_groups(request)
+        if include_trace:
+            result["metadata"]["trace"] = tracer.breakdown()
+        return result
+
+    except ValidationError as e:
+        logger.error("Validation error in grouped answer evaluation", {
+            "error": str(e),
+            "details": e.details if hasattr(e, 'details') else None
+        })
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Invalid request parameters",
+                "details": e.details if hasattr(e, 'details') else [str(e)]
+            }
+        )
+
+    except LLMServiceError as e:
+        logger.error("LLM service error in grouped answer evaluation", {
+            "error": str(e)
+        })
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "message": "Answer evaluation service temporarily unavailable",
+                "details": [str(e)]
+            }
+        )
+
+    except Exception as e:
+        logger.error("Unexpected error in grouped answer evaluation", {
+            "error": str(e),
+            "error_type": type(e).__name__
+        })
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "message": "Internal server error",
+                "details": ["An unexpected error occurred"]
+            }
+        )
+
+@evaluation_router.post("/evaluate-answers/stream")
+async def evaluate_answers_stream(
+    request: AnswersEvaluationRequest,
+    format: Literal["ndjson", "sse"] = Query("ndjson", description="Stream format")
+):
+    """
+    Evaluate student answers and stream each result as soon as it is scored.
+
+    Each pair produces one ``result`` record (in completion order, with its
+    ``pair_index``), followed by a final ``summary`` record carrying the same
+    metadata as /evaluate-answers. Records are NDJSON lines by default, or
+    Server-Sent Events with ``format=sse``.
+
+    Raises:
+        HTTPException:
+            - 400: For validation errors
+    """
+    logger.info("Received streamed answer evaluation request", {
+        "number_of_pairs": request.number_of_pairs,
+        "endpoint": "/evaluate-answers/stream",
+        "format": format
+    })
+
+    try:
+        records = EvaluationService().stream_answers(request)
+    except ValidationError as e:
+        logger.error("Validation error in streamed answer evaluation", {
+            "error": str(e),
+            "details": e.details if hasattr(e, 'details') else None
+        })
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Invalid request parameters",
+                "details": e.details if hasattr(e, 'details') else [str(e)]
+            }
+        )
+
+    async def stream():
+        async for record in records:
+            if format == "sse":
+                yield f"event: {record['event']}\ndata: {json.dumps(record)}\n\n"
+            else:
+                yield json.dumps(record) + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type)
+
+async def _run_bulk_evaluation_job(payload: Dict[str, Any], progress: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Job handler that grades an uploaded answer file in the background."""
+    return await BulkEvaluationService().run(payload, progress)
+
+job_service.register_handler("bulk_evaluation", _run_bulk_evaluation_job)
+
+def _get_bulk_job(job_id: str) -> JobResponse:
+    job = job_service.get(job_id)
+    if job is None or job.kind != "bulk_evaluation":
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "Job not found", "details": [job_id]}
+        )
+    return job
+
+@evaluation_router.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_bulk_evaluation(
+    file: UploadFile = File(..., description="CSV or JSONL file of answer pairs"),
+    mode: EvaluationMode = Form(EvaluationMode.SINGLE)
+):
+    """
+    Queue an answer file for background grading.
+
+    CSV files need ``expected_answer`` and ``student_answer`` columns and may have
+    ``id`` and ``keywords`` (separated by ';') columns; JSONL files hold one object
+    per line with the same fields. Poll ``GET /evaluation/jobs/{job_id}`` for
+    progress and download results from ``GET /evaluation/jobs/{job_id}/results``.
+    """
+    try:
+        payload = await BulkEvaluationService().store_upload(file, mode)
+    except ValidationError as e:
+        logger.error("Validation error in bulk evaluation upload", {
+            "error": str(e),
+            "filename": file.filename
+        })
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Invalid upload",
+                "details": e.details if hasattr(e, 'details') else [str(e)]
+            }
+        )
+    return job_service.submit("bulk_evaluation", payload)
+
+@evaluation_router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_bulk_evaluation(job_id: str):
+    """
+    Get the status and progress of a bulk grading job.
+    """
+    return _get_bulk_job(job_id)
+
+@evaluation_router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_bulk_evaluation(job_id: str):
+    """
+    Cancel a queued or running bulk grading job.
+    """
+    _get_bulk_job(job_id)
+    return job_service.cancel(job_id)
+
+@evaluation_router.get("/jobs/{job_id}/results")
+async def download_bulk_evaluation(job_id: str):
+    """
+    Download the JSONL results of a bulk grading job.
+
+    Rows graded so far are available while the job is still running.
+    """
+    job = _get_bulk_job(job_id)
+    output_path = Path(job_service.get_payload(job_id)["output_path"])
+    if not output_path.exists():
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "No results yet", "details": [job.status.value]}
+        )
+    return FileResponse(
+        output_path,
+        media_type="application/x-ndjson",
+        filename=f"evaluation-{job_id}.jsonl"
+    )
+
+@evaluation_router.post("/answer-sheets")
+async def evaluate_answer_sheets(
+    files: List[UploadFile] = File(..., description="One scanned image or PDF per student"),
+    answer_key: str = Form(..., description='JSON list of {"question_number", "expected_answer", "keywords"}'),
+    mode: EvaluationMode = Form(EvaluationMode.SINGLE)
+):
+    """
+    Transcribe and grade handwritten answer sheets.
+
+    Sheets go through a rasterize, normalize, extract and grade pipeline whose
+    stages run concurrently. The response is streamed as NDJSON: one ``result``
+    line per sheet as soon as it is graded (with its ``index`` in the upload),
+    then a final ``summary`` line with per-stage busy time.
+    """
+    try:
+        key = TypeAdapter(List[AnswerKeyItem]).validate_json(answer_key)
+        if not key:
+            raise ValidationError("Answer key is empty", ["Provide at least one question"])
+        service = AnswerSheetService()
+        work_dir, sheets = await service.store_uploads(files)
+    except PayloadTooLargeError as e:
+        logger.error("Answer sheet upload too large", {"error": str(e)})
+        raise HTTPException(
+            status_code=413,
+            detail={"message": e.message, "details": e.details}
+        )
+    except (ValidationError, PydanticValidationError) as e:
+        details = (
+            [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()]
+            if isinstance(e, PydanticValidationError)
+            else e.details or [str(e)]
+        )
+        logger.error("Validation error in answer sheet upload", {"error": str(e)})
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Invalid request parameters", "details": details}
+        )
+
+    logger.info("Received answer sheet evaluation request", {
+        "sheets": len(sheets),
+        "questions": len(key),
+        "endpoint": "/answer-sheets"
+    })
+
+    async def stream():
+        async for record in service.process_sheets(sheets, key, mode):
+            yield json.dumps(record) + "\n"
+
+    # Runs once the response ends, even if the client disconnects before the body starts
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(shutil.rmtree, work_dir, ignore_errors=True)
+    )
+
 # You would include this router in your main.py like this:
 """
 # src/main.py
@@ -0,0 +1,54 @@
+# src/api/metrics_routes.py
+import asyncio
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from api.admin_routes import require_admin
+from services.llm_scheduler import llm_scheduler
+from utils.metrics import metrics
+from utils.tracing import trace_buffer
+
+metrics_router = APIRouter(tags=["metrics"])
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Expose metrics in the Prometheus text format.
+
+    Merges the snapshots of every live worker, so any worker can serve the scrape.
+    """
+    body = await asyncio.to_thread(metrics.render, snapshot=metrics.snapshot())
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+@metrics_router.get("/traces", response_model=List[Dict[str, Any]], dependencies=[Depends(require_admin)])
+async def list_traces(limit: int = Query(50, ge=1, le=1000)):
+    """
+    List the most recent finished traces of this worker, newest first.
+
+    Each entry has the trace id, name, duration and status; fetch
+    ``/traces/{trace_id}`` for its spans. Requires ``X-Admin-Token``.
+    """
+    return trace_buffer.recent(limit)
+
+@metrics_router.get("/traces/{trace_id}", response_model=Dict[str, Any], dependencies=[Depends(require_admin)])
+async def get_trace(trace_id: str):
+    """
+    Get a finished trace with all of its spans. Requires ``X-Admin-Token``.
+    """
+    trace = trace_buffer.get(trace_id)
+    if trace is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "Trace not found", "details": [trace_id]}
+        )
+    return trace
+
+@metrics_router.get("/llm/status", response_model=Dict[str, Any], dependencies=[Depends(require_admin)])
+async def get_llm_status():
+    """
+    Get this worker's LLM queue state and per-model usage since start.
+
+    Usage includes call and cold-load counts, prompt and generated tokens, and
+    Ollama's prompt-evaluation, decode and load times. Requires ``X-Admin-Token``.
+    """
+    return llm_scheduler.status()
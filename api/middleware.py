@@ -1,55 +1,266 @@
 # src/api/middleware.py
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from utils.logger import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config.settings import settings
+from utils.logger import log_route_var, logger, request_id_var
+from utils.metrics import metrics
+from utils.profiling import request_profiler
+from utils.tracing import tracer
+from utils.validators import validate_admin_token
+import asyncio
+import random
+import re
 import time
-import json
-from typing import Callable
-
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable):
-        start_time = time.time()
-        request_id = request.headers.get('X-Request-ID', str(time.time()))
-        
-        # Log request
-        logger.info("Incoming request", {
-            "request_id": request_id,
-            "method": request.method,
-            "url": str(request.url),
-            "client_ip": request.client.host,
-            "headers": dict(request.headers)
-        })
+import uuid
+from typing import Dict
 
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+_TEXT_CONTENT_TYPES = {"application/json", "application/x-www-form-urlencoded", "text/plain"}
+_REDACT_HEADERS = {"authorization", "proxy-authorization", "cookie", "x-api-key"} | {
+    key.lower() for key in settings.LOG_REDACT_KEYS
+}
+_REDACT_BODY = re.compile(
+    r'("(?:' + "|".join(re.escape(key) for key in settings.LOG_REDACT_KEYS) + r')"\s*:\s*)"[^"]*"?',
+    re.IGNORECASE
+)
+
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI middleware that logs one line per request with its timing.
+
+    Request and response bodies stream through untouched; only their sizes are
+    counted. For a sample of requests (REQUEST_LOG_SAMPLE_RATE) the line also
+    carries the headers, with credentials masked, and a preview of at most
+    REQUEST_LOG_BODY_PREVIEW_BYTES of a text body, captured as it streams by.
+
+    The request id is taken from a well-formed ``X-Request-ID`` header or
+    generated, echoed in the response, stored as ``request.state.request_id``,
+    added to every log record written while the request runs and set on the
+    request's trace.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @staticmethod
+    def _request_id(headers: Dict[str, str]) -> str:
+        request_id = headers.get("x-request-id", "")
+        return request_id if _REQUEST_ID.match(request_id) else uuid.uuid4().hex
+
+    @staticmethod
+    def _preview(body: bytearray, total: int) -> str:
+        text = _REDACT_BODY.sub(r'\1"***"', body.decode("utf-8", errors="replace"))
+        return text + (f"...(+{total - len(body)} bytes)" if total > len(body) else "")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+        request_id = self._request_id(headers)
+        scope.setdefault("state", {})["request_id"] = request_id
+        span = tracer.current_span()
+        if span is not None:
+            span.set(request_id=request_id)
+
+        rate = settings.REQUEST_LOG_SAMPLE_RATE
+        sampled = rate >= 1 or random.random() < rate
+        capture = sampled and headers.get("content-type", "").split(";")[0].strip() in _TEXT_CONTENT_TYPES
+        limit = settings.REQUEST_LOG_BODY_PREVIEW_BYTES
+        preview = bytearray()
+        sizes = {"request": 0, "response": 0, "status": 500}
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                sizes["request"] += len(body)
+                if capture and len(preview) < limit:
+                    preview.extend(body[:limit - len(preview)])
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                sizes["status"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            elif message["type"] == "http.response.body":
+                sizes["response"] += len(message.get("body", b""))
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        # MetricsMiddleware sets the route below us; set it here too so the
+        # request line itself follows the route's log rate limit rules
+        route_token = log_route_var.set(scope["path"])
         try:
-            # Get request body
-            body = await request.body()
-            if body:
-                try:
-                    body_json = json.loads(body)
-                    logger.info("Request body", {
-                        "request_id": request_id,
-                        "body": body_json
-                    })
-                except json.JSONDecodeError:
-                    pass
-
-            response = await call_next(request)
-            
-            # Log response
-            process_time = time.time() - start_time
-            logger.info("Request completed", {
-                "request_id": request_id,
-                "status_code": response.status_code,
-                "process_time_ms": round(process_time * 1000, 2)
-            })
-            
-            return response
-            
+            await self.app(scope, receive_wrapper, send_wrapper)
         except Exception as e:
-            process_time = time.time() - start_time
             logger.error("Request failed", {
-                "request_id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
                 "error": str(e),
-                "process_time_ms": round(process_time * 1000, 2)
+                "error_type": type(e).__name__,
+                "process_time_ms": round((time.perf_counter() - started_at) * 1000, 2)
             })
-            raise
\ No newline at end of file
+            raise
+        else:
+            details = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "client_ip": scope["client"][0] if scope.get("client") else None,
+                "status_code": sizes["status"],
+                "request_bytes": sizes["request"],
+                "response_bytes": sizes["response"],
+                "process_time_ms": round((time.perf_counter() - started_at) * 1000, 2)
+            }
+            if sampled:
+                details["headers"] = {
+                    key: "***" if key in _REDACT_HEADERS else value
+                    for key, value in headers.items()
+                }
+                if preview:
+                    details["body_preview"] = self._preview(preview, sizes["request"])
+            logger.info("Request completed", details)
+        finally:
+            request_id_var.reset(token)
+            log_route_var.reset(route_token)
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that records request latency per route template.
+
+    Routes are labelled by their path template (``/qp-generation/jobs/{job_id}``)
+    and handler name, so label cardinality stays bounded; unmatched paths share
+    one label. It is always installed, so it also sets the log route used by the
+    per-route log rate limit rules.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        route_token = log_route_var.set(scope["path"])
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            log_route_var.reset(route_token)
+            # Some FastAPI versions expose the route without its include prefix,
+            # so the handler name is recorded too to keep series unambiguous
+            route = scope.get("route")
+            labels = {
+                "method": scope["method"],
+                "route": getattr(route, "path", None) or "<unmatched>",
+                "handler": getattr(route, "name", None) or "<unmatched>"
+            }
+            metrics.observe("http_request_duration_seconds", time.perf_counter() - started_at, **labels)
+            metrics.inc("http_requests_total", status=str(status["code"]), **labels)
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware that runs each HTTP request inside its own trace.
+
+    Spans opened anywhere below (routes, services, LLM calls) attach to the
+    request's trace through context variables. The root span records the
+    status and request and response sizes. The trace id is returned in the
+    ``X-Trace-ID`` header and the finished trace is kept by the trace exporters.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with tracer.trace(f"{scope['method']} {scope['path']}", method=scope["method"], path=scope["path"]) as root:
+            trace_id = tracer.current_trace().trace_id
+            sizes = {"request_bytes": 0, "response_bytes": 0}
+
+            async def receive_wrapper() -> Message:
+                message = await receive()
+                if message["type"] == "http.request":
+                    sizes["request_bytes"] += len(message.get("body", b""))
+                return message
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    root.set(status_code=message["status"])
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace_id.encode("latin-1"))]
+                elif message["type"] == "http.response.body":
+                    sizes["response_bytes"] += len(message.get("body", b""))
+                await send(message)
+
+            try:
+                await self.app(scope, receive_wrapper, send_wrapper)
+            finally:
+                root.set(**sizes)
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    root.set(route=route)
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that runs selected requests under cProfile.
+
+    A request is profiled when it sends ``X-Profile: true`` with a valid
+    ``X-Admin-Token``, or every request when PROFILE_REQUESTS is set. The
+    profile id is returned in ``X-Profile-ID`` and the profile can be fetched
+    from the admin endpoints. While another request is being profiled the
+    request runs normally and gets ``X-Profile-Status: busy``.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        requested = settings.PROFILE_REQUESTS or (
+            headers.get(b"x-profile", b"").lower() in (b"1", b"true")
+            and validate_admin_token(headers.get(b"x-admin-token", b"").decode("latin-1"))
+        )
+        if not requested:
+            await self.app(scope, receive, send)
+            return
+
+        profile = request_profiler.start()
+        profile_id = request_profiler.new_id() if profile else None
+        status = {"code": 500}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                extra = [(b"x-profile-id", profile_id.encode("latin-1"))] if profile_id else [(b"x-profile-status", b"busy")]
+                message["headers"] = list(message.get("headers", [])) + extra
+            await send(message)
+
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profile is not None:
+                request_profiler.stop(profile)
+                details = {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "request_id": scope.get("state", {}).get("request_id"),
+                    "status_code": status["code"],
+                    "duration_ms": round((time.perf_counter() - started_at) * 1000, 2)
+                }
+                try:
+                    await asyncio.to_thread(request_profiler.save, profile_id, profile, details)
+                    logger.info("Request profiled", {"profile_id": profile_id, **details})
+                except OSError as e:
+                    logger.error("Failed to save request profile", {"profile_id": profile_id, "error": str(e)})
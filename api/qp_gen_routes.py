@@ -1,11 +1,19 @@
 # src/api/routes.py
 
-from fastapi import APIRouter, HTTPException, Depends, Header
-from typing import Dict, Any
-from models.question_models import QuestionRequest, QuestionResponse
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, Callable
+from config.settings import settings
+from models.question_models import QuestionRequest, QuestionResponse, BatchQuestionRequest
+from models.job_models import JobResponse
 from services.question_service import QuestionService
+from services.job_service import job_service
+from services.batch_service import BatchGenerationService
 from utils.exceptions import QuestionGenerationError, ValidationError
 from utils.logger import logger, log_async_function_call
+from utils.tracing import tracer
 from utils.validators import validate_request
 
 
@@ -16,7 +24,10 @@ router = APIRouter(
 
 @router.post("/generate-questions", response_model=QuestionResponse)
 @log_async_function_call
-async def generate_questions(request: QuestionRequest):
+async def generate_questions(
+    request: QuestionRequest,
+    include_trace: bool = Query(False, description="Add the per-stage timing breakdown to metadata.trace")
+):
     """
     Generate questions based on indexed chapter content.
     
@@ -30,6 +41,7 @@ async def generate_questions(request: QuestionRequest):
             - question_type: Type of questions to generate
             - num_questions: Number of questions to generate
             - difficulty_level: Difficulty level of questions
+        include_trace: Whether to return the request's timing breakdown
             
     Returns:
         QuestionResponse containing generated questions and metadata
@@ -41,7 +53,12 @@ async def generate_questions(request: QuestionRequest):
         })
 
         question_service = QuestionService()
-        result = await question_service.generate_questions(request)
+        result = await asyncio.wait_for(
+            question_service.generate_questions(request),
+            timeout=settings.REQUEST_TIMEOUT
+        )
+        if include_trace:
+            result.metadata["trace"] = tracer.breakdown()
         
         logger.info("Successfully generated questions", {
             "question_count": len(result.questions),
@@ -64,6 +81,22 @@ async def generate_questions(request: QuestionRequest):
             }
         )
         
+    except asyncio.TimeoutError:
+        logger.error("Question generation timed out", {
+            "timeout_seconds": settings.REQUEST_TIMEOUT,
+            "request_id": request.request_id
+        })
+        raise HTTPException(
+            status_code=504,
+            detail={
+                "message": "Question generation timed out",
+                "details": [
+                    f"Generation exceeded {settings.REQUEST_TIMEOUT}s; "
+                    "submit long papers through /qp-generation/jobs instead"
+                ]
+            }
+        )
+        
     except QuestionGenerationError as e:
         logger.error("Question generation error", {
             "error": str(e),
@@ -91,6 +124,108 @@ async def generate_questions(request: QuestionRequest):
             }
         )
 
+async def _run_question_job(payload: Dict[str, Any], progress: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Job handler that generates a full paper in the background."""
+    request = QuestionRequest(**payload)
+    result = await QuestionService().generate_questions(request, progress_callback=progress)
+    return result.model_dump(mode="json")
+
+job_service.register_handler("question_paper", _run_question_job)
+
+@router.post("/plan", response_model=Dict[str, Any])
+async def plan_generation(request: QuestionRequest):
+    """
+    Dry-run a generation request without calling the LLM.
+
+    Returns the type x difficulty allocation and the buckets that a real run
+    would generate, one LLM call per bucket.
+    """
+    try:
+        question_service = QuestionService()
+        allocation = question_service.plan_allocation(request)
+        buckets = question_service.plan_buckets(request)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Invalid request parameters",
+                "details": e.details if hasattr(e, 'details') else [str(e)]
+            }
+        )
+
+    return {
+        "request_id": request.request_id,
+        "total_questions": request.question_distribution.total_questions(),
+        "allocation": allocation,
+        "buckets": [
+            {"type": q_type, "difficulty": difficulty, "count": count}
+            for q_type, difficulty, count in buckets
+        ],
+        "llm_calls": len(buckets)
+    }
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_generation_job(request: QuestionRequest):
+    """
+    Queue a question paper for background generation.
+
+    Returns immediately with a job id; poll ``GET /qp-generation/jobs/{job_id}``
+    for status, per-bucket progress and the final result.
+    """
+    logger.info("Received question generation job", {
+        "request_id": request.request_id,
+        "chapter": request.chapter,
+        "subject": request.subject
+    })
+    return job_service.submit("question_paper", request.model_dump(mode="json"))
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_generation_job(job_id: str):
+    """
+    Get the status, progress and result of a generation job.
+    """
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "Job not found", "details": [job_id]}
+        )
+    return job
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_generation_job(job_id: str):
+    """
+    Cancel a queued or running generation job.
+    """
+    job = job_service.cancel(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "Job not found", "details": [job_id]}
+        )
+    return job
+
+@router.post("/batch")
+async def generate_batch(request: BatchQuestionRequest):
+    """
+    Generate papers for many requests in one call.
+
+    Chapter context is extracted once per distinct chapter and all bucket work is
+    scheduled through a single queue. The response is streamed as NDJSON: one
+    ``result`` line per request as soon as it finishes (in completion order, with
+    its ``index`` in the batch), then a final ``summary`` line.
+    """
+    logger.info("Received batch generation request", {
+        "requests": len(request.requests),
+        "endpoint": "/batch"
+    })
+
+    async def stream():
+        async for record in BatchGenerationService().generate_batch(request.requests):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @router.get("/health")
 async def health_check():
     """
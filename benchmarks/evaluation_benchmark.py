@@ -0,0 +1,154 @@
+# src/benchmarks/evaluation_benchmark.py
+"""
+Throughput and score-consistency benchmark for EvaluationService.
+
+Runs a fixed corpus of answer pairs with reference scores through every
+evaluation mode, twice per mode: once with empty caches (cold) and once right
+after (warm). For each run it reports pairs/sec, p50/p95 time-to-result per
+pair, cache hit ratio, which tier resolved the pairs, the mean absolute error
+against the reference scores and the score drift against the cold single-pair
+baseline.
+
+Usage (from the project root):
+    python -m benchmarks.evaluation_benchmark                      # stub backend
+    python -m benchmarks.evaluation_benchmark --backend ollama     # local model
+    python -m benchmarks.evaluation_benchmark --modes single,cascade --output report.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+from models.evaluation_models import AnswerPair, AnswersEvaluationRequest, EvaluationMode
+from services.evaluation_cache import evaluation_cache
+from services.evaluation_services import EvaluationService, get_key_context
+from services.llm_scheduler import llm_scheduler
+from benchmarks.stub_backend import StubOllamaClient
+
+CORPUS_PATH = Path(__file__).resolve().parent / "data" / "evaluation_corpus.jsonl"
+BASELINE = ("single", "cold")
+DRIFT_THRESHOLD = 10.0
+
+
+def load_corpus(path: Path) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def run_pass(corpus: List[Dict[str, Any]], mode: EvaluationMode) -> Dict[str, Any]:
+    """Stream the corpus through the service once and collect per-pair results."""
+    request = AnswersEvaluationRequest(
+        number_of_pairs=len(corpus),
+        answer_pairs=[
+            AnswerPair(
+                expected_answer=row["expected_answer"],
+                student_answer=row["student_answer"],
+                keywords=row.get("keywords")
+            )
+            for row in corpus
+        ],
+        mode=mode
+    )
+    cache_before = evaluation_cache.stats()
+    scores: List[Optional[float]] = [None] * len(corpus)
+    latencies: List[float] = []
+    metadata: Dict[str, Any] = {}
+
+    started_at = time.perf_counter()
+    async for record in EvaluationService().stream_answers(request):
+        if record["event"] == "result":
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            scores[record["pair_index"] - 1] = record["score"]
+        elif record["event"] == "summary":
+            metadata = record["metadata"]
+    wall_s = time.perf_counter() - started_at
+
+    cache_after = evaluation_cache.stats()
+    hits = cache_after["hits"] - cache_before["hits"]
+    lookups = hits + cache_after["misses"] - cache_before["misses"]
+    return {
+        "scores": scores,
+        "pairs": len(corpus),
+        "wall_s": round(wall_s, 3),
+        "pairs_per_sec": round(len(corpus) / wall_s, 2) if wall_s else 0,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "cache_hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        "tiers": metadata.get("timing", {}).get("tiers", {})
+    }
+
+
+def score_drift(scores: List[float], baseline: List[float]) -> Dict[str, float]:
+    diff = np.abs(np.asarray(scores, dtype=float) - np.asarray(baseline, dtype=float))
+    return {
+        "mean_abs": round(float(diff.mean()), 2),
+        "max_abs": round(float(diff.max()), 2),
+        "over_threshold": int((diff > DRIFT_THRESHOLD).sum())
+    }
+
+
+async def run_benchmark(corpus: List[Dict[str, Any]], modes: List[EvaluationMode]) -> List[Dict[str, Any]]:
+    references = [row["reference_score"] for row in corpus]
+    runs = []
+    for mode in modes:
+        evaluation_cache.reset()
+        get_key_context.cache_clear()
+        for phase in ("cold", "warm"):
+            run = await run_pass(corpus, mode)
+            run.update({
+                "mode": mode.value,
+                "phase": phase,
+                "mae_vs_reference": score_drift(run["scores"], references)["mean_abs"]
+            })
+            runs.append(run)
+
+    baseline = next((r for r in runs if (r["mode"], r["phase"]) == BASELINE), None)
+    for run in runs:
+        run["drift_vs_baseline"] = score_drift(run["scores"], baseline["scores"]) if baseline else None
+    return runs
+
+
+def print_report(runs: List[Dict[str, Any]], backend: str) -> None:
+    print(f"Backend: {backend}")
+    header = f"{'mode':<8} {'phase':<5} {'pairs/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'hit%':>6} {'MAE':>6} {'drift':>6} {'>10':>4}  tiers"
+    print(header)
+    print("-" * len(header))
+    for run in runs:
+        drift = run["drift_vs_baseline"] or {"mean_abs": float("nan"), "over_threshold": 0}
+        print(
+            f"{run['mode']:<8} {run['phase']:<5} {run['pairs_per_sec']:>8.2f} {run['p50_ms']:>9.1f} "
+            f"{run['p95_ms']:>9.1f} {run['cache_hit_ratio'] * 100:>6.1f} {run['mae_vs_reference']:>6.2f} "
+            f"{drift['mean_abs']:>6.2f} {drift['over_threshold']:>4}  "
+            + ", ".join(f"{tier}={count}" for tier, count in sorted(run["tiers"].items()))
+        )
+    print(f"MAE is against reference scores; drift is against the {'/'.join(BASELINE)} run.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark EvaluationService grading modes")
+    parser.add_argument("--backend", choices=["stub", "ollama"], default="stub")
+    parser.add_argument("--modes", default=",".join(m.value for m in EvaluationMode),
+                        help="Comma-separated evaluation modes to run")
+    parser.add_argument("--corpus", type=Path, default=CORPUS_PATH)
+    parser.add_argument("--stub-latency-ms", type=float, default=40.0,
+                        help="Simulated latency of one stub chat call")
+    parser.add_argument("--output", type=Path, help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    if args.backend == "stub":
+        llm_scheduler.client = StubOllamaClient(chat_latency_ms=args.stub_latency_ms)
+
+    corpus = load_corpus(args.corpus)
+    modes = [EvaluationMode(mode.strip()) for mode in args.modes.split(",")]
+    runs = asyncio.run(run_benchmark(corpus, modes))
+    print_report(runs, args.backend)
+
+    if args.output:
+        args.output.write_text(json.dumps({"backend": args.backend, "runs": runs}, indent=2))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# src/benchmarks/logging_benchmark.py
+"""
+Micro-benchmark for JSON log formatting.
+
+Compares the per-record cost of the previous behaviour (every handler formats
+the record again with the stdlib encoder) against the format-once formatter,
+with orjson when it is installed and with the stdlib fallback.
+
+Usage (from the project root):
+    python -m benchmarks.logging_benchmark --records 20000
+"""
+import argparse
+import importlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Callable, List
+from utils.logger import CustomJSONFormatter
+
+# utils re-exports a ``logger`` object that shadows the submodule attribute
+log_module = importlib.import_module("utils.logger")
+
+HANDLERS = 3
+
+
+def make_records(count: int) -> List[logging.LogRecord]:
+    records = []
+    for i in range(count):
+        record = logging.LogRecord("app", logging.INFO, __file__, 0, "Answer evaluation completed", (), None)
+        record.extra_data = {
+            "successful_evaluations": 8,
+            "average_score": 71.25,
+            "timing": {"wall_time_ms": 1834.2, "tiers": {"llm": 6, "cache": 2}},
+            "pair_index": i
+        }
+        records.append(record)
+    return records
+
+
+def legacy_format(record: logging.LogRecord) -> str:
+    return json.dumps({
+        "timestamp": datetime.utcnow().isoformat(),
+        "level": record.levelname,
+        "module": record.module,
+        "function": record.funcName,
+        "line": record.lineno,
+        "message": record.getMessage(),
+        "extra": record.extra_data
+    })
+
+
+def measure(records: List[logging.LogRecord], format_record: Callable[[logging.LogRecord], str]) -> float:
+    """Mean nanoseconds to format one record for every handler."""
+    started_at = time.perf_counter_ns()
+    for record in records:
+        for _ in range(HANDLERS):
+            format_record(record)
+    return (time.perf_counter_ns() - started_at) / len(records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JSON log formatting")
+    parser.add_argument("--records", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {"legacy (format per handler, json)": measure(make_records(args.records), legacy_format)}
+
+    orjson = log_module.orjson
+    if orjson is not None:
+        results["format once (orjson)"] = measure(make_records(args.records), CustomJSONFormatter().format)
+    log_module.orjson = None
+    try:
+        results["format once (json fallback)"] = measure(make_records(args.records), CustomJSONFormatter().format)
+    finally:
+        log_module.orjson = orjson
+
+    baseline = results["legacy (format per handler, json)"]
+    print(f"{args.records} records, {HANDLERS} handlers each")
+    for name, ns in results.items():
+        print(f"{name:<36} {ns / 1000:>8.2f} us/record  {baseline / ns:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 # src/config/settings.py
+import logging
 from pathlib import Path
+from pydantic import validator
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Any, Dict, List, Optional
 
 class Settings(BaseSettings):
     """Application settings and configuration."""
@@ -25,11 +27,82 @@ class Settings(BaseSettings):
     LLM_MODEL: str = "llama3.2-vision"
     MAX_RETRIES: int = 3
     REQUEST_TIMEOUT: int = 300
+    LLM_MAX_CONCURRENCY: int = 2
+    LLM_KEEP_ALIVE: str = "30m"
+    EMBEDDING_MODEL: str = "nomic-embed-text"
+    LLM_COLD_LOAD_THRESHOLD_MS: float = 500.0
 
     # Question Generation Settings
     MAX_QUESTIONS: int = 25
     MAX_LONG_DESCRIPTIVE: int = 10
+
+    # Duplicate Detection Settings
+    DEDUP_ENABLED: bool = True
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.8
+    DEDUP_NUM_PERMUTATIONS: int = 128
+    DEDUP_SHINGLE_SIZE: int = 5
+    DEDUP_MAX_REPLACEMENT_ROUNDS: int = 2
+    QUESTION_HISTORY_DIR: Path = BASE_DIR / "data" / "question_history"
     
+    # Answer Evaluation Settings
+    EVALUATION_MAX_CONCURRENCY: int = 4
+    EVALUATION_BATCH_MAX_PAIRS: int = 8
+    EVALUATION_CONTEXT_TOKENS: int = 8192
+    EVALUATION_OUTPUT_TOKENS_PER_PAIR: int = 150
+    CASCADE_ACCEPT_SIMILARITY: float = 0.92
+    CASCADE_REJECT_SIMILARITY: float = 0.35
+    CASCADE_ACCEPT_MIN_SCORE: float = 90.0
+    CASCADE_REJECT_MAX_SCORE: float = 10.0
+    RUBRIC_SKIP_LLM_SCORE: float = 90.0
+    EVALUATION_CACHE_ENABLED: bool = True
+    EVALUATION_CACHE_SIZE: int = 10000
+    EVALUATION_CACHE_DISK_ENABLED: bool = False
+    EVALUATION_CACHE_DB_PATH: Path = BASE_DIR / "data" / "evaluation_cache.db"
+    BULK_EVALUATION_DIR: Path = BASE_DIR / "data" / "bulk_evaluation"
+    BULK_EVALUATION_CHUNK_SIZE: int = 64
+    BULK_EVALUATION_MAX_UPLOAD_MB: int = 50
+
+    # Answer Sheet Ingestion Settings
+    ANSWER_SHEET_DPI: int = 200
+    ANSWER_SHEET_MAX_DIMENSION: int = 1600
+    ANSWER_SHEET_MAX_FILES: int = 100
+    ANSWER_SHEET_MAX_FILE_MB: int = 20
+    ANSWER_SHEET_MAX_TOTAL_MB: int = 200
+    ANSWER_SHEET_MAX_PAGES: int = 20
+    ANSWER_SHEET_QUEUE_SIZE: int = 4
+    ANSWER_SHEET_NORMALIZE_WORKERS: int = 2
+    ANSWER_SHEET_EXTRACT_WORKERS: int = 2
+    ANSWER_SHEET_GRADE_WORKERS: int = 2
+
+    # Background Job Settings
+    JOB_WORKERS: int = 2
+    JOB_TIMEOUT: int = 3600
+    JOB_CANCEL_POLL_INTERVAL: float = 1.0
+    JOB_DB_PATH: Path = BASE_DIR / "data" / "jobs.db"
+    BATCH_WORKERS: int = 2
+
+    # Metrics Settings
+    METRICS_DIR: Path = BASE_DIR / "data" / "metrics"
+    METRICS_SNAPSHOT_INTERVAL: float = 5.0
+    METRICS_LATENCY_BUCKETS: List[float] = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+
+    # Tracing Settings
+    TRACING_ENABLED: bool = True
+    TRACE_BUFFER_SIZE: int = 200
+    TRACE_MAX_SPANS: int = 2000
+    TRACE_FILE_ENABLED: bool = False
+    TRACE_FILE: Path = BASE_DIR / "logs" / "traces.jsonl"
+    FLIGHT_RECORDER_SIZE: int = 500
+    SLOW_REQUEST_THRESHOLD_MS: float = 30000.0
+    SLOW_REQUEST_LOG_FILE: Path = BASE_DIR / "logs" / "slow_requests.jsonl"
+    SLOW_REQUEST_LOG_MAX_MB: int = 50
+
+    # Admin and Profiling Settings
+    ADMIN_TOKEN: Optional[str] = None  # admin endpoints are disabled when unset
+    PROFILE_REQUESTS: bool = False  # profile every request, not just those asking for it
+    PROFILE_DIR: Path = BASE_DIR / "logs" / "profiles"
+    PROFILE_MAX_FILES: int = 50
+
     # Content Structure Settings
     SUPPORTED_LANGUAGES: List[str] = ["English"]
     SUPPORTED_ROLES: List[str] = ["Teacher", "Student"]
@@ -41,6 +114,33 @@ class Settings(BaseSettings):
     LOG_DIR: Path = BASE_DIR / "logs"
     LOG_FILE: Path = LOG_DIR / "app.log"
     ERROR_LOG_FILE: Path = LOG_DIR / "error.log"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_OVERFLOW: str = "drop_new"  # drop_new, drop_oldest or block
+    LOG_QUEUE_BLOCK_TIMEOUT: float = 0.05
+    LOG_CALL_SAMPLE_RATE: float = 1.0
+    LOG_ARG_MAX_LENGTH: int = 200
+    LOG_ARG_MAX_ITEMS: int = 10
+    LOG_REDACT_KEYS: List[str] = ["password", "token", "secret", "authorization", "api_key", "image_base64", "images"]
+    LOG_RATE_LIMIT_ENABLED: bool = True
+    # First matching rule applies; route is a glob over the request path or "job:<kind>"
+    LOG_RATE_LIMIT_RULES: List[Dict[str, Any]] = [
+        {"route": "*", "level": "INFO", "per_second": 5, "burst": 20}
+    ]
+    LOG_RATE_LIMIT_SUMMARY_INTERVAL: float = 60.0
+    REQUEST_LOG_ENABLED: bool = True
+    REQUEST_LOG_SAMPLE_RATE: float = 0.01
+    REQUEST_LOG_BODY_PREVIEW_BYTES: int = 512
+
+    @validator("LOG_RATE_LIMIT_RULES")
+    def validate_log_rate_limit_rules(cls, v):
+        for index, rule in enumerate(v):
+            level = rule.get("level", "INFO")
+            if not isinstance(logging.getLevelName(str(level).upper()), int):
+                raise ValueError(
+                    f"LOG_RATE_LIMIT_RULES[{index}] has unknown level {level!r}; "
+                    "use DEBUG, INFO, WARNING, ERROR or CRITICAL"
+                )
+        return v
     
     class Config:
         env_file = ".env"
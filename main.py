@@ -3,9 +3,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.qp_gen_routes import router as qp_router
 from api.evaluation_routes import evaluation_router
+from api.metrics_routes import metrics_router
+from api.admin_routes import admin_router
+from api.middleware import MetricsMiddleware, ProfilingMiddleware, RequestLoggingMiddleware, TracingMiddleware
 from api.error_handlers import add_error_handlers
 from config.settings import settings
+from services.job_service import job_service
 from utils.logger import logger
+from utils.metrics import metrics
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -22,6 +27,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+if settings.REQUEST_LOG_ENABLED:
+    app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(TracingMiddleware)
 
 # Define Prefix for all routes
 prefix = "/api/v1"
@@ -29,12 +39,16 @@ prefix = "/api/v1"
 # Add routes
 app.include_router(qp_router, prefix=prefix)
 app.include_router(evaluation_router,prefix=prefix)  
+app.include_router(admin_router, prefix=prefix)
+app.include_router(metrics_router)
 
 # Add error handlers
 add_error_handlers(app)
 
 @app.on_event("startup")
 async def startup_event():
+    await job_service.start()
+    metrics.start()
     logger.info("Starting Question Paper Generator API", {
         "version": settings.API_VERSION,
         "environment": settings.ENVIRONMENT,
@@ -47,6 +61,9 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Question Paper Generator API")
+    await job_service.stop()
+    await metrics.stop()
+    logger.shutdown()
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,11 +1,19 @@
 # src/models/evaluation_models.py
 from pydantic import BaseModel, Field, validator
-from typing import List
+from typing import List, Optional
 from datetime import datetime
+from enum import Enum
+
+class EvaluationMode(str, Enum):
+    SINGLE = "single"
+    BATCH = "batch"
+    CASCADE = "cascade"
+    RUBRIC = "rubric"
 
 class AnswerPair(BaseModel):
     expected_answer: str = Field(..., min_length=1)
     student_answer: str = Field(..., min_length=1)
+    keywords: Optional[List[str]] = None
 
     @validator('expected_answer', 'student_answer')
     def validate_answers(cls, v):
@@ -13,9 +21,28 @@ class AnswerPair(BaseModel):
             raise ValueError("Answer cannot be empty or whitespace")
         return v.strip()
 
+    @validator('keywords')
+    def validate_keywords(cls, v):
+        if v is None:
+            return v
+        keywords = [k.strip() for k in v if k and k.strip()]
+        return keywords or None
+
+class AnswerKeyItem(BaseModel):
+    question_number: int = Field(..., ge=1)
+    expected_answer: str = Field(..., min_length=1)
+    keywords: Optional[List[str]] = None
+
+    @validator('expected_answer')
+    def validate_expected_answer(cls, v):
+        if not v.strip():
+            raise ValueError("Answer cannot be empty or whitespace")
+        return v.strip()
+
 class AnswersEvaluationRequest(BaseModel):
     number_of_pairs: int = Field(..., gt=0)
     answer_pairs: List[AnswerPair]
+    mode: EvaluationMode = EvaluationMode.SINGLE
 
     @validator('answer_pairs')
     def validate_pairs(cls, v, values):
@@ -40,6 +67,44 @@ class AnswersEvaluationRequest(BaseModel):
             }
         }
 
+class AnswerGroup(BaseModel):
+    question_id: Optional[str] = None
+    expected_answer: str = Field(..., min_length=1)
+    keywords: Optional[List[str]] = None
+    student_answers: List[str] = Field(..., min_length=1)
+
+    @validator('expected_answer')
+    def validate_expected_answer(cls, v):
+        if not v.strip():
+            raise ValueError("Answer cannot be empty or whitespace")
+        return v.strip()
+
+    @validator('student_answers')
+    def validate_student_answers(cls, v):
+        if any(not answer.strip() for answer in v):
+            raise ValueError("Answer cannot be empty or whitespace")
+        return [answer.strip() for answer in v]
+
+class GroupedEvaluationRequest(BaseModel):
+    groups: List[AnswerGroup] = Field(..., min_length=1)
+    mode: EvaluationMode = EvaluationMode.SINGLE
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "groups": [
+                    {
+                        "question_id": "q1",
+                        "expected_answer": "Newton's First Law states that an object will remain at rest or in uniform motion unless acted upon by an external force.",
+                        "student_answers": [
+                            "Newton's First Law says things stay still or keep moving unless a force acts on them.",
+                            "An object keeps moving at the same speed unless something pushes or pulls it."
+                        ]
+                    }
+                ]
+            }
+        }
+
 class EvaluationResult(BaseModel):
     score: float = Field(..., ge=0, le=100)
     justification: str = Field(..., min_length=1)
@@ -0,0 +1,22 @@
+# src/models/job_models.py
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+from enum import Enum
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: JobStatus
+    progress: Dict[str, Any] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
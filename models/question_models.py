@@ -69,6 +69,7 @@ class QuestionRequest(BaseModel):
     question_distribution: QuestionDistribution
     difficulty_distribution: DifficultyDistribution
     topic: Optional[str] = None
+    avoid_history: bool = False
 
     @validator('difficulty_distribution')
     def validate_distribution_match(cls, v, values):
@@ -107,4 +108,7 @@ class QuestionResponse(BaseModel):
     title: str
     questions: List[Question]
     metadata: Dict[str, Any]
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class BatchQuestionRequest(BaseModel):
+    requests: List[QuestionRequest] = Field(..., min_length=1, max_length=100)
\ No newline at end of file
@@ -0,0 +1,403 @@
+# src/services/answer_sheet_service.py
+import asyncio
+import base64
+import io
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+from fastapi import UploadFile
+from PIL import Image, ImageOps, ImageSequence
+from config.settings import settings
+from models.evaluation_models import AnswerKeyItem, AnswerPair, EvaluationMode
+from services.evaluation_services import EvaluationService
+from services.llm_scheduler import llm_scheduler
+from utils.exceptions import ImageProcessingError, PayloadTooLargeError, ValidationError
+from utils.logger import logger
+from utils.prompts import ANSWER_SHEET_EXTRACTION_PROMPT
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp"}
+PDF_SUFFIXES = {".pdf"}
+
+
+class AnswerSheetService:
+    """
+    Grades scanned, handwritten answer sheets.
+
+    Every sheet (one uploaded image or PDF per student) moves through four stages
+    that run concurrently and are connected by bounded queues:
+
+    1. rasterize: split the file into page images, one page at a time
+    2. normalize: fix orientation, convert to grayscale, boost contrast and downscale
+    3. extract: transcribe the answers on each page with the vision model
+    4. grade: once all pages of a sheet are extracted, grade its answers against
+       the answer key with EvaluationService
+
+    A full queue blocks the stage feeding it, so memory stays bounded and the
+    pipeline runs at the pace of its slowest stage instead of the sum of all of them.
+    """
+    UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+    def __init__(self):
+        self.model = settings.LLM_MODEL
+        self.evaluation_service = EvaluationService()
+        self.queue_size = settings.ANSWER_SHEET_QUEUE_SIZE
+
+    async def store_uploads(self, uploads: List[UploadFile]) -> Tuple[Path, List[Tuple[str, Path]]]:
+        """
+        Copy uploaded sheets to a temporary directory the pipeline can read from.
+
+        Returns:
+            Tuple of (directory, [(filename, path)]); once the sheets are processed
+            the caller removes the directory, which is removed here if storing fails
+
+        Raises:
+            ValidationError: If there are too many files or a file type is unsupported
+            PayloadTooLargeError: If a file exceeds ANSWER_SHEET_MAX_FILE_MB or all
+                files together exceed ANSWER_SHEET_MAX_TOTAL_MB
+        """
+        if len(uploads) > settings.ANSWER_SHEET_MAX_FILES:
+            raise ValidationError(
+                "Too many answer sheets",
+                [f"Maximum is {settings.ANSWER_SHEET_MAX_FILES} files per request"]
+            )
+        unsupported = [
+            upload.filename for upload in uploads
+            if Path(upload.filename or "").suffix.lower() not in IMAGE_SUFFIXES | PDF_SUFFIXES
+        ]
+        if unsupported:
+            raise ValidationError(
+                "Unsupported answer sheet file type",
+                [f"{name}: supported types are images and PDF" for name in unsupported]
+            )
+
+        max_file_bytes = settings.ANSWER_SHEET_MAX_FILE_MB * 1024 * 1024
+        max_total_bytes = settings.ANSWER_SHEET_MAX_TOTAL_MB * 1024 * 1024
+        work_dir = Path(tempfile.mkdtemp(prefix="answer-sheets-"))
+        sheets = []
+        total = 0
+        try:
+            for index, upload in enumerate(uploads):
+                path = work_dir / f"{index}{Path(upload.filename).suffix.lower()}"
+                size = 0
+                with open(path, "wb") as f:
+                    while chunk := await upload.read(self.UPLOAD_CHUNK_BYTES):
+                        size += len(chunk)
+                        total += len(chunk)
+                        if size > max_file_bytes:
+                            raise PayloadTooLargeError(
+                                "Answer sheet is too large",
+                                [f"{upload.filename}: maximum size is {settings.ANSWER_SHEET_MAX_FILE_MB} MB per file"]
+                            )
+                        if total > max_total_bytes:
+                            raise PayloadTooLargeError(
+                                "Answer sheets are too large",
+                                [f"Maximum total size is {settings.ANSWER_SHEET_MAX_TOTAL_MB} MB per request"]
+                            )
+                        f.write(chunk)
+                sheets.append((upload.filename, path))
+        except BaseException:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        return work_dir, sheets
+
+    def _iter_pages(self, path: Path) -> Iterator[Image.Image]:
+        """
+        Yield page images of a sheet, rasterizing PDFs one page at a time.
+
+        Raises:
+            ValidationError: If the sheet has more than ANSWER_SHEET_MAX_PAGES pages
+        """
+        max_pages = settings.ANSWER_SHEET_MAX_PAGES
+        too_many_pages = ValidationError(f"Sheet has more than {max_pages} pages")
+        if path.suffix.lower() not in PDF_SUFFIXES:
+            with Image.open(path) as image:
+                # Multi-page TIFFs hold one page per frame
+                for page_number, frame in enumerate(ImageSequence.Iterator(image), 1):
+                    if page_number > max_pages:
+                        raise too_many_pages
+                    yield ImageOps.exif_transpose(frame)
+            return
+
+        # Needs the poppler utilities at runtime, so only imported for PDFs
+        from pdf2image import convert_from_path, pdfinfo_from_path
+
+        page_count = pdfinfo_from_path(str(path))["Pages"]
+        if page_count > max_pages:
+            raise too_many_pages
+        for page in range(1, page_count + 1):
+            yield convert_from_path(
+                str(path),
+                dpi=settings.ANSWER_SHEET_DPI,
+                first_page=page,
+                last_page=page
+            )[0]
+
+    @staticmethod
+    def normalize_page(image: Image.Image) -> str:
+        """
+        Prepare a page for the vision model.
+
+        Returns:
+            str: Base64-encoded PNG of the grayscale, contrast-stretched page,
+            downscaled so its longest side is at most ANSWER_SHEET_MAX_DIMENSION
+        """
+        image = ImageOps.autocontrast(ImageOps.grayscale(image), cutoff=1)
+        image.thumbnail((settings.ANSWER_SHEET_MAX_DIMENSION, settings.ANSWER_SHEET_MAX_DIMENSION))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+    @staticmethod
+    def _parse_extraction(content: str) -> Dict[int, str]:
+        """Parse the vision model's transcription into answers by question number."""
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = data.get("answers", [])
+        if not isinstance(data, list):
+            raise ValueError("Extraction response is not a list of answers")
+
+        answers: Dict[int, str] = {}
+        for item in data:
+            try:
+                number = int(item["question_number"])
+                text = str(item["answer"]).strip()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if text:
+                answers[number] = f"{answers[number]} {text}" if number in answers else text
+        return answers
+
+    async def extract_page(self, image_base64: str, question_numbers: List[int]) -> Dict[int, str]:
+        """Transcribe the answers on one normalized page."""
+        response = await llm_scheduler.chat(
+            task="answer_sheet_extraction",
+            model=self.model,
+            messages=[{
+                'role': 'user',
+                'content': ANSWER_SHEET_EXTRACTION_PROMPT.render(
+                    question_numbers=", ".join(map(str, question_numbers))
+                ),
+                'images': [image_base64]
+            }],
+            options={'temperature': 0}
+        )
+        content = response.get('message', {}).get('content', '').strip()
+        try:
+            return self._parse_extraction(content)
+        except (json.JSONDecodeError, ValueError) as e:
+            raise ImageProcessingError(
+                "Failed to parse answer sheet transcription",
+                details=[str(e)]
+            )
+
+    async def grade_sheet(
+        self,
+        answers: Dict[int, str],
+        answer_key: List[AnswerKeyItem],
+        mode: EvaluationMode
+    ) -> List[Dict[str, Any]]:
+        """Grade transcribed answers against the key; unanswered questions score 0."""
+        answered = [item for item in answer_key if answers.get(item.question_number)]
+        results, timings = await self.evaluation_service.evaluate_pairs(
+            [
+                AnswerPair(
+                    expected_answer=item.expected_answer,
+                    student_answer=answers[item.question_number],
+                    keywords=item.keywords
+                )
+                for item in answered
+            ],
+            mode
+        ) if answered else ([], [])
+
+        graded = {
+            item.question_number: {
+                "student_answer": answers[item.question_number],
+                "score": result.score,
+                "justification": result.justification,
+                "tier": timing["tier"]
+            }
+            for item, result, timing in zip(answered, results, timings)
+        }
+        return [
+            {
+                "question_number": item.question_number,
+                **graded.get(item.question_number, {
+                    "student_answer": None,
+                    "score": 0,
+                    "justification": "No answer found on the sheet",
+                    "tier": "none"
+                })
+            }
+            for item in answer_key
+        ]
+
+    async def process_sheets(
+        self,
+        sheets: List[Tuple[str, Path]],
+        answer_key: List[AnswerKeyItem],
+        mode: EvaluationMode = EvaluationMode.SINGLE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run sheets through the pipeline, yielding one record per sheet as it finishes.
+
+        Args:
+            sheets: (filename, path) of each uploaded sheet
+            answer_key: Expected answer for each question number
+            mode: Evaluation mode used for grading
+
+        Yields:
+            Dict with the sheet index, filename, status and either the per-question
+            results or the error message, followed by a final summary record
+        """
+        question_numbers = [item.question_number for item in answer_key]
+        normalize_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        extract_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        grade_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        finished: asyncio.Queue = asyncio.Queue()
+        busy_ms = {"rasterize": 0.0, "normalize": 0.0, "extract": 0.0, "grade": 0.0}
+        states = [
+            {"filename": filename, "pages": None, "extracted": 0, "answers": {}, "queued": False, "done": False}
+            for filename, _ in sheets
+        ]
+
+        def finish(index: int, **record: Any) -> None:
+            state = states[index]
+            if state["done"]:
+                return
+            state["done"] = True
+            finished.put_nowait({
+                "event": "result",
+                "index": index,
+                "filename": state["filename"],
+                "pages": state["pages"],
+                **record
+            })
+
+        async def queue_for_grading(index: int) -> None:
+            state = states[index]
+            if state["done"] or state["queued"] or state["pages"] is None or state["extracted"] < state["pages"]:
+                return
+            state["queued"] = True
+            await grade_queue.put(index)
+
+        async def rasterize() -> None:
+            for index, (filename, path) in enumerate(sheets):
+                pages = iter(self._iter_pages(path))
+                page_number = 0
+                try:
+                    while True:
+                        started_at = time.perf_counter()
+                        image = await asyncio.to_thread(next, pages, None)
+                        busy_ms["rasterize"] += (time.perf_counter() - started_at) * 1000
+                        if image is None:
+                            break
+                        page_number += 1
+                        await normalize_queue.put((index, page_number, image))
+                except ValidationError as e:
+                    finish(index, status="failed", error=e.message)
+                    continue
+                except Exception as e:
+                    # Name the upload, not its temporary copy
+                    error = str(e).replace(str(path), filename)
+                    finish(index, status="failed", error=f"Could not read page {page_number + 1}: {error}")
+                    continue
+                if page_number == 0:
+                    finish(index, status="failed", error="Sheet has no pages")
+                    continue
+                states[index]["pages"] = page_number
+                await queue_for_grading(index)
+
+        async def normalize() -> None:
+            while True:
+                index, page_number, image = await normalize_queue.get()
+                try:
+                    if states[index]["done"]:
+                        continue
+                    started_at = time.perf_counter()
+                    image_base64 = await asyncio.to_thread(self.normalize_page, image)
+                    busy_ms["normalize"] += (time.perf_counter() - started_at) * 1000
+                    await extract_queue.put((index, page_number, image_base64))
+                except Exception as e:
+                    finish(index, status="failed", error=f"Could not normalize page {page_number}: {str(e)}")
+                finally:
+                    normalize_queue.task_done()
+
+        async def extract() -> None:
+            while True:
+                index, page_number, image_base64 = await extract_queue.get()
+                state = states[index]
+                try:
+                    if state["done"]:
+                        continue
+                    started_at = time.perf_counter()
+                    answers = await self.extract_page(image_base64, question_numbers)
+                    busy_ms["extract"] += (time.perf_counter() - started_at) * 1000
+                    state["answers"][page_number] = answers
+                    state["extracted"] += 1
+                    await queue_for_grading(index)
+                except Exception as e:
+                    finish(index, status="failed", error=f"Could not extract page {page_number}: {str(e)}")
+                finally:
+                    extract_queue.task_done()
+
+        async def grade() -> None:
+            while True:
+                index = await grade_queue.get()
+                state = states[index]
+                try:
+                    # Answers that run over a page break are joined in page order
+                    answers: Dict[int, str] = {}
+                    for page_number in sorted(state["answers"]):
+                        for number, text in state["answers"][page_number].items():
+                            answers[number] = f"{answers[number]} {text}" if number in answers else text
+
+                    started_at = time.perf_counter()
+                    results = await self.grade_sheet(answers, answer_key, mode)
+                    busy_ms["grade"] += (time.perf_counter() - started_at) * 1000
+                    finish(
+                        index,
+                        status="completed",
+                        total_score=round(sum(r["score"] for r in results) / len(results), 2) if results else 0,
+                        results=results
+                    )
+                except Exception as e:
+                    finish(index, status="failed", error=f"Could not grade sheet: {str(e)}")
+                finally:
+                    grade_queue.task_done()
+
+        logger.info("Starting answer sheet ingestion", {
+            "sheets": len(sheets),
+            "questions": len(answer_key),
+            "mode": mode.value
+        })
+
+        started_at = time.perf_counter()
+        tasks = [asyncio.create_task(rasterize())]
+        tasks += [asyncio.create_task(normalize()) for _ in range(settings.ANSWER_SHEET_NORMALIZE_WORKERS)]
+        tasks += [asyncio.create_task(extract()) for _ in range(settings.ANSWER_SHEET_EXTRACT_WORKERS)]
+        tasks += [asyncio.create_task(grade()) for _ in range(settings.ANSWER_SHEET_GRADE_WORKERS)]
+        completed = 0
+        try:
+            for _ in range(len(sheets)):
+                record = await finished.get()
+                completed += record["status"] == "completed"
+                yield record
+
+            yield {
+                "event": "summary",
+                "total_sheets": len(sheets),
+                "completed": completed,
+                "failed": len(sheets) - completed,
+                "pages": sum(state["pages"] or 0 for state in states),
+                "wall_time_ms": round((time.perf_counter() - started_at) * 1000, 2),
+                # Time spent inside each stage; the largest one is the bottleneck
+                "stage_busy_ms": {stage: round(ms, 2) for stage, ms in busy_ms.items()}
+            }
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,155 @@
+# src/services/batch_service.py
+import asyncio
+import contextvars
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from config.settings import settings
+from models.question_models import QuestionRequest
+from services.llm_scheduler import llm_scheduler
+from services.question_service import QuestionService
+from utils.logger import logger
+
+
+class BatchGenerationService:
+    """
+    Generates papers for many requests that share chapters.
+
+    Chapter context is extracted once per distinct chapter and shared by every
+    request that needs it. All bucket generations from all requests go through a
+    single work queue served by a fixed worker pool, and each paper is yielded as
+    soon as its last bucket finishes. Each paper carries the same ``llm_usage``
+    metadata as ``generate_questions``; a shared chapter extraction is counted
+    for the request that started it.
+    """
+    def __init__(self):
+        self.question_service = QuestionService()
+        self.workers = settings.BATCH_WORKERS
+
+    @staticmethod
+    def _chapter_key(request: QuestionRequest) -> Tuple[str, ...]:
+        return (
+            request.language,
+            request.syllabus,
+            request.standard,
+            request.subject,
+            request.chapter
+        )
+
+    async def generate_batch(self, requests: List[QuestionRequest]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate every request in the batch, yielding one record per request as it finishes.
+
+        Yields:
+            Dict with the request index, request_id, status and either the
+            paper or the error message, followed by a final summary record
+        """
+        work: asyncio.Queue = asyncio.Queue()
+        finished: asyncio.Queue = asyncio.Queue()
+        contexts: Dict[Tuple[str, ...], asyncio.Task] = {}
+        states = [
+            {"request": request, "buckets": [], "questions": [], "remaining": 0, "done": False}
+            for request in requests
+        ]
+
+        def finish(index: int, **record: Any) -> None:
+            state = states[index]
+            if state["done"]:
+                return
+            state["done"] = True
+            finished.put_nowait({
+                "event": "result",
+                "index": index,
+                "request_id": state["request"].request_id,
+                **record
+            })
+
+        async def assemble(index: int) -> None:
+            state = states[index]
+            paper = await self.question_service.assemble_paper(
+                state["request"],
+                state["buckets"],
+                state["questions"],
+                state["context"]
+            )
+            paper.metadata["llm_usage"] = state["usage"].to_dict()
+            finish(index, status="completed", result=paper.model_dump(mode="json"))
+
+        async def prepare(index: int) -> None:
+            state = states[index]
+            request = state["request"]
+            try:
+                with llm_scheduler.track_usage() as usage:
+                    # Workers run this request's buckets in this context so their calls count here
+                    state["usage"] = usage
+                    state["llm_context"] = contextvars.copy_context()
+                    state["buckets"] = self.question_service.plan_buckets(request)
+                    state["questions"] = [None] * len(state["buckets"])
+                    state["remaining"] = len(state["buckets"])
+
+                    key = self._chapter_key(request)
+                    if key not in contexts:
+                        contexts[key] = asyncio.create_task(self.question_service.get_chapter_context(request))
+                    state["context"] = await contexts[key]
+
+                    if not state["buckets"]:
+                        await assemble(index)
+                for bucket_index in range(len(state["buckets"])):
+                    work.put_nowait((index, bucket_index))
+            except Exception as e:
+                finish(index, status="failed", error=str(e))
+
+        async def run_bucket(index: int, bucket_index: int) -> None:
+            state = states[index]
+            q_type, difficulty, count = state["buckets"][bucket_index]
+            state["questions"][bucket_index] = await self.question_service.generate_bucket(
+                state["context"],
+                state["request"],
+                q_type,
+                difficulty,
+                count
+            )
+            state["remaining"] -= 1
+            if state["remaining"] == 0:
+                await assemble(index)
+
+        async def worker() -> None:
+            while True:
+                index, bucket_index = await work.get()
+                state = states[index]
+                try:
+                    if state["done"]:
+                        continue
+                    await asyncio.create_task(
+                        run_bucket(index, bucket_index),
+                        context=state["llm_context"].copy()
+                    )
+                except Exception as e:
+                    finish(index, status="failed", error=str(e))
+                finally:
+                    work.task_done()
+
+        logger.info("Starting batch generation", {
+            "requests": len(requests),
+            "distinct_chapters": len({self._chapter_key(r) for r in requests}),
+            "workers": self.workers
+        })
+
+        tasks = [asyncio.create_task(prepare(i)) for i in range(len(requests))]
+        tasks += [asyncio.create_task(worker()) for _ in range(self.workers)]
+        completed = 0
+        try:
+            for _ in range(len(requests)):
+                record = await finished.get()
+                completed += record["status"] == "completed"
+                yield record
+
+            yield {
+                "event": "summary",
+                "total_requests": len(requests),
+                "completed": completed,
+                "failed": len(requests) - completed,
+                "chapter_extractions": len(contexts)
+            }
+        finally:
+            for task in [*tasks, *contexts.values()]:
+                task.cancel()
+            await asyncio.gather(*tasks, *contexts.values(), return_exceptions=True)
@@ -0,0 +1,246 @@
+# src/services/bulk_evaluation_service.py
+import csv
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import uuid4
+from fastapi import UploadFile
+from pydantic import ValidationError as PydanticValidationError
+from config.settings import settings
+from models.evaluation_models import AnswerPair, EvaluationMode
+from services.evaluation_services import EvaluationService
+from utils.exceptions import ValidationError
+from utils.logger import logger
+
+# (row number, source row id, parsed pair or None, error message or None)
+ParsedRow = Tuple[int, Optional[str], Optional[AnswerPair], Optional[str]]
+
+
+class BulkEvaluationService:
+    """
+    Grades answer files of any size as a background job.
+
+    Uploads are copied to disk in chunks and parsed as a stream, one row at a
+    time, so memory stays flat regardless of file size. Valid rows are graded in
+    fixed-size chunks through EvaluationService (and so through the shared LLM
+    scheduler), and every outcome is appended to a JSONL output file as soon as
+    its chunk finishes. The output file doubles as the resume checkpoint: rows
+    already present in it are skipped when an interrupted job is run again.
+    """
+    FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+    UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+    def __init__(self):
+        self.evaluation_service = EvaluationService()
+        self.chunk_size = settings.BULK_EVALUATION_CHUNK_SIZE
+        self.work_dir = Path(settings.BULK_EVALUATION_DIR)
+
+    def detect_format(self, filename: Optional[str]) -> str:
+        """Get the input format from the upload's file extension."""
+        suffix = Path(filename or "").suffix.lower()
+        if suffix not in self.FORMATS:
+            raise ValidationError(
+                f"Unsupported file type '{suffix or filename}'",
+                [f"Supported extensions: {', '.join(sorted(self.FORMATS))}"]
+            )
+        return self.FORMATS[suffix]
+
+    async def store_upload(self, upload: UploadFile, mode: EvaluationMode) -> Dict[str, Any]:
+        """
+        Copy an upload to the work directory and build the job payload.
+
+        Raises:
+            ValidationError: If the file type is unsupported or the file is too large
+        """
+        file_format = self.detect_format(upload.filename)
+        upload_id = str(uuid4())
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        input_path = self.work_dir / f"{upload_id}.input.{file_format}"
+        max_bytes = settings.BULK_EVALUATION_MAX_UPLOAD_MB * 1024 * 1024
+
+        size = 0
+        with open(input_path, "wb") as f:
+            while chunk := await upload.read(self.UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    f.close()
+                    input_path.unlink(missing_ok=True)
+                    raise ValidationError(
+                        "Uploaded file is too large",
+                        [f"Maximum size is {settings.BULK_EVALUATION_MAX_UPLOAD_MB} MB"]
+                    )
+                f.write(chunk)
+
+        logger.info("Stored bulk evaluation upload", {
+            "upload_id": upload_id,
+            "filename": upload.filename,
+            "format": file_format,
+            "bytes": size
+        })
+        return {
+            "upload_id": upload_id,
+            "filename": upload.filename,
+            "format": file_format,
+            "mode": mode.value,
+            "input_path": str(input_path),
+            "output_path": str(self.work_dir / f"{upload_id}.results.jsonl")
+        }
+
+    @staticmethod
+    def _parse_row(row_number: int, data: Any) -> ParsedRow:
+        """Validate one raw row into an AnswerPair."""
+        if not isinstance(data, dict):
+            return row_number, None, None, "Row is not an object"
+
+        row_id = data.get("id")
+        row_id = str(row_id) if row_id not in (None, "") else None
+        keywords = data.get("keywords")
+        if isinstance(keywords, str):
+            keywords = keywords.split(";")
+        try:
+            pair = AnswerPair(
+                expected_answer=data.get("expected_answer") or "",
+                student_answer=data.get("student_answer") or "",
+                keywords=keywords or None
+            )
+        except PydanticValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            return row_number, row_id, None, errors
+        return row_number, row_id, pair, None
+
+    def iter_rows(self, path: Path, file_format: str) -> Iterator[ParsedRow]:
+        """
+        Parse an input file one row at a time.
+
+        CSV files need ``expected_answer`` and ``student_answer`` columns and may have
+        ``id`` and ``keywords`` (separated by ';') columns. JSONL files hold one object
+        per line with the same fields. Rows are numbered from 1, blank lines skipped.
+        """
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            if file_format == "csv":
+                reader = csv.DictReader(f)
+                missing = {"expected_answer", "student_answer"} - set(reader.fieldnames or [])
+                if missing:
+                    raise ValidationError(
+                        "CSV file is missing required columns",
+                        sorted(missing)
+                    )
+                for row_number, data in enumerate(reader, 1):
+                    yield self._parse_row(row_number, data)
+                return
+
+            row_number = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                row_number += 1
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield row_number, None, None, f"Invalid JSON: {e.msg}"
+                    continue
+                yield self._parse_row(row_number, data)
+
+    @staticmethod
+    def _completed_rows(output_path: Path) -> Set[int]:
+        """
+        Get the row numbers already written by an earlier run.
+
+        A partial trailing line left by an interrupted write is truncated away.
+        """
+        if not output_path.exists():
+            return set()
+
+        completed = set()
+        valid_bytes = 0
+        with open(output_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    completed.add(json.loads(line)["row"])
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    break
+                valid_bytes += len(line)
+
+        if valid_bytes < output_path.stat().st_size:
+            with open(output_path, "r+b") as f:
+                f.truncate(valid_bytes)
+        return completed
+
+    async def run(
+        self,
+        payload: Dict[str, Any],
+        progress: Callable[[Dict[str, Any]], None]
+    ) -> Dict[str, Any]:
+        """
+        Grade every row of an uploaded file, resuming from the output file if present.
+
+        Returns:
+            Dict with row counts, the average score of rows graded in this run
+            and the output file name
+        """
+        input_path = Path(payload["input_path"])
+        output_path = Path(payload["output_path"])
+        mode = EvaluationMode(payload["mode"])
+        completed = self._completed_rows(output_path)
+        counts = {"rows": 0, "evaluated": 0, "failed": 0, "invalid": 0, "resumed": len(completed)}
+        score_total = 0.0
+
+        logger.info("Starting bulk evaluation", {
+            "upload_id": payload["upload_id"],
+            "format": payload["format"],
+            "mode": mode.value,
+            "resumed_rows": len(completed)
+        })
+
+        with open(output_path, "a", encoding="utf-8") as out:
+            def write(record: Dict[str, Any]) -> None:
+                out.write(json.dumps(record) + "\n")
+
+            async def grade(chunk: List[ParsedRow]) -> None:
+                nonlocal score_total
+                pairs = [pair for _, _, pair, _ in chunk]
+                results, timings = await self.evaluation_service.evaluate_pairs(pairs, mode)
+                for (row_number, row_id, _, _), result, timing in zip(chunk, results, timings):
+                    failed = result.justification.startswith("Error:")
+                    counts["failed" if failed else "evaluated"] += 1
+                    score_total += 0 if failed else result.score
+                    write({
+                        "row": row_number,
+                        "id": row_id,
+                        "status": "failed" if failed else "evaluated",
+                        "score": result.score,
+                        "justification": result.justification,
+                        "tier": timing["tier"]
+                    })
+                out.flush()
+                progress({
+                    "stage": "evaluating",
+                    "rows_read": counts["rows"],
+                    **{key: counts[key] for key in ("evaluated", "failed", "invalid", "resumed")}
+                })
+
+            chunk: List[ParsedRow] = []
+            for parsed in self.iter_rows(input_path, payload["format"]):
+                row_number, row_id, pair, error = parsed
+                counts["rows"] += 1
+                if row_number in completed:
+                    continue
+                if pair is None:
+                    counts["invalid"] += 1
+                    write({"row": row_number, "id": row_id, "status": "invalid", "error": error})
+                    continue
+                chunk.append(parsed)
+                if len(chunk) >= self.chunk_size:
+                    await grade(chunk)
+                    chunk = []
+            if chunk:
+                await grade(chunk)
+
+        logger.info("Bulk evaluation completed", {"upload_id": payload["upload_id"], **counts})
+        return {
+            **counts,
+            "average_score": round(score_total / counts["evaluated"], 2) if counts["evaluated"] else 0,
+            "output_file": output_path.name
+        }
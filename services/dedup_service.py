@@ -0,0 +1,187 @@
+# src/services/dedup_service.py
+import hashlib
+import json
+import unicodedata
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from config.settings import settings
+from models.question_models import QuestionRequest
+from utils.logger import logger
+
+# Mersenne prime used for the universal hash family (a * h + b) mod p
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_MULTIPLIER = np.uint64(1 << 31)
+_MAX_OFFSET = np.uint64(1 << 32)
+
+
+def _is_separator(char: str) -> bool:
+    """Whether a character only separates words: punctuation, symbol, space or control."""
+    category = unicodedata.category(char)
+    return category[0] in "PSZ" or category == "Cc"
+
+
+class DedupService:
+    """
+    Detects near-duplicate questions using vectorized MinHash signatures.
+
+    Every question is reduced to a set of character shingles, hashed once and
+    signed with NUM_PERMUTATIONS hash functions in a single NumPy operation.
+    Pairwise Jaccard similarity is then estimated for the whole paper at once
+    by comparing signature matrices.
+    """
+    def __init__(self):
+        self.threshold = settings.DEDUP_SIMILARITY_THRESHOLD
+        self.num_perm = settings.DEDUP_NUM_PERMUTATIONS
+        self.shingle_size = settings.DEDUP_SHINGLE_SIZE
+        self.history_dir = Path(settings.QUESTION_HISTORY_DIR)
+
+        # Fixed seed so signatures are comparable across requests and restarts
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, _MAX_MULTIPLIER, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MAX_OFFSET, size=self.num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def question_text(question: Dict[str, Any]) -> str:
+        """
+        Get the normalized text used to compare two questions.
+
+        Case is folded and punctuation, symbols and whitespace collapse to single
+        spaces. Letters, combining marks and digits of every script are kept, so
+        Hindi or Malayalam questions compare as reliably as English ones.
+        """
+        text = str(question.get("question", "")).casefold()
+        return " ".join(
+            "".join(" " if _is_separator(char) else char for char in text).split()
+        )
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        """Hash the character shingles of a text to 32-bit integers."""
+        k = self.shingle_size
+        shingles = {text[i:i + k] for i in range(max(len(text) - k + 1, 1))}
+        return np.array(
+            [
+                int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+                for s in shingles
+            ],
+            dtype=np.uint64
+        )
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """
+        Compute MinHash signatures for a list of texts.
+
+        Returns:
+            np.ndarray: Matrix of shape (len(texts), num_perm)
+        """
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for row, text in enumerate(texts):
+            hashes = self._shingle_hashes(text)
+            # (num_perm, n_shingles) permuted hashes, minimum per permutation
+            permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+            signatures[row] = permuted.min(axis=1)
+        return signatures
+
+    @staticmethod
+    def similarity_matrix(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Estimate Jaccard similarity between every pair of signatures."""
+        if len(left) == 0 or len(right) == 0:
+            return np.zeros((len(left), len(right)))
+        return (left[:, None, :] == right[None, :, :]).mean(axis=2)
+
+    def find_duplicates(
+        self,
+        questions: List[Dict[str, Any]],
+        history: Optional[List[str]] = None,
+        protected: int = 0
+    ) -> List[int]:
+        """
+        Find the indexes of questions that duplicate an earlier question or the history.
+
+        Args:
+            questions: Questions in paper order; earlier questions win ties
+            history: Normalized texts of previously issued questions
+            protected: Leading questions that are already accepted and never removed
+
+        Returns:
+            List[int]: Sorted indexes of questions to remove
+        """
+        texts = [self.question_text(q) for q in questions]
+        signatures = self.signatures(texts)
+        within = self.similarity_matrix(signatures, signatures)
+        # Texts shorter than one shingle carry too little to call anything a duplicate
+        comparable = [len(text) >= self.shingle_size for text in texts]
+
+        duplicates = set()
+        history = [text for text in history or [] if len(text) >= self.shingle_size]
+        if history:
+            against_history = self.similarity_matrix(signatures, self.signatures(history))
+            for idx in np.nonzero(against_history.max(axis=1) >= self.threshold)[0]:
+                if idx >= protected and comparable[idx]:
+                    duplicates.add(int(idx))
+
+        for idx in range(protected, len(questions)):
+            if idx in duplicates or not comparable[idx]:
+                continue
+            kept = [j for j in range(idx) if j not in duplicates and comparable[j]]
+            if kept and within[idx, kept].max() >= self.threshold:
+                duplicates.add(idx)
+
+        return sorted(duplicates)
+
+    def _history_path(self, request: QuestionRequest) -> Path:
+        key = "|".join([
+            request.language, request.syllabus, request.standard,
+            request.subject, request.chapter
+        ])
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return self.history_dir / f"{digest}.jsonl"
+
+    def load_history(self, request: QuestionRequest) -> List[str]:
+        """Load normalized question texts previously generated for the chapter."""
+        path = self._history_path(request)
+        if not path.exists():
+            return []
+        try:
+            with open(path, "r", encoding="utf-8") as history_file:
+                return [json.loads(line)["text"] for line in history_file if line.strip()]
+        except Exception as e:
+            logger.error("Failed to load question history", {
+                "error": str(e),
+                "path": str(path)
+            })
+            return []
+
+    def save_history(self, request: QuestionRequest, questions: List[Dict[str, Any]]) -> None:
+        """Append accepted questions to the chapter's question history."""
+        path = self._history_path(request)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as history_file:
+                for question in questions:
+                    history_file.write(json.dumps({
+                        "request_id": request.request_id,
+                        "text": self.question_text(question)
+                    }) + "\n")
+        except Exception as e:
+            logger.error("Failed to save question history", {
+                "error": str(e),
+                "path": str(path)
+            })
+
+    @staticmethod
+    def plan_replacements(
+        slot_buckets: List[Tuple[str, str]],
+        duplicates: List[int]
+    ) -> Dict[Tuple[str, str], List[int]]:
+        """
+        Group removed slots by their (type, difficulty) bucket so only those are regenerated.
+
+        Args:
+            slot_buckets: Bucket of each question slot, in paper order
+            duplicates: Indexes of removed slots
+        """
+        slots: Dict[Tuple[str, str], List[int]] = {}
+        for idx in duplicates:
+            slots.setdefault(slot_buckets[idx], []).append(idx)
+        return slots
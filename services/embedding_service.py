@@ -0,0 +1,47 @@
+# src/services/embedding_service.py
+from typing import List
+import numpy as np
+from config.settings import settings
+from services.llm_scheduler import llm_scheduler
+from utils.exceptions import LLMServiceError
+from utils.logger import logger
+
+
+class EmbeddingService:
+    """
+    Computes text embeddings with the local embedding model.
+
+    Texts are de-duplicated and sent in a single embed call, and the returned
+    vectors are L2-normalized so cosine similarity is a plain dot product.
+    """
+    def __init__(self):
+        self.model = settings.EMBEDDING_MODEL
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts in one call.
+
+        Returns:
+            np.ndarray: Normalized vectors of shape (len(texts), dimensions)
+        """
+        unique = list(dict.fromkeys(texts))
+        try:
+            response = await llm_scheduler.embed(model=self.model, input=unique)
+            vectors = np.asarray(response["embeddings"], dtype=np.float32)
+        except Exception as e:
+            logger.error("Embedding request failed", {
+                "error": str(e),
+                "model": self.model,
+                "text_count": len(unique)
+            })
+            raise LLMServiceError(f"Failed to compute embeddings: {str(e)}")
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        position = {text: i for i, text in enumerate(unique)}
+        return vectors[[position[text] for text in texts]]
+
+    @staticmethod
+    def row_cosine(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Cosine similarity between matching rows of two normalized matrices."""
+        return np.einsum("ij,ij->i", left, right)
@@ -0,0 +1,194 @@
+# src/services/evaluation_cache.py
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from config.settings import settings
+from models.evaluation_models import EvaluationResult
+from utils.logger import logger
+from utils.metrics import metrics
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_answer(text: str) -> str:
+    """Normalize an answer for cache lookups: case, punctuation and whitespace."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+class EvaluationCache:
+    """
+    Two-tier cache of evaluation results keyed on normalized answer pairs.
+
+    The memory tier is a bounded LRU. The optional disk tier is a SQLite table
+    that survives restarts and is shared by every worker process; disk hits are
+    promoted back into memory. Disk reads and writes run in a worker thread, one
+    query per lookup or store batch, so the event loop never waits on SQLite.
+    """
+    _DISK_BATCH = 500
+
+    def __init__(self, max_entries: int, db_path: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.db_path = Path(db_path) if db_path else None
+        self._memory: "OrderedDict[str, EvaluationResult]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(expected_answer: str, student_answer: str, prompt_key: str, model: str) -> str:
+        """Build the cache key from the normalized pair, prompt version and model."""
+        return EvaluationCache.make_normalized_key(
+            normalize_answer(expected_answer),
+            normalize_answer(student_answer),
+            prompt_key,
+            model
+        )
+
+    @staticmethod
+    def make_normalized_key(normalized_expected: str, normalized_student: str, prompt_key: str, model: str) -> str:
+        """Build the cache key from answers that are already normalized."""
+        raw = "\x00".join([normalized_expected, normalized_student, prompt_key, model])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.db_path is None:
+            return None
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS evaluation_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    score REAL NOT NULL,
+                    justification TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, result: EvaluationResult) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, EvaluationResult]:
+        found: Dict[str, EvaluationResult] = {}
+        try:
+            with self._disk_lock:
+                conn = self._connect()
+                for start in range(0, len(keys), self._DISK_BATCH):
+                    chunk = keys[start:start + self._DISK_BATCH]
+                    rows = conn.execute(
+                        "SELECT cache_key, score, justification FROM evaluation_cache "
+                        f"WHERE cache_key IN ({', '.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    for key, score, justification in rows:
+                        found[key] = EvaluationResult(score=score, justification=justification)
+        except sqlite3.Error as e:
+            logger.error("Evaluation cache read failed", {"error": str(e)})
+        return found
+
+    def _write_disk(self, results: Dict[str, EvaluationResult]) -> None:
+        created_at = datetime.utcnow().isoformat()
+        try:
+            with self._disk_lock:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO evaluation_cache VALUES (?, ?, ?, ?)",
+                    [(key, result.score, result.justification, created_at) for key, result in results.items()]
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Evaluation cache write failed", {"error": str(e)})
+
+    async def get_many(self, keys: List[str]) -> Dict[str, EvaluationResult]:
+        """Look up several results, checking memory first and then disk; misses are left out."""
+        found: Dict[str, EvaluationResult] = {}
+        missing = []
+        for key in keys:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                found[key] = result
+            else:
+                missing.append(key)
+
+        from_disk = await asyncio.to_thread(self._read_disk, missing) if missing and self.db_path else {}
+        for key, result in from_disk.items():
+            self._remember(key, result)
+        found.update(from_disk)
+
+        self.hits += len(found)
+        self.disk_hits += len(from_disk)
+        self.misses += len(missing) - len(from_disk)
+        return found
+
+    async def get(self, key: str) -> Optional[EvaluationResult]:
+        """Look up a result, checking memory first and then disk."""
+        return (await self.get_many([key])).get(key)
+
+    async def set_many(self, results: Dict[str, EvaluationResult]) -> None:
+        """Store results in memory and, when enabled, on disk."""
+        for key, result in results.items():
+            self._remember(key, result)
+        if results and self.db_path:
+            await asyncio.to_thread(self._write_disk, dict(results))
+
+    async def set(self, key: str, result: EvaluationResult) -> None:
+        """Store a result in memory and, when enabled, on disk."""
+        await self.set_many({key: result})
+
+    def reset(self) -> None:
+        """Empty the memory tier and zero the counters; the disk tier is kept."""
+        self._memory.clear()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Get hit/miss counters for the life of the process."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+evaluation_cache = EvaluationCache(
+    settings.EVALUATION_CACHE_SIZE,
+    settings.EVALUATION_CACHE_DB_PATH if settings.EVALUATION_CACHE_DISK_ENABLED else None
+)
+
+metrics.gauge(
+    "evaluation_cache_lookups",
+    "Evaluation cache lookups by result since worker start",
+    lambda: {
+        (("result", "hit"),): float(evaluation_cache.hits),
+        (("result", "miss"),): float(evaluation_cache.misses)
+    }
+)
+metrics.derived(
+    "evaluation_cache_hit_ratio",
+    "Evaluation cache hits over lookups across all workers",
+    lambda merged: {
+        (): round(hits / (hits + misses), 4)
+        for series in [merged["gauges"].get("evaluation_cache_lookups", {})]
+        for hits, misses in [(series.get((("result", "hit"),), 0.0), series.get((("result", "miss"),), 0.0))]
+        if hits + misses
+    }
+)
@@ -1,67 +1,105 @@
 # src/services/evaluation_service.py
-from typing import List, Dict, Any
-import ollama
+import asyncio
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional, Tuple
 import json
 from datetime import datetime
+import numpy as np
+from config.settings import settings
 from models.evaluation_models import (
     AnswerPair,
     EvaluationResult,
-    AnswersEvaluationRequest
+    AnswersEvaluationRequest,
+    EvaluationMode,
+    GroupedEvaluationRequest
 )
 from utils.exceptions import ValidationError, LLMServiceError
 from utils.logger import logger, log_async_function_call
+from utils.metrics import metrics
+from utils.tracing import tracer
+from utils.prompts import ANSWER_EVALUATION_PROMPT, BATCH_EVALUATION_PROMPT, BATCH_EVALUATION_PAIR
+from services.llm_scheduler import LLMUsage, llm_scheduler
+from services.embedding_service import EmbeddingService
+from services.evaluation_cache import evaluation_cache, normalize_answer
+from utils.keyword_rubric import get_rubric
 
-class EvaluationService:
-    def __init__(self):
-        self.model = "llama3.2-vision"
-        self.temperature = 0.2
-        self.top_p = 0.1
 
-    def _get_evaluation_prompt(self, expected_answer: str, student_answer: str) -> str:
-        """Generate the evaluation prompt with few-shot examples."""
-        return f"""You are an AI assistant tasked with comparing student answers with key answers and provide a precise evaluation score (0-100) indicating how well the actual answer 
-                 matches the expected answer semantically. Use the examples below as guidance.
+class KeyAnswerContext:
+    """
+    Everything about a key answer that does not depend on the student.
 
-Example 1 (10% similarity):
-Key answer: "The Big Bang Theory explains that the universe began as a singularity, which then rapidly expanded, leading to the formation of matter, galaxies, and eventually stars and planets."
-Student answer: "The Earth is part of the Milky Way galaxy, which contains billions of stars and planets."
-Result: 10% semantically similar.
+    When many students answer the same question, the normalized key, compiled
+    keyword rubric, rendered prompt prefix and key embedding are computed once
+    and shared by every pair graded against that key, across requests too.
+    """
+    def __init__(self, expected_answer: str, keywords: Tuple[str, ...]):
+        self.expected_answer = expected_answer
+        self.normalized = normalize_answer(expected_answer)
+        self.rubric = get_rubric(list(keywords)) if keywords else None
+        self.prompt_head, self.prompt_tail = ANSWER_EVALUATION_PROMPT.split_at(
+            "student_answer",
+            expected_answer=expected_answer
+        )
+        self.embedding: Optional[np.ndarray] = None
 
-Example 2 (30% similarity):
-Key answer: "According to the Big Bang Theory, the universe expanded from an extremely hot and dense state approximately 13.8 billion years ago, giving rise to galaxies, stars, and planets."
-Student answer: "Stars and planets formed from clouds of gas and dust, with gravity playing a key role in their creation and development over billions of years."
-Result: 30% semantically similar.
+    def prompt(self, student_answer: str) -> str:
+        """Render the single-pair evaluation prompt for a student answer."""
+        return self.prompt_head + student_answer + self.prompt_tail
 
-Example 3 (50% similarity):
-Key answer: "The Big Bang Theory explains the origin of the universe as a rapid expansion from a very hot, dense singularity that gave rise to galaxies, stars, and planets, forming the universe as we know it."
-Student answer: "The universe began with a massive expansion from a singularity, and over time, galaxies, stars, and planets formed, shaping the cosmos."
-Result: 50% semantically similar.
 
-Example 4 (70% similarity):
-Key answer: "The Big Bang Theory proposes that the universe began as a singular point that expanded rapidly, resulting in the cooling and formation of matter, which later formed stars and galaxies."
-Student answer: "The Big Bang was a rapid expansion of a singular point, leading to the cooling of the universe and the creation of matter, stars, and galaxies."
-Result: 70% semantically similar.
+@lru_cache(maxsize=1024)
+def get_key_context(expected_answer: str, keywords: Tuple[str, ...] = ()) -> KeyAnswerContext:
+    """Get the shared context for a key answer, building it once per distinct key."""
+    return KeyAnswerContext(expected_answer, keywords)
 
-Example 5 (90% similarity):
-Key answer: "The Big Bang Theory states that the universe began as an extremely hot and dense singularity that expanded, cooling over time and allowing matter to form stars, galaxies, and the large-scale structure we see today."
-Student answer: "According to the Big Bang Theory, the universe started from a very hot, dense singularity, expanding and cooling over time, leading to the formation of stars, galaxies, and the universe's structure."
-Result: 90% semantically similar.
 
-Now, evaluate the following:
-Key answer: "{expected_answer}"
-Student answer: "{student_answer}"
+metrics.gauge(
+    "evaluation_key_context_lookups",
+    "Key answer context cache lookups by result since worker start",
+    lambda: {
+        (("result", "hit"),): float(get_key_context.cache_info().hits),
+        (("result", "miss"),): float(get_key_context.cache_info().misses)
+    }
+)
 
-What is the percentage of semantic similarity between the key answer and the student answer? Please provide reasoning and the percentage similarity score.
 
-Return the result in the following JSON format without prefixing with the word 'json':
-{{"reasoning": "...", "score": ...}}"""
+class EvaluationService:
+    def __init__(self):
+        self.model = "llama3.2-vision"
+        self.temperature = 0.2
+        self.top_p = 0.1
+        self.max_concurrency = settings.EVALUATION_MAX_CONCURRENCY
+        self.embedding_service = EmbeddingService()
 
-    async def _evaluate_single_answer(self, pair: AnswerPair, pair_index: int) -> EvaluationResult:
-        """Evaluate a single answer pair."""
+    def _get_evaluation_prompt(self, expected_answer: str, student_answer: str) -> str:
+        """Generate the evaluation prompt with few-shot examples."""
+        return ANSWER_EVALUATION_PROMPT.render(
+            expected_answer=expected_answer,
+            student_answer=student_answer
+        )
+
+    async def _evaluate_single_answer(
+        self,
+        pair: AnswerPair,
+        pair_index: int,
+        timing: Optional[Dict[str, float]] = None,
+        prompt: Optional[str] = None
+    ) -> EvaluationResult:
+        """
+        Evaluate a single answer pair.
+
+        Args:
+            pair: Expected and student answer
+            pair_index: 1-based position of the pair in the request
+            timing: Optional dict that receives the LLM queue wait and inference time
+            prompt: Pre-rendered prompt for the pair, rendered here when omitted
+        """
         try:
-            prompt = self._get_evaluation_prompt(pair.expected_answer, pair.student_answer)
+            prompt = prompt or self._get_evaluation_prompt(pair.expected_answer, pair.student_answer)
             
-            response = ollama.chat(
+            response, call_timing = await llm_scheduler.chat_timed(
+                task="evaluation",
                 model=self.model,
                 messages=[{
                     'role': 'user',
@@ -72,8 +110,11 @@ Return the result in the following JSON format without prefixing with the word '
                     'top_p': self.top_p
                 }
             )
+            if timing is not None:
+                timing.update(call_timing)
 
-            return self._process_llm_response(response, pair_index)
+            with tracer.span("evaluation.parse"):
+                return self._process_llm_response(response, pair_index)
             
         except Exception as e:
             logger.error(f"Error evaluating answer pair {pair_index}: {str(e)}")
@@ -82,6 +123,115 @@ Return the result in the following JSON format without prefixing with the word '
                 justification=f"Error: Failed to evaluate answer pair {pair_index}"
             )
 
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token estimate (about 4 characters per token)."""
+        return len(text) // 4 + 1
+
+    def _plan_batches(self, pairs: List[AnswerPair]) -> List[List[int]]:
+        """
+        Split pairs into consecutive batches that fit the context budget.
+
+        Each batch holds at most EVALUATION_BATCH_MAX_PAIRS pairs, and its prompt plus
+        the reserved output tokens must fit EVALUATION_CONTEXT_TOKENS, so long answers
+        get smaller batches.
+
+        Returns:
+            List of batches, each a list of 0-based pair indexes
+        """
+        budget = settings.EVALUATION_CONTEXT_TOKENS - self._estimate_tokens(BATCH_EVALUATION_PROMPT.static)
+        batches, current, used = [], [], 0
+        for i, pair in enumerate(pairs):
+            cost = (
+                self._estimate_tokens(pair.expected_answer)
+                + self._estimate_tokens(pair.student_answer)
+                + settings.EVALUATION_OUTPUT_TOKENS_PER_PAIR
+            )
+            if current and (used + cost > budget or len(current) >= settings.EVALUATION_BATCH_MAX_PAIRS):
+                batches.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _evaluate_batch(
+        self,
+        pairs: List[AnswerPair],
+        timing: Optional[Dict[str, float]] = None
+    ) -> List[Optional[EvaluationResult]]:
+        """
+        Evaluate several pairs with one LLM call.
+
+        Returns:
+            One entry per pair; None where the batch output could not be used
+        """
+        try:
+            prompt = BATCH_EVALUATION_PROMPT.render(
+                count=len(pairs),
+                pairs="\n\n".join(
+                    BATCH_EVALUATION_PAIR.format(
+                        number=number,
+                        expected_answer=pair.expected_answer,
+                        student_answer=pair.student_answer
+                    )
+                    for number, pair in enumerate(pairs, 1)
+                )
+            )
+
+            response, call_timing = await llm_scheduler.chat_timed(
+                task="evaluation_batch",
+                model=self.model,
+                messages=[{
+                    'role': 'user',
+                    'content': prompt
+                }],
+                options={
+                    'temperature': self.temperature,
+                    'top_p': self.top_p,
+                    'num_ctx': settings.EVALUATION_CONTEXT_TOKENS
+                }
+            )
+            if timing is not None:
+                timing.update(call_timing)
+
+            with tracer.span("evaluation.parse", pairs=len(pairs)):
+                return self._process_batch_response(response, len(pairs))
+
+        except Exception as e:
+            logger.error(f"Error evaluating batch of {len(pairs)} pairs: {str(e)}")
+            return [None] * len(pairs)
+
+    def _process_batch_response(self, response: Dict[str, Any], count: int) -> List[Optional[EvaluationResult]]:
+        """Split a batched LLM response into per-pair results."""
+        results: List[Optional[EvaluationResult]] = [None] * count
+        try:
+            content = response.get('message', {}).get('content', '').strip()
+            evaluations = json.loads(content)
+            if isinstance(evaluations, dict):
+                evaluations = evaluations.get('results', evaluations.get('evaluations', []))
+            if not isinstance(evaluations, list):
+                raise ValueError("Batch response is not a list")
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Failed to parse batched evaluation response: {str(e)}")
+            return results
+
+        for position, evaluation in enumerate(evaluations):
+            try:
+                slot = int(evaluation.get('pair', position + 1)) - 1
+                score = float(evaluation.get('score'))
+                if not 0 <= slot < count or results[slot] is not None or not 0 <= score <= 100:
+                    continue
+                results[slot] = EvaluationResult(
+                    score=score,
+                    justification=evaluation.get('reasoning') or 'No reasoning provided'
+                )
+            except (AttributeError, TypeError, ValueError):
+                continue
+
+        return results
+
     def _process_llm_response(self, response: Dict[str, Any], pair_index: int) -> EvaluationResult:
         """Process and validate LLM response."""
         try:
@@ -126,6 +276,311 @@ Return the result in the following JSON format without prefixing with the word '
             "timestamp": datetime.utcnow().isoformat()
         }
 
+    def _prepare_timing_metadata(self, timings: List[Dict[str, Any]], wall_time_ms: float) -> Dict[str, Any]:
+        """Summarize per-pair queue wait versus inference time and which tier resolved each pair."""
+        tiers: Dict[str, int] = {}
+        for timing in timings:
+            tiers[timing["tier"]] = tiers.get(timing["tier"], 0) + 1
+        return {
+            "tiers": tiers,
+            "key_groups": len({t["key_group"] for t in timings}),
+            "max_concurrency": self.max_concurrency,
+            "llm_max_concurrency": llm_scheduler.max_concurrency,
+            "wall_time_ms": round(wall_time_ms, 2),
+            "total_queue_wait_ms": round(sum(t.get("queue_wait_ms", 0) for t in timings), 2),
+            "total_inference_ms": round(sum(t.get("inference_ms", 0) for t in timings), 2),
+            "pairs": timings
+        }
+
+    def _score_from_similarity(self, similarity: float) -> Optional[float]:
+        """
+        Map an embedding similarity to a score when it falls in a confidence band.
+
+        Above CASCADE_ACCEPT_SIMILARITY the score rises linearly from
+        CASCADE_ACCEPT_MIN_SCORE to 100; below CASCADE_REJECT_SIMILARITY it rises
+        from 0 to CASCADE_REJECT_MAX_SCORE. Anything in between returns None.
+        """
+        accept = settings.CASCADE_ACCEPT_SIMILARITY
+        reject = settings.CASCADE_REJECT_SIMILARITY
+        if similarity >= accept:
+            fraction = (similarity - accept) / (1 - accept) if accept < 1 else 1
+            return round(settings.CASCADE_ACCEPT_MIN_SCORE + min(fraction, 1) * (100 - settings.CASCADE_ACCEPT_MIN_SCORE), 2)
+        if similarity <= reject:
+            fraction = max(similarity, 0) / reject if reject > 0 else 0
+            return round(fraction * settings.CASCADE_REJECT_MAX_SCORE, 2)
+        return None
+
+    async def _cascade_fast_path(
+        self,
+        pairs: List[AnswerPair],
+        contexts: List[KeyAnswerContext]
+    ) -> Dict[int, EvaluationResult]:
+        """
+        Score clear-cut pairs from embedding similarity alone.
+
+        Student answers and any key answers not embedded before are embedded in one
+        call and compared with a single vectorized cosine. Key embeddings are kept
+        on their KeyAnswerContext for later pairs. Only pairs inside a confidence
+        band are returned; the rest are left for the LLM judge.
+
+        Returns:
+            Dict mapping 0-based pair index to its result
+        """
+        new_keys = list({id(c): c for c in contexts if c.embedding is None}.values())
+        try:
+            vectors = await self.embedding_service.embed(
+                [c.expected_answer for c in new_keys] + [p.student_answer for p in pairs]
+            )
+        except LLMServiceError:
+            logger.warning("Embedding tier unavailable, escalating all pairs to the LLM")
+            return {}
+
+        for context, vector in zip(new_keys, vectors):
+            context.embedding = vector
+        key_vectors = np.stack([c.embedding for c in contexts])
+        similarities = self.embedding_service.row_cosine(key_vectors, vectors[len(new_keys):])
+        resolved = {}
+        for i, similarity in enumerate(similarities.tolist()):
+            score = self._score_from_similarity(similarity)
+            if score is not None:
+                resolved[i] = EvaluationResult(
+                    score=score,
+                    justification=f"Scored from embedding similarity {similarity:.3f} without LLM review"
+                )
+        return resolved
+
+    def _rubric_result(self, pair: AnswerPair, context: KeyAnswerContext) -> EvaluationResult:
+        """Score a pair lexically against its key's keyword rubric."""
+        match = context.rubric.score(pair.student_answer)
+        justification = f"Keyword rubric: matched {len(match.matched)}/{len(pair.keywords)}"
+        if match.matched:
+            justification += f" ({', '.join(match.matched)})"
+        if match.missing:
+            justification += f"; missing: {', '.join(match.missing)}"
+        return EvaluationResult(score=match.score, justification=justification)
+
+    async def _evaluate_pairs(
+        self,
+        pairs: List[AnswerPair],
+        mode: EvaluationMode = EvaluationMode.SINGLE,
+        on_result: Optional[Callable[[int, EvaluationResult, Dict[str, Any]], None]] = None
+    ) -> Tuple[List[EvaluationResult], List[Dict[str, Any]]]:
+        """
+        Evaluate pairs concurrently, at most max_concurrency LLM calls at a time.
+
+        In batch mode several pairs share one call; pairs missing from a batch's
+        output fall back to their own call. In rubric mode pairs that carry keywords
+        are scored lexically and never reach the LLM. In cascade mode pairs whose
+        rubric score reaches RUBRIC_SKIP_LLM_SCORE, and then clear-cut pairs by
+        embedding similarity, are resolved first and only ambiguous pairs reach the
+        LLM. Key-specific work is shared through one KeyAnswerContext per distinct
+        key answer, and LLM calls for the same key are issued back to back so the
+        model can reuse the prompt prefix. Pairs left for the LLM that are identical
+        (after normalization) to an earlier one are answered from the evaluation
+        cache or evaluated once per request. Results keep the request order and a
+        failing pair only affects its own result.
+
+        Args:
+            pairs: Answer pairs to evaluate
+            mode: Evaluation mode
+            on_result: Optional callback receiving (0-based index, result, timing)
+                as soon as each pair is final, in completion order
+
+        Returns:
+            Tuple of (results, per-pair timings)
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        contexts = [get_key_context(p.expected_answer, tuple(p.keywords or ())) for p in pairs]
+        key_groups: Dict[int, int] = {}
+        for context in contexts:
+            key_groups.setdefault(id(context), len(key_groups) + 1)
+        timings = [
+            {"pair_index": i + 1, "tier": "llm", "key_group": key_groups[id(contexts[i])]}
+            for i in range(len(pairs))
+        ]
+        results: List[Optional[EvaluationResult]] = [None] * len(pairs)
+        pending = list(range(len(pairs)))
+        cache_keys: List[Optional[str]] = [None] * len(pairs)
+        followers: Dict[int, List[int]] = {}
+
+        def emit(i: int) -> None:
+            for j in [i, *followers.get(i, [])]:
+                if j != i:
+                    results[j] = results[i]
+                    timings[j].update({"tier": "cache", "duplicate_of": i + 1})
+                if on_result is not None:
+                    on_result(j, results[j], timings[j])
+
+        if mode in (EvaluationMode.RUBRIC, EvaluationMode.CASCADE):
+            unresolved = []
+            with tracer.span("evaluation.rubric", pairs=len(pending)):
+                for i in pending:
+                    result = self._rubric_result(pairs[i], contexts[i]) if contexts[i].rubric else None
+                    if result is None or (mode == EvaluationMode.CASCADE and result.score < settings.RUBRIC_SKIP_LLM_SCORE):
+                        unresolved.append(i)
+                        continue
+                    results[i] = result
+                    timings[i]["tier"] = "rubric"
+                    emit(i)
+            pending = unresolved
+
+        if mode == EvaluationMode.CASCADE and pending:
+            started_at = time.perf_counter()
+            with tracer.span("evaluation.embedding", pairs=len(pending)) as span:
+                resolved = await self._cascade_fast_path(
+                    [pairs[i] for i in pending],
+                    [contexts[i] for i in pending]
+                )
+                if span is not None:
+                    span.set(resolved=len(resolved))
+            elapsed_ms = round((time.perf_counter() - started_at) * 1000, 2)
+            for local_index, result in resolved.items():
+                i = pending[local_index]
+                results[i] = result
+                timings[i].update({"tier": "embedding", "total_ms": elapsed_ms})
+                emit(i)
+            pending = [i for local_index, i in enumerate(pending) if local_index not in resolved]
+
+        # Only pairs that still need the LLM may be answered with a cached LLM result
+        if settings.EVALUATION_CACHE_ENABLED and pending:
+            prompt = BATCH_EVALUATION_PROMPT if mode == EvaluationMode.BATCH else ANSWER_EVALUATION_PROMPT
+            leaders: Dict[str, int] = {}
+            uncached = []
+            with tracer.span("evaluation.cache_lookup", pairs=len(pending)):
+                for i in pending:
+                    key = evaluation_cache.make_normalized_key(
+                        contexts[i].normalized,
+                        normalize_answer(pairs[i].student_answer),
+                        prompt.cache_key,
+                        self.model
+                    )
+                    cache_keys[i] = key
+                    if key in leaders:
+                        # Identical answer already in this request
+                        followers.setdefault(leaders[key], []).append(i)
+                        continue
+                    leaders[key] = i
+                cached = await evaluation_cache.get_many(list(leaders))
+                for key, i in leaders.items():
+                    if key in cached:
+                        results[i] = cached[key]
+                        timings[i]["tier"] = "cache"
+                        emit(i)
+                    else:
+                        uncached.append(i)
+            pending = uncached
+
+        async def evaluate(i: int) -> None:
+            queued_at = time.perf_counter()
+            async with semaphore:
+                started_at = time.perf_counter()
+                logger.info(f"Processing pair {i + 1}/{len(pairs)}")
+                call_timing = {}
+                results[i] = await self._evaluate_single_answer(
+                    pairs[i],
+                    i + 1,
+                    call_timing,
+                    contexts[i].prompt(pairs[i].student_answer)
+                )
+
+            timings[i].update({
+                "queue_wait_ms": round((started_at - queued_at) * 1000 + call_timing.get("queue_wait_ms", 0), 2),
+                "inference_ms": call_timing.get("inference_ms", 0),
+                "total_ms": round((time.perf_counter() - queued_at) * 1000, 2)
+            })
+            emit(i)
+
+        async def evaluate_batch(indexes: List[int]) -> None:
+            queued_at = time.perf_counter()
+            async with semaphore:
+                started_at = time.perf_counter()
+                logger.info(f"Processing batch of {len(indexes)} pairs starting at {indexes[0] + 1}/{len(pairs)}")
+                call_timing = {}
+                batch_results = await self._evaluate_batch([pairs[i] for i in indexes], call_timing)
+
+            for i, result in zip(indexes, batch_results):
+                results[i] = result
+                timings[i].update({
+                    "queue_wait_ms": round((started_at - queued_at) * 1000 + call_timing.get("queue_wait_ms", 0), 2),
+                    # Each pair carries its share of the batch's single inference call
+                    "inference_ms": round(call_timing.get("inference_ms", 0) / len(indexes), 2),
+                    "total_ms": round((time.perf_counter() - queued_at) * 1000, 2),
+                    "batch_size": len(indexes)
+                })
+                if result is not None:
+                    emit(i)
+
+            fallback = [i for i in indexes if results[i] is None]
+            if fallback:
+                logger.warning("Falling back to per-pair evaluation", {
+                    "pairs": [i + 1 for i in fallback],
+                    "batch_size": len(indexes)
+                })
+                for i in fallback:
+                    timings[i]["fallback"] = True
+                await asyncio.gather(*(evaluate(i) for i in fallback))
+
+        # Same-key pairs go out together (and share batches) so prefixes are reused
+        pending.sort(key=lambda i: timings[i]["key_group"])
+        if mode == EvaluationMode.BATCH:
+            await asyncio.gather(*(
+                evaluate_batch([pending[i] for i in batch])
+                for batch in self._plan_batches([pairs[i] for i in pending])
+            ))
+        else:
+            await asyncio.gather(*(evaluate(i) for i in pending))
+
+        with tracer.span("evaluation.cache_store"):
+            fresh: Dict[str, EvaluationResult] = {}
+            for i in pending:
+                if not cache_keys[i] or results[i].justification.startswith("Error:"):
+                    continue
+                key = cache_keys[i]
+                if timings[i].get("fallback"):
+                    # Produced by the single-pair prompt, not the batch that failed
+                    key = evaluation_cache.make_normalized_key(
+                        contexts[i].normalized,
+                        normalize_answer(pairs[i].student_answer),
+                        ANSWER_EVALUATION_PROMPT.cache_key,
+                        self.model
+                    )
+                fresh[key] = results[i]
+            await evaluation_cache.set_many(fresh)
+
+        return results, timings
+
+    async def evaluate_pairs(
+        self,
+        pairs: List[AnswerPair],
+        mode: EvaluationMode = EvaluationMode.SINGLE
+    ) -> Tuple[List[EvaluationResult], List[Dict[str, Any]]]:
+        """
+        Evaluate a list of pairs without request validation or metadata.
+
+        Returns:
+            Tuple of (results, per-pair timings) in input order
+        """
+        return await self._evaluate_pairs(pairs, mode)
+
+    def _prepare_evaluation_metadata(
+        self,
+        request: AnswersEvaluationRequest,
+        results: List[EvaluationResult],
+        timings: List[Dict[str, Any]],
+        started_at: float,
+        usage: LLMUsage
+    ) -> Dict[str, Any]:
+        """Prepare the full response metadata: statistics, mode, cache, timing and LLM usage."""
+        metadata = self._prepare_response_metadata(results, request.number_of_pairs)
+        metadata["mode"] = request.mode.value
+        metadata["cache"] = evaluation_cache.stats()
+        metadata["timing"] = self._prepare_timing_metadata(
+            timings,
+            (time.perf_counter() - started_at) * 1000
+        )
+        metadata["llm_usage"] = usage.to_dict()
+        return metadata
+
     @log_async_function_call
     async def evaluate_answers(self, request: AnswersEvaluationRequest) -> Dict[str, Any]:
         """
@@ -138,17 +593,15 @@ Return the result in the following JSON format without prefixing with the word '
                 "number_of_pairs": request.number_of_pairs
             })
 
-            # Evaluate all answers
-            results = []
-            for i, pair in enumerate(request.answer_pairs, 1):
-                logger.info(f"Processing pair {i}/{request.number_of_pairs}")
-                result = await self._evaluate_single_answer(pair, i)
-                results.append(result)
+            # Evaluate all answers concurrently
+            started_at = time.perf_counter()
+            with llm_scheduler.track_usage() as usage:
+                results, timings = await self._evaluate_pairs(request.answer_pairs, request.mode)
 
             # Prepare response
             response = {
                 "results": results,
-                "metadata": self._prepare_response_metadata(results, request.number_of_pairs)
+                "metadata": self._prepare_evaluation_metadata(request, results, timings, started_at, usage)
             }
 
             logger.info("Answer evaluation completed", {
@@ -162,4 +615,103 @@ Return the result in the following JSON format without prefixing with the word '
             raise
         except Exception as e:
             logger.error(f"Error in answer evaluation: {str(e)}")
-            raise LLMServiceError(f"Answer evaluation failed: {str(e)}")
\ No newline at end of file
+            raise LLMServiceError(f"Answer evaluation failed: {str(e)}")
+
+    @log_async_function_call
+    async def evaluate_groups(self, request: GroupedEvaluationRequest) -> Dict[str, Any]:
+        """
+        Evaluate many student answers per key answer.
+
+        Each group's key answer is sent and processed once; its student answers are
+        graded as pairs sharing that key's context.
+
+        Returns:
+            Dict with one entry per group (question_id and results in input order)
+            and the same metadata as evaluate_answers
+        """
+        pairs = [
+            AnswerPair(
+                expected_answer=group.expected_answer,
+                student_answer=student_answer,
+                keywords=group.keywords
+            )
+            for group in request.groups
+            for student_answer in group.student_answers
+        ]
+        response = await self.evaluate_answers(AnswersEvaluationRequest(
+            number_of_pairs=len(pairs),
+            answer_pairs=pairs,
+            mode=request.mode
+        ))
+
+        groups, offset = [], 0
+        for group in request.groups:
+            groups.append({
+                "question_id": group.question_id,
+                "results": response["results"][offset:offset + len(group.student_answers)]
+            })
+            offset += len(group.student_answers)
+        return {"groups": groups, "metadata": response["metadata"]}
+
+    def stream_answers(self, request: AnswersEvaluationRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Evaluate answer pairs, yielding each result as soon as it is final.
+
+        The request is validated before the stream is returned, so validation
+        errors surface before any output is sent.
+
+        Yields:
+            One ``result`` record per pair in completion order (with its 1-based
+            ``pair_index``), then a final ``summary`` record with the metadata
+            returned by evaluate_answers. A failure after streaming has started
+            is reported as an ``error`` record.
+
+        Raises:
+            ValidationError: If the request is invalid
+        """
+        self._validate_request(request)
+        return self._stream_answers(request)
+
+    async def _stream_answers(self, request: AnswersEvaluationRequest) -> AsyncIterator[Dict[str, Any]]:
+        finished: asyncio.Queue = asyncio.Queue()
+
+        def on_result(i: int, result: EvaluationResult, timing: Dict[str, Any]) -> None:
+            finished.put_nowait({
+                "event": "result",
+                "pair_index": i + 1,
+                "score": result.score,
+                "justification": result.justification,
+                "tier": timing["tier"]
+            })
+
+        logger.info("Starting streamed answer evaluation", {
+            "number_of_pairs": request.number_of_pairs,
+            "mode": request.mode.value
+        })
+
+        started_at = time.perf_counter()
+        with llm_scheduler.track_usage() as usage:
+            task = asyncio.create_task(self._evaluate_pairs(request.answer_pairs, request.mode, on_result))
+        task.add_done_callback(lambda _: finished.put_nowait(None))
+        try:
+            while True:
+                record = await finished.get()
+                if record is None:
+                    break
+                yield record
+
+            try:
+                results, timings = task.result()
+            except Exception as e:
+                logger.error(f"Error in streamed answer evaluation: {str(e)}")
+                yield {"event": "error", "error": f"Answer evaluation failed: {str(e)}"}
+                return
+
+            yield {
+                "event": "summary",
+                "metadata": self._prepare_evaluation_metadata(request, results, timings, started_at, usage)
+            }
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
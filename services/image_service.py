@@ -1,6 +1,7 @@
 # src/services/image_service.py
 from typing import List, Optional
 from utils.logger import logger, log_async_function_call
+from utils.tracing import tracer
 from utils.exceptions import ImageProcessingError
 from utils.helpers import encode_image, get_image_paths
 from services.llm_service import LLMService
@@ -11,6 +12,7 @@ class ImageService:
         self.llm_service = LLMService()
 
     @log_async_function_call
+    @tracer.traced("image.chapter_content")
     async def get_chapter_content(
         self,
         standard: str,
@@ -22,12 +24,13 @@ class ImageService:
         """
         try:
             # Get image paths
-            image_paths = get_image_paths(
-                settings.IMAGE_INDEX_DIR,
-                standard=standard,
-                subject=subject,
-                chapter=chapter
-            )
+            with tracer.span("image.scan"):
+                image_paths = get_image_paths(
+                    settings.IMAGE_INDEX_DIR,
+                    standard=standard,
+                    subject=subject,
+                    chapter=chapter
+                )
 
             if not image_paths:
                 logger.error("No images found", {
@@ -59,13 +62,15 @@ class ImageService:
             raise
 
     @log_async_function_call
+    @tracer.traced("image.process")
     async def _process_single_image(self, image_path: str) -> Optional[str]:
         """
         Process a single image to extract content.
         """
         try:
             # Encode image
-            image_base64 = encode_image(image_path)
+            with tracer.span("image.encode"):
+                image_base64 = encode_image(image_path)
             if not image_base64:
                 return None
 
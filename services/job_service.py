@@ -0,0 +1,330 @@
+# src/services/job_service.py
+import asyncio
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+from config.settings import settings
+from models.job_models import JobResponse, JobStatus
+from utils.logger import log_route_var, logger
+from utils.tracing import tracer
+
+JobHandler = Callable[[Dict[str, Any], Callable[[Dict[str, Any]], None]], Awaitable[Dict[str, Any]]]
+
+
+class JobService:
+    """
+    In-process background job runner with a persistent job table.
+
+    Jobs are stored in SQLite so their status survives restarts and can be polled
+    cheaply. A fixed pool of asyncio workers picks queued jobs and runs the handler
+    registered for the job's kind.
+
+    Several processes (uvicorn workers) may share the table. A job is claimed
+    atomically when it moves from queued to running, so each job runs once, and
+    the claiming process records its pid as the job's owner. Progress and the
+    final status are only written while the job is still running for its owner,
+    so a job cancelled by another process stays cancelled; the owner notices the
+    cancel on its next progress report or within JOB_CANCEL_POLL_INTERVAL and
+    stops the job. On startup, running jobs whose owner process is gone are
+    queued again.
+    """
+    def __init__(self, db_path: Path, workers: int):
+        self.db_path = Path(db_path)
+        self.workers = workers
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested = set()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def register_handler(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine that runs jobs of the given kind."""
+        self._handlers[kind] = handler
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    progress TEXT NOT NULL DEFAULT '{}',
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    owner_pid INTEGER
+                )
+            """)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "owner_pid" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+            self._conn.commit()
+        return self._conn
+
+    def _update(self, job_id: str, owned: bool = False, **fields: Any) -> bool:
+        """
+        Update a job's columns.
+
+        With ``owned`` the update only applies while the job is running for this
+        process. Returns whether the row was updated.
+        """
+        fields["updated_at"] = datetime.utcnow().isoformat()
+        for key in ("progress", "result"):
+            if key in fields and fields[key] is not None:
+                fields[key] = json.dumps(fields[key], default=str)
+        if "status" in fields:
+            fields["status"] = JobStatus(fields["status"]).value
+
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        query = f"UPDATE jobs SET {assignments} WHERE job_id = ?"
+        params = [*fields.values(), job_id]
+        if owned:
+            query += " AND status = ? AND owner_pid = ?"
+            params += [JobStatus.RUNNING.value, os.getpid()]
+        conn = self._connect()
+        cursor = conn.execute(query, params)
+        conn.commit()
+        return cursor.rowcount == 1
+
+    def _owns(self, job_id: str) -> bool:
+        """Whether the job is still running for this process."""
+        row = self._connect().execute(
+            "SELECT 1 FROM jobs WHERE job_id = ? AND status = ? AND owner_pid = ?",
+            (job_id, JobStatus.RUNNING.value, os.getpid())
+        ).fetchone()
+        return row is not None
+
+    def _row_to_response(self, row: sqlite3.Row) -> JobResponse:
+        return JobResponse(
+            job_id=row["job_id"],
+            kind=row["kind"],
+            status=row["status"],
+            progress=json.loads(row["progress"]),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
+
+    @staticmethod
+    def _owner_alive(pid: Optional[int]) -> bool:
+        """Whether the process that claimed a job may still be running it."""
+        if pid is None or pid == os.getpid():
+            # Before our workers start, none of our own jobs can be running
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _requeue_stale(self) -> int:
+        """Queue again the running jobs whose owner process is gone."""
+        conn = self._connect()
+        running = conn.execute(
+            "SELECT job_id, owner_pid FROM jobs WHERE status = ?", (JobStatus.RUNNING.value,)
+        ).fetchall()
+        requeued = 0
+        for row in running:
+            if self._owner_alive(row["owner_pid"]):
+                continue
+            # Conditional on the owner, so only one process requeues the job
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, owner_pid = NULL, updated_at = ? "
+                "WHERE job_id = ? AND status = ? AND owner_pid IS ?",
+                (JobStatus.QUEUED.value, datetime.utcnow().isoformat(), row["job_id"],
+                 JobStatus.RUNNING.value, row["owner_pid"])
+            )
+            requeued += cursor.rowcount
+        conn.commit()
+        return requeued
+
+    def _claim(self, job_id: str) -> bool:
+        """Atomically move a queued job to running for this process."""
+        conn = self._connect()
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, owner_pid = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+            (JobStatus.RUNNING.value, os.getpid(), datetime.utcnow().isoformat(), job_id, JobStatus.QUEUED.value)
+        )
+        conn.commit()
+        return cursor.rowcount == 1
+
+    async def start(self) -> None:
+        """Start the worker pool and queue the pending jobs, including stale running ones."""
+        if self._worker_tasks:
+            return
+
+        self._queue = asyncio.Queue()
+        requeued = self._requeue_stale()
+        # Other processes may queue the same jobs; whoever claims one first runs it
+        pending = self._connect().execute(
+            "SELECT job_id FROM jobs WHERE status = ? ORDER BY created_at", (JobStatus.QUEUED.value,)
+        ).fetchall()
+        for row in pending:
+            self._queue.put_nowait(row["job_id"])
+
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info("Job workers started", {
+            "workers": self.workers,
+            "queued_jobs": len(pending),
+            "requeued_jobs": requeued
+        })
+
+    async def stop(self) -> None:
+        """Stop the worker pool; its running jobs are requeued on the next start."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> JobResponse:
+        """Persist a new job and queue it for the worker pool."""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+
+        job_id = str(uuid4())
+        now = datetime.utcnow().isoformat()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO jobs (job_id, kind, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, JobStatus.QUEUED.value, json.dumps(payload, default=str), now, now)
+        )
+        conn.commit()
+
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+        logger.info("Job submitted", {"job_id": job_id, "kind": kind})
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[JobResponse]:
+        """Get the current state of a job."""
+        row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_response(row) if row else None
+
+    def get_payload(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get the payload a job was submitted with."""
+        row = self._connect().execute("SELECT payload FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def cancel(self, job_id: str) -> Optional[JobResponse]:
+        """
+        Cancel a queued or running job. Finished jobs are returned unchanged.
+
+        A job running in another process is stopped by its owner once it sees
+        the cancelled status.
+        """
+        conn = self._connect()
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status IN (?, ?)",
+            (JobStatus.CANCELLED.value, datetime.utcnow().isoformat(), job_id,
+             JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+        )
+        conn.commit()
+        if cursor.rowcount:
+            self._stop_task(job_id)
+            logger.info("Job cancelled", {"job_id": job_id})
+        return self.get(job_id)
+
+    def _stop_task(self, job_id: str) -> None:
+        """Cancel this process's task for a job that is no longer ours to run."""
+        task = self._running.get(job_id)
+        if task is not None and not task.done():
+            self._cancel_requested.add(job_id)
+            task.cancel()
+
+    async def _watch_cancel(self, job_id: str) -> None:
+        """Stop a running job once it has been cancelled in the table, e.g. by another process."""
+        while True:
+            await asyncio.sleep(settings.JOB_CANCEL_POLL_INTERVAL)
+            if not self._owns(job_id):
+                self._stop_task(job_id)
+                return
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run_handler(self, job_id: str, kind: str, handler: JobHandler, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a job's handler inside its own trace and log route."""
+        log_route_var.set(f"job:{kind}")
+        def report(progress: Dict[str, Any]) -> None:
+            if not self._update(job_id, owned=True, progress=progress):
+                # Cancelled elsewhere: the handler stops at its next await
+                self._stop_task(job_id)
+
+        with tracer.trace(f"job.{kind}", job_id=job_id):
+            return await handler(payload, report)
+
+    async def _run_job(self, job_id: str) -> None:
+        if not self._claim(job_id):
+            # Already claimed by another worker or process, or cancelled
+            return
+        row = self._connect().execute("SELECT kind, payload FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+        handler = self._handlers.get(row["kind"])
+        if handler is None:
+            self._update(job_id, owned=True, status=JobStatus.FAILED, error=f"Unknown job kind '{row['kind']}'")
+            return
+
+        task = asyncio.create_task(self._run_handler(job_id, row["kind"], handler, json.loads(row["payload"])))
+        self._running[job_id] = task
+        watcher = asyncio.create_task(self._watch_cancel(job_id))
+
+        try:
+            result = await asyncio.wait_for(task, timeout=settings.JOB_TIMEOUT)
+            if self._update(job_id, owned=True, status=JobStatus.COMPLETED, result=result):
+                logger.info("Job completed", {"job_id": job_id, "kind": row["kind"]})
+            else:
+                logger.info("Job finished after it was cancelled; result discarded", {
+                    "job_id": job_id,
+                    "kind": row["kind"]
+                })
+
+        except asyncio.CancelledError:
+            if job_id not in self._cancel_requested:
+                # Worker shutdown: leave the job running so it is requeued on restart
+                raise
+            self._cancel_requested.discard(job_id)
+
+        except asyncio.TimeoutError:
+            self._update(job_id, owned=True, status=JobStatus.FAILED, error=f"Job exceeded {settings.JOB_TIMEOUT}s timeout")
+            logger.error("Job timed out", {"job_id": job_id, "kind": row["kind"]})
+
+        except Exception as e:
+            self._update(job_id, owned=True, status=JobStatus.FAILED, error=str(e))
+            logger.error("Job failed", {
+                "job_id": job_id,
+                "kind": row["kind"],
+                "error": str(e),
+                "error_type": type(e).__name__
+            })
+
+        finally:
+            watcher.cancel()
+            self._running.pop(job_id, None)
+
+
+job_service = JobService(settings.JOB_DB_PATH, settings.JOB_WORKERS)
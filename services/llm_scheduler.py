@@ -0,0 +1,222 @@
+# src/services/llm_scheduler.py
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import ollama
+from config.settings import settings
+from utils.metrics import metrics
+from utils.tracing import tracer
+
+
+class LLMUsage:
+    """
+    Ollama's reported token counts and timings summed over calls.
+
+    Durations are reported by Ollama in nanoseconds and kept in milliseconds.
+    A call counts as a cold load when loading the model took at least
+    LLM_COLD_LOAD_THRESHOLD_MS. Usage added to a nested accumulator is also
+    added to its parent, so a request's total includes every sub-task.
+    """
+    DURATIONS = ("prompt_eval_duration", "eval_duration", "load_duration", "total_duration")
+
+    def __init__(self, parent: Optional["LLMUsage"] = None):
+        self.parent = parent
+        self.calls = 0
+        self.cold_loads = 0
+        self.prompt_tokens = 0
+        self.generated_tokens = 0
+        self.durations_ms = {name: 0.0 for name in self.DURATIONS}
+
+    def add(self, stats: Dict[str, Any]) -> None:
+        usage: Optional[LLMUsage] = self
+        while usage is not None:
+            usage.calls += 1
+            usage.prompt_tokens += stats.get("prompt_eval_count") or 0
+            usage.generated_tokens += stats.get("eval_count") or 0
+            for name in self.DURATIONS:
+                usage.durations_ms[name] += (stats.get(name) or 0) / 1e6
+            if (stats.get("load_duration") or 0) / 1e6 >= settings.LLM_COLD_LOAD_THRESHOLD_MS:
+                usage.cold_loads += 1
+            usage = usage.parent
+
+    def to_dict(self) -> Dict[str, Any]:
+        prompt_ms = self.durations_ms["prompt_eval_duration"]
+        eval_ms = self.durations_ms["eval_duration"]
+        return {
+            "calls": self.calls,
+            "cold_loads": self.cold_loads,
+            "prompt_tokens": self.prompt_tokens,
+            "generated_tokens": self.generated_tokens,
+            "prompt_eval_ms": round(prompt_ms, 2),
+            "eval_ms": round(eval_ms, 2),
+            "load_ms": round(self.durations_ms["load_duration"], 2),
+            "total_ms": round(self.durations_ms["total_duration"], 2),
+            "prompt_tokens_per_second": round(self.prompt_tokens / prompt_ms * 1000, 2) if prompt_ms else None,
+            "generated_tokens_per_second": round(self.generated_tokens / eval_ms * 1000, 2) if eval_ms else None
+        }
+
+
+_current_usage: ContextVar[Optional[LLMUsage]] = ContextVar("llm_usage", default=None)
+
+
+class LLMScheduler:
+    """
+    Process-wide gate for every call to the local LLM.
+
+    The ollama client is synchronous, so each call runs in a worker thread to
+    keep the event loop free. A shared semaphore bounds how many calls are sent
+    to Ollama at once, no matter which service or job issued them.
+
+    ``client`` is the module (or any object with ``chat`` and ``embed``) that
+    serves the calls; benchmarks swap in a stub backend here.
+    """
+    def __init__(self, max_concurrency: int, client: Any = ollama):
+        self.max_concurrency = max_concurrency
+        self.client = client
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.in_flight = 0
+        self.model_usage: Dict[str, LLMUsage] = {}
+
+    @contextmanager
+    def track_usage(self) -> Iterator[LLMUsage]:
+        """
+        Sum the usage of every LLM call made inside the block.
+
+        The accumulator lives in a context variable, so calls from tasks created
+        inside the block (``gather``, ``create_task``) are counted too, even when
+        they finish after the block exits.
+        """
+        usage = LLMUsage(parent=_current_usage.get())
+        token = _current_usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _current_usage.reset(token)
+
+    async def chat(self, task: str = "other", **kwargs: Any) -> Dict[str, Any]:
+        """Run ``chat`` on the client once a slot is free and return its response."""
+        response, _ = await self.chat_timed(task, **kwargs)
+        return response
+
+    async def chat_timed(self, task: str = "other", **kwargs: Any) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Run ``chat`` on the client once a slot is free.
+
+        Args:
+            task: What the call is for; used as the metrics label
+
+        Returns:
+            Tuple of the response and its timing: milliseconds spent waiting for
+            a slot (queue_wait_ms), in the call (inference_ms) and loading the
+            model (load_ms), plus Ollama's prompt_tokens and generated_tokens
+        """
+        return await self._run(self.client.chat, task, **kwargs)
+
+    async def embed(self, task: str = "embedding", **kwargs: Any) -> Dict[str, Any]:
+        """Run ``embed`` on the client once a slot is free and return its response."""
+        response, _ = await self._run(self.client.embed, task, **kwargs)
+        return response
+
+    async def _run(self, call: Callable[..., Any], task: str, **kwargs: Any) -> Tuple[Any, Dict[str, float]]:
+        with tracer.span(f"llm.{task}", model=kwargs.get("model", "unknown")) as span:
+            response, timing = await self._call(call, task, **kwargs)
+            if span is not None:
+                span.set(**timing)
+            return response, timing
+
+    async def _call(self, call: Callable[..., Any], task: str, **kwargs: Any) -> Tuple[Any, Dict[str, float]]:
+        # Keep the model resident so its prompt cache survives between calls
+        kwargs.setdefault("keep_alive", settings.LLM_KEEP_ALIVE)
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        self.in_flight += 1
+        model = kwargs.get("model", "unknown")
+        metrics.observe("llm_queue_wait_seconds", started_at - queued_at, task=task)
+
+        def release(_: asyncio.Future) -> None:
+            self.in_flight -= 1
+            self._semaphore.release()
+            metrics.observe("llm_request_duration_seconds", time.perf_counter() - started_at, task=task, model=model)
+
+        # A cancelled caller (job cancel, request timeout) cannot stop the thread,
+        # so the slot is only released once the backend call has really finished
+        future = asyncio.ensure_future(asyncio.to_thread(call, **kwargs))
+        future.add_done_callback(release)
+        try:
+            response = await asyncio.shield(future)
+        except Exception:
+            metrics.inc("llm_requests_total", task=task, model=model, outcome="error")
+            raise
+
+        metrics.inc("llm_requests_total", task=task, model=model, outcome="ok")
+        stats = self._record_usage(response, model)
+        return response, {
+            "queue_wait_ms": round((started_at - queued_at) * 1000, 2),
+            "inference_ms": round((time.perf_counter() - started_at) * 1000, 2),
+            "prompt_tokens": stats["prompt_eval_count"] or 0,
+            "generated_tokens": stats["eval_count"] or 0,
+            "load_ms": round((stats["load_duration"] or 0) / 1e6, 2)
+        }
+
+    def _record_usage(self, response: Any, model: str) -> Dict[str, Any]:
+        """
+        Capture Ollama's reported token counts and timings for one call.
+
+        They are added to the metrics, the model's running totals and the
+        usage accumulator of the current request, if any.
+        """
+        def field(name: str) -> Any:
+            return response.get(name) if isinstance(response, dict) else getattr(response, name, None)
+
+        stats = {name: field(name) for name in ("prompt_eval_count", "eval_count", *LLMUsage.DURATIONS)}
+        prompt_tokens, generated_tokens, eval_duration = (
+            stats["prompt_eval_count"], stats["eval_count"], stats["eval_duration"]
+        )
+        if prompt_tokens:
+            metrics.inc("llm_prompt_tokens_total", prompt_tokens, model=model)
+        if stats["prompt_eval_duration"]:
+            metrics.inc("llm_prompt_eval_seconds_total", stats["prompt_eval_duration"] / 1e9, model=model)
+        if stats["load_duration"]:
+            metrics.inc("llm_load_seconds_total", stats["load_duration"] / 1e9, model=model)
+        if generated_tokens and eval_duration:
+            metrics.inc("llm_generated_tokens_total", generated_tokens, model=model)
+            metrics.inc("llm_generation_seconds_total", eval_duration / 1e9, model=model)
+
+        self.model_usage.setdefault(model, LLMUsage()).add(stats)
+        usage = _current_usage.get()
+        if usage is not None:
+            usage.add(stats)
+        return stats
+
+    def status(self) -> Dict[str, Any]:
+        """Get the current queue depth, in-flight count and per-model usage since start."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "models": {model: usage.to_dict() for model, usage in self.model_usage.items()}
+        }
+
+
+llm_scheduler = LLMScheduler(settings.LLM_MAX_CONCURRENCY)
+
+metrics.gauge(
+    "llm_queue_waiting",
+    "LLM calls waiting for a scheduler slot",
+    lambda: {(): float(llm_scheduler.waiting)}
+)
+metrics.gauge(
+    "llm_in_flight",
+    "LLM calls currently running",
+    lambda: {(): float(llm_scheduler.in_flight)}
+)
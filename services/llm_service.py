@@ -1,8 +1,9 @@
 # src/services/llm_service.py
-import ollama
 from typing import List, Dict, Any, Optional
 from config.settings import settings
 from utils.logger import logger, log_async_function_call
+from utils.tracing import tracer
+from services.llm_scheduler import llm_scheduler
 from utils.exceptions import LLMServiceError
 
 class LLMService:
@@ -11,6 +12,7 @@ class LLMService:
         self.max_retries = settings.MAX_RETRIES
 
     @log_async_function_call
+    @tracer.traced("llm_service.generate_response")
     async def generate_response(
         self,
         messages: List[Dict[str, str]],
@@ -20,7 +22,8 @@ class LLMService:
         Generate response from the LLM model.
         """
         try:
-            response = ollama.chat(
+            response = await llm_scheduler.chat(
+                task="generate_response",
                 model=self.model,
                 messages=messages,
                 options={
@@ -40,6 +43,7 @@ class LLMService:
             raise LLMServiceError(f"Failed to generate LLM response: {str(e)}")
 
     @log_async_function_call
+    @tracer.traced("llm_service.process_image")
     async def process_image(
         self,
         image_base64: str,
@@ -49,7 +53,8 @@ class LLMService:
         Process image using the vision model.
         """
         try:
-            response = ollama.chat(
+            response = await llm_scheduler.chat(
+                task="image_processing",
                 model=self.model,
                 messages=[{
                     'role': 'user',
@@ -1,111 +1,57 @@
 # src/services/question_service.py
-import datetime
-from typing import List, Dict, Any
-import ollama
+from datetime import datetime
+from typing import List, Dict, Any, Tuple, Optional, Callable
 import json
 from config import settings
 from models.question_models import QuestionRequest, QuestionResponse, QuestionType
 from utils.logger import logger, log_async_function_call
+from utils.tracing import tracer
+from services.llm_scheduler import llm_scheduler
 from utils.exceptions import ValidationError, QuestionGenerationError
 from utils.helpers import encode_image_to_base64, get_images
+from utils.allocation import allocate_matrix
+from utils.prompts import QUESTION_GENERATION_PROMPT
+from services.dedup_service import DedupService
 
 class QuestionService:
     def __init__(self):
         self.model = settings.LLM_MODEL
+        self.dedup_service = DedupService()
 
-    def _generate_prompt(
-        self, 
-        question_type: str, 
-        count: int, 
+    def _build_messages(
+        self,
+        context: str,
+        question_type: str,
+        count: int,
+        request: QuestionRequest,
         difficulty_level: str,
-        language: str, 
-        syllabus: str, 
-        standard: str, 
-        subject: str,
-        chapter: str, 
-        topic: str = None
-    ) -> str:
-        """Generate prompt for question generation."""
-        prompt = f"""
-        Generate EXACTLY {count} NEW {question_type} questions for {syllabus} {standard} {subject} at {difficulty_level} level.
-
-        Chapter: {chapter}
-        {f'Topic: {topic}' if topic else 'Scope: Entire chapter'}
-
-        CRITICAL REQUIREMENTS:
-        1. Generate EXACTLY {count} questions - no more, no less
-        2. Each question must include all required fields
-        3. All content must be in {language}
-        """
+        exclude_questions: List[str] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for one bucket from the registered prompt template."""
+        exclusions = ""
+        if exclude_questions:
+            exclusions = "Do NOT repeat or paraphrase any of these existing questions:\n" + "\n".join(
+                f"- {text}" for text in exclude_questions
+            )
 
-        if question_type == QuestionType.MCQ.value:
-            prompt += """
-            Requirements:
-            - Include clear and unambiguous question text
-            - EXACTLY 4 options per question
-            - Only ONE correct answer
-            - All options must be plausible and related to the topic
-            Format:
-            {
-                "type": "Multiple Choice",
-                "difficulty": "Easy/Medium/Hard",
-                "question": "Question text",
-                "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
-                "correct_answer": "Correct option"
-            }
-            """
-        elif question_type == QuestionType.MSQ.value:
-            prompt += """
-            Requirements:
-            - Include clear question text indicating multiple selections
-            - EXACTLY 4 options per question
-            - EXACTLY 2 correct answers
-            - All options must be plausible and related to the topic
-            Format:
-            {
-                "type": "Multiple Select",
-                "difficulty": "Easy/Medium/Hard",
-                "question": "Question text",
-                "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
-                "correct_answers": ["Correct option 1", "Correct option 2"]
-            }
-            """
-        elif question_type == QuestionType.SDQ.value:
-            prompt += """
-            Requirements:
-            - Questions should require 1-2 sentence answers
-            - Include 3-5 relevant keywords
-            - Answers should be concise and focused
-            Format:
-            {
-                "type": "Short Descriptive Answer",
-                "difficulty": "Easy/Medium/Hard",
-                "question": "Question text",
-                "answer": "1-2 sentence answer",
-                "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5"]
-            }
-            """
-        else:  # Long Descriptive
-            prompt += """
-            Requirements:
-            - Questions should require detailed explanations
-            - Include 5-7 relevant keywords
-            - Answers should be comprehensive paragraphs
-            Format:
-            {
-                "type": "Long Descriptive Answer",
-                "difficulty": "Easy/Medium/Hard",
-                "question": "Question text",
-                "answer": "Detailed paragraph answer",
-                "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5", "keyword6", "keyword7"]
-            }
-            """
-
-        return prompt
+        return QUESTION_GENERATION_PROMPT.messages(
+            context=context.strip(),
+            count=count,
+            question_type=question_type,
+            difficulty_level=difficulty_level,
+            syllabus=request.syllabus,
+            standard=request.standard,
+            subject=request.subject,
+            chapter=request.chapter,
+            scope=f"Topic: {request.topic}" if request.topic else "Scope: Entire chapter",
+            language=request.language,
+            exclusions=exclusions
+        )
 
     async def _get_image_context(self, image_data: str) -> str:
         """Extract context from image using vision model."""
-        response = ollama.chat(
+        response = await llm_scheduler.chat(
+            task="image_context",
             model=self.model,
             messages=[{
                 'role': 'user',
@@ -121,134 +67,320 @@ class QuestionService:
         question_type: str,
         count: int,
         request: QuestionRequest,
-        difficulty_level: str
+        difficulty_level: str,
+        exclude_questions: List[str] = None
     ) -> List[Dict]:
         """Generate questions for a specific type and difficulty."""
-        prompt = self._generate_prompt(
-            question_type,
-            count,
-            difficulty_level,
-            request.language,
-            request.syllabus,
-            request.standard,
-            request.subject,
-            request.chapter,
-            request.topic
-        )
-
-        response = ollama.chat(
+        response = await llm_scheduler.chat(
+            task="question_generation",
             model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"You are an expert in creating {question_type} questions at {difficulty_level} level. Generate EXACTLY {count} questions in proper JSON format."
-                },
-                {
-                    "role": "user",
-                    "content": f"{prompt}\n\nContext:\n{context}"
-                }
-            ]
+            messages=self._build_messages(
+                context,
+                question_type,
+                count,
+                request,
+                difficulty_level,
+                exclude_questions
+            )
         )
 
         try:
-            content = response.get('message', {}).get('content', '').strip()
-            questions = json.loads(content)
-            if isinstance(questions, dict):
-                questions = questions.get('questions', [])
-            return [q for q in questions if q.get('type') == question_type]
+            with tracer.span("question.parse"):
+                content = response.get('message', {}).get('content', '').strip()
+                questions = json.loads(content)
+                if isinstance(questions, dict):
+                    questions = questions.get('questions', [])
+                return [q for q in questions if q.get('type') == question_type]
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing response: {str(e)}")
             return []
-    def calculate_difficulty_distribution(self, total_type_questions: int, request: QuestionRequest) -> Dict[str, int]:
+
+    def plan_allocation(self, request: QuestionRequest) -> Dict[str, Dict[str, int]]:
         """
-        Calculate how many questions of each difficulty level to generate for a specific question type.
-        
+        Allocate questions over the type x difficulty matrix for the whole paper.
+
+        The allocation matches both the question distribution (per type) and the
+        difficulty distribution (per difficulty) exactly, so a run can never end
+        in a count mismatch because of rounding.
+
         Args:
-            total_type_questions: Total number of questions needed for this type
-            request: QuestionRequest containing the overall difficulty distribution
-            
+            request: QuestionRequest containing both distributions
+
         Returns:
-            Dict[str, int]: Distribution of questions by difficulty level
+            Dict[str, Dict[str, int]]: Question count keyed by type then difficulty
         """
-        # Get the global difficulty distribution totals
-        total_questions = request.difficulty_distribution.total_questions()
-        total_easy = request.difficulty_distribution.easy
-        total_medium = request.difficulty_distribution.medium
-        total_hard = request.difficulty_distribution.hard
-        
-        logger.info(f"Calculating distribution for {total_type_questions} questions", {
-            "total_questions": total_questions,
-            "requested_distribution": {
-                "easy": total_easy,
-                "medium": total_medium,
-                "hard": total_hard
-            }
+        type_totals = {
+            QuestionType.MCQ.value: request.question_distribution.multiple_choice,
+            QuestionType.MSQ.value: request.question_distribution.multiple_select,
+            QuestionType.SDQ.value: request.question_distribution.short_descriptive,
+            QuestionType.LDQ.value: request.question_distribution.long_descriptive
+        }
+        difficulty_totals = {
+            "Easy": request.difficulty_distribution.easy,
+            "Medium": request.difficulty_distribution.medium,
+            "Hard": request.difficulty_distribution.hard
+        }
+
+        try:
+            allocation = allocate_matrix(type_totals, difficulty_totals)
+        except ValueError as e:
+            raise ValidationError(
+                "Distribution mismatch",
+                details=[str(e)]
+            )
+
+        logger.info("Calculated allocation", {
+            "request_id": request.request_id,
+            "allocation": allocation
         })
+        return allocation
 
-        # Initialize distribution with floor values
-        distribution = {
-            "Easy": (total_easy * total_type_questions) // total_questions,
-            "Medium": (total_medium * total_type_questions) // total_questions,
-            "Hard": (total_hard * total_type_questions) // total_questions
-        }
-        
-        # Calculate remaining questions to distribute
-        allocated = sum(distribution.values())
-        remaining = total_type_questions - allocated
+    async def _deduplicate_questions(
+        self,
+        questions: List[Dict],
+        slot_buckets: List[Tuple[str, str]],
+        context: str,
+        request: QuestionRequest
+    ) -> List[Dict]:
+        """
+        Remove near-duplicate questions and regenerate only the removed slots.
+
+        Duplicates are detected across the whole paper and, when the request asks
+        for it, against the chapter's question history. Each removed slot keeps its
+        position and is refilled from its own (type, difficulty) bucket.
+        """
+        with tracer.span("question.dedup_scan", questions=len(questions)):
+            history = self.dedup_service.load_history(request) if request.avoid_history else None
+            duplicates = self.dedup_service.find_duplicates(questions, history)
+        if not duplicates:
+            return questions
+
+        logger.info("Duplicate questions detected", {
+            "request_id": request.request_id,
+            "duplicate_slots": duplicates
+        })
+
+        slots = self.dedup_service.plan_replacements(slot_buckets, duplicates)
+        filled = {idx: q for idx, q in enumerate(questions) if idx not in duplicates}
+
+        for _ in range(settings.DEDUP_MAX_REPLACEMENT_ROUNDS):
+            if not slots:
+                break
+
+            pending = {}
+            for (q_type, difficulty), indexes in slots.items():
+                accepted = [filled[idx] for idx in sorted(filled)]
+                candidates = await self._generate_questions_for_type(
+                    context,
+                    q_type,
+                    len(indexes),
+                    request,
+                    difficulty,
+                    exclude_questions=[q.get("question", "") for q in accepted]
+                )
+                rejected = set(self.dedup_service.find_duplicates(
+                    accepted + candidates,
+                    history,
+                    protected=len(accepted)
+                ))
+                unique = [q for offset, q in enumerate(candidates) if len(accepted) + offset not in rejected]
+
+                for idx, question in zip(indexes, unique):
+                    filled[idx] = question
+                if len(unique) < len(indexes):
+                    pending[(q_type, difficulty)] = indexes[len(unique):]
+
+            slots = pending
+
+        if slots:
+            raise QuestionGenerationError(
+                "Could not replace duplicate questions",
+                details=[
+                    f"{len(indexes)} {difficulty} {q_type} slot(s) still duplicated"
+                    for (q_type, difficulty), indexes in slots.items()
+                ]
+            )
+
+        return [filled[idx] for idx in range(len(questions))]
+
+    def plan_buckets(self, request: QuestionRequest) -> List[Tuple[str, str, int]]:
+        """
+        Plan the (type, difficulty, count) buckets that make up a paper.
+
+        Each bucket is generated with one LLM call, so the plan doubles as the unit
+        of progress reporting for background jobs.
+        """
+        return [
+            (q_type, difficulty, count)
+            for q_type, difficulties in self.plan_allocation(request).items()
+            for difficulty, count in difficulties.items()
+            if count > 0
+        ]
+
+    async def get_chapter_context(
+        self,
+        request: QuestionRequest,
+        on_image_processed: Optional[Callable[[int, int], None]] = None
+    ) -> str:
+        """
+        Extract the chapter context from its page images with the vision model.
+
+        Args:
+            request: QuestionRequest identifying the chapter
+            on_image_processed: Optional callable receiving (processed, total) after each image
+
+        Returns:
+            str: Accumulated context for the chapter
+        """
+        # Get image paths
+        base_path = f"/Users/developer/Desktop/que/Root/Pdf/{request.language}/Teacher/{request.syllabus}/{request.standard}/{request.subject}/{request.chapter}"
+        with tracer.span("question.scan_images") as span:
+            image_paths = get_images(base_path, [".png", ".jpg", ".jpeg"])
+            if span is not None:
+                span.set(images=len(image_paths))
+
+        if not image_paths:
+            raise QuestionGenerationError(
+                "No images found for the specified chapter",
+                details=[f"No images found in path: {base_path}"]
+            )
+
+        # Accumulate context from all images
+        logger.info("Processing images to extract context")
+        accumulated_context = ""
         
-        if remaining > 0:
-            # Calculate fractional parts
-            fractions = {
-                "Easy": (total_easy * total_type_questions / total_questions) % 1,
-                "Medium": (total_medium * total_type_questions / total_questions) % 1,
-                "Hard": (total_hard * total_type_questions / total_questions) % 1
-            }
-            
-            # Distribute remaining questions based on largest fractional parts
-            while remaining > 0:
-                max_diff = max(fractions.items(), key=lambda x: x[1])
-                distribution[max_diff[0]] += 1
-                fractions[max_diff[0]] = 0  # Mark as used
-                remaining -= 1
+        for processed, image_path in enumerate(image_paths, 1):
+            with tracer.span("image.encode"):
+                image_data = encode_image_to_base64(image_path)
+            if image_data:
+                content = await self._get_image_context(image_data)
+                if content:
+                    accumulated_context += f"{content}\n\n"
+            if on_image_processed:
+                on_image_processed(processed, len(image_paths))
+
+        if not accumulated_context.strip():
+            raise QuestionGenerationError(
+                "Failed to extract context from images",
+                details=["No meaningful content could be extracted from the images"]
+            )
+
+        return accumulated_context
+
+    async def generate_bucket(
+        self,
+        context: str,
+        request: QuestionRequest,
+        q_type: str,
+        difficulty: str,
+        count: int
+    ) -> List[Dict]:
+        """Generate one (type, difficulty) bucket and check that its count is exact."""
+        logger.info(f"Generating questions", {
+            "type": q_type,
+            "difficulty": difficulty,
+            "count": count
+        })
         
-        # Ensure minimum of 1 question per difficulty if total_type_questions >= 3
-        if total_type_questions >= 3:
-            while any(count == 0 for count in distribution.values()):
-                # Find difficulty with 0 questions
-                zero_diff = next(diff for diff, count in distribution.items() if count == 0)
-                # Find difficulty with most questions
-                max_diff = max(distribution.items(), key=lambda x: x[1])[0]
-                
-                # Transfer one question
-                distribution[zero_diff] += 1
-                distribution[max_diff] -= 1
+        with tracer.span("question.bucket", type=q_type, difficulty=difficulty, count=count):
+            questions = await self._generate_questions_for_type(
+                context,
+                q_type,
+                count,
+                request,
+                difficulty
+            )
         
-        logger.info(f"Calculated distribution", {
-            "type_questions": total_type_questions,
-            "distribution": distribution,
-            "total_allocated": sum(distribution.values())
+        if len(questions) != count:
+            raise QuestionGenerationError(
+                f"Incorrect number of {difficulty} {q_type} questions generated",
+                details=[f"Expected {count}, got {len(questions)}"]
+            )
+
+        logger.info(f"Successfully generated questions", {
+            "type": q_type,
+            "difficulty": difficulty,
+            "count": len(questions)
         })
+        return questions
 
-        # Final validation
-        if sum(distribution.values()) != total_type_questions:
-            logger.error("Invalid distribution calculation", {
-                "expected_total": total_type_questions,
-                "actual_total": sum(distribution.values()),
-                "distribution": distribution
-            })
+    async def assemble_paper(
+        self,
+        request: QuestionRequest,
+        buckets: List[Tuple[str, str, int]],
+        bucket_questions: List[List[Dict]],
+        context: str
+    ) -> QuestionResponse:
+        """
+        Combine generated buckets into the final paper.
+
+        Runs duplicate detection and replacement, validates the totals against the
+        request, records the chapter history and builds the response.
+        """
+        all_questions = []
+        slot_buckets = []
+        questions_generated = {"Easy": 0, "Medium": 0, "Hard": 0}
+
+        for (q_type, difficulty, _), questions in zip(buckets, bucket_questions):
+            all_questions.extend(questions)
+            slot_buckets.extend([(q_type, difficulty)] * len(questions))
+            questions_generated[difficulty] += len(questions)
+
+        if settings.DEDUP_ENABLED:
+            with tracer.span("question.dedup"):
+                all_questions = await self._deduplicate_questions(
+                    all_questions,
+                    slot_buckets,
+                    context,
+                    request
+                )
+        
+        # Validate final distribution matches request
+        total_generated = sum(questions_generated.values())
+        expected_total = request.question_distribution.total_questions()
+        
+        if total_generated != expected_total:
             raise QuestionGenerationError(
-                "Invalid difficulty distribution calculation",
-                details=[f"Expected {total_type_questions} questions, got {sum(distribution.values())}"]
+                "Generated questions count mismatch",
+                details=[
+                    f"Expected total: {expected_total}",
+                    f"Generated total: {total_generated}",
+                    f"Distribution: {questions_generated}"
+                ]
             )
 
-        return distribution
+        if request.avoid_history:
+            with tracer.span("question.save_history"):
+                self.dedup_service.save_history(request, all_questions)
 
-    async def generate_questions(self, request: QuestionRequest) -> QuestionResponse:
+        # Create and return response
+        return QuestionResponse(
+            title=f"{request.standard} {request.subject} - {request.chapter}",
+            questions=all_questions,
+            metadata={
+                "request_id": request.request_id,
+                "total_questions": len(all_questions),
+                "distribution": questions_generated,
+                "subject": request.subject,
+                "chapter": request.chapter,
+                "standard": request.standard,
+                "language": request.language,
+                "syllabus": request.syllabus
+            },
+            timestamp=datetime.utcnow()
+        )
+
+    async def generate_questions(
+        self,
+        request: QuestionRequest,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> QuestionResponse:
         """
         Generate questions based on request parameters and distributions.
         
         Args:
             request: QuestionRequest containing all parameters and distributions
+            progress_callback: Optional callable receiving the stage and per-bucket status
                 
         Returns:
             QuestionResponse containing generated questions and metadata
@@ -257,6 +389,13 @@ class QuestionService:
             QuestionGenerationError: If question generation fails or distributions don't match
             ValidationError: If request parameters are invalid
         """
+        progress = {"stage": "planning", "buckets": []}
+
+        def report(**changes):
+            progress.update(changes)
+            if progress_callback:
+                progress_callback(progress)
+
         try:
             # Validate total distributions match
             if request.question_distribution.total_questions() != request.difficulty_distribution.total_questions():
@@ -265,123 +404,49 @@ class QuestionService:
                     details=["Question type total does not match difficulty level total"]
                 )
 
-            # Get image paths
-            base_path = f"/Users/developer/Desktop/que/Root/Pdf/{request.language}/Teacher/{request.syllabus}/{request.standard}/{request.subject}/{request.chapter}"
-            image_paths = get_images(base_path, [".png", ".jpg", ".jpeg"])
+            with tracer.span("question.plan"):
+                buckets = self.plan_buckets(request)
+            report(buckets=[
+                {"type": q_type, "difficulty": difficulty, "count": count, "status": "pending"}
+                for q_type, difficulty, count in buckets
+            ])
 
-            if not image_paths:
-                raise QuestionGenerationError(
-                    "No images found for the specified chapter",
-                    details=[f"No images found in path: {base_path}"]
-                )
+            with llm_scheduler.track_usage() as usage:
+                report(stage="extracting_context")
+                with tracer.span("question.context"):
+                    accumulated_context = await self.get_chapter_context(
+                        request,
+                        lambda processed, total: report(images_processed=processed, images_total=total)
+                    )
 
-            # Accumulate context from all images
-            logger.info("Processing images to extract context")
-            accumulated_context = ""
-            
-            for image_path in image_paths:
-                image_data = encode_image_to_base64(image_path)
-                if image_data:
-                    content = await self._get_image_context(image_data)
-                    if content:
-                        accumulated_context += f"{content}\n\n"
-
-            if not accumulated_context.strip():
-                raise QuestionGenerationError(
-                    "Failed to extract context from images",
-                    details=["No meaningful content could be extracted from the images"]
-                )
+                logger.info("Starting question generation with accumulated context")
+                report(stage="generating")
+                
+                # Generate questions for each (type, difficulty) bucket
+                bucket_questions = []
+                for bucket_progress, (q_type, difficulty, count) in zip(progress["buckets"], buckets):
+                    bucket_progress["status"] = "running"
+                    report()
+                    try:
+                        questions = await self.generate_bucket(accumulated_context, request, q_type, difficulty, count)
+                    except QuestionGenerationError:
+                        bucket_progress["status"] = "failed"
+                        report()
+                        raise
+                    bucket_questions.append(questions)
+                    bucket_progress["status"] = "completed"
+                    report()
 
-            logger.info("Starting question generation with accumulated context")
-            
-            # Generate questions for each type
-            all_questions = []
-            questions_generated = {"Easy": 0, "Medium": 0, "Hard": 0}
-            
-            question_types = {
-                QuestionType.MCQ.value: request.question_distribution.multiple_choice,
-                QuestionType.MSQ.value: request.question_distribution.multiple_select,
-                QuestionType.SDQ.value: request.question_distribution.short_descriptive,
-                QuestionType.LDQ.value: request.question_distribution.long_descriptive
-            }
-            
-            for q_type, total_count in question_types.items():
-                if total_count > 0:
-                    logger.info(f"Processing question type: {q_type}", {
-                        "total_count": total_count,
-                        "current_totals": questions_generated
-                    })
-                    
-                    # Calculate difficulty distribution for this type
-                    type_difficulties = self.calculate_difficulty_distribution(total_count, request)
-                    
-                    # Generate questions for each difficulty level
-                    for difficulty, count in type_difficulties.items():
-                        if count > 0:
-                            logger.info(f"Generating questions", {
-                                "type": q_type,
-                                "difficulty": difficulty,
-                                "count": count
-                            })
-                            
-                            questions = await self._generate_questions_for_type(
-                                accumulated_context,
-                                q_type,
-                                count,
-                                request,
-                                difficulty
-                            )
-                            
-                            if len(questions) != count:
-                                raise QuestionGenerationError(
-                                    f"Incorrect number of {difficulty} {q_type} questions generated",
-                                    details=[f"Expected {count}, got {len(questions)}"]
-                                )
-                            
-                            all_questions.extend(questions)
-                            questions_generated[difficulty] += len(questions)
-                            
-                            logger.info(f"Successfully generated questions", {
-                                "type": q_type,
-                                "difficulty": difficulty,
-                                "count": len(questions),
-                                "running_total": questions_generated
-                            })
-            
-            # Validate final distribution matches request
-            total_generated = sum(questions_generated.values())
-            expected_total = request.question_distribution.total_questions()
-            
-            if total_generated != expected_total:
-                raise QuestionGenerationError(
-                    "Generated questions count mismatch",
-                    details=[
-                        f"Expected total: {expected_total}",
-                        f"Generated total: {total_generated}",
-                        f"Distribution: {questions_generated}"
-                    ]
-                )
-            
-            # Create and return response
-            return QuestionResponse(
-                title=f"{request.standard} {request.subject} - {request.chapter}",
-                questions=all_questions,
-                metadata={
-                    "request_id": request.request_id,
-                    "total_questions": len(all_questions),
-                    "distribution": questions_generated,
-                    "subject": request.subject,
-                    "chapter": request.chapter,
-                    "standard": request.standard,
-                    "language": request.language,
-                    "syllabus": request.syllabus
-                },
-                timestamp=datetime.utcnow()
-            )
+                report(stage="deduplicating" if settings.DEDUP_ENABLED else "assembling")
+                result = await self.assemble_paper(request, buckets, bucket_questions, accumulated_context)
+
+            result.metadata["llm_usage"] = usage.to_dict()
+            report(stage="completed")
+            return result
             
         except Exception as e:
             logger.error("Error generating questions", {
                 "error": str(e),
                 "request_id": request.request_id
             })
-            raise
\ No newline at end of file
+            raise
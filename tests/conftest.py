@@ -0,0 +1,26 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Keep the test run's logs, job queue and caches out of the working tree; the
+# settings are read when the app modules are first imported.
+_TMP = Path(tempfile.mkdtemp(prefix="roombrai-tests-"))
+os.environ.setdefault("LOG_DIR", str(_TMP / "logs"))
+os.environ.setdefault("LOG_FILE", str(_TMP / "logs" / "app.log"))
+os.environ.setdefault("ERROR_LOG_FILE", str(_TMP / "logs" / "error.log"))
+os.environ.setdefault("METRICS_DIR", str(_TMP / "metrics"))
+os.environ.setdefault("JOB_DB_PATH", str(_TMP / "jobs.db"))
+os.environ.setdefault("EVALUATION_CACHE_DB_PATH", str(_TMP / "evaluation_cache.db"))
+os.environ.setdefault("QUESTION_HISTORY_DIR", str(_TMP / "question_history"))
+os.environ.setdefault("PROFILE_DIR", str(_TMP / "profiles"))
+os.environ.setdefault("SLOW_REQUEST_LOG_FILE", str(_TMP / "logs" / "slow_requests.jsonl"))
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # Flush the log listener while pytest still owns the captured streams
+    from utils import logger
+    logger.shutdown()
@@ -0,0 +1,48 @@
+# tests/test_allocation.py
+import random
+from math import ceil, floor
+import pytest
+from utils.allocation import allocate_matrix
+
+
+def check_allocation(rows, columns, matrix):
+    total = sum(rows.values())
+    for row, row_total in rows.items():
+        assert sum(matrix[row].values()) == row_total
+    for column, column_total in columns.items():
+        assert sum(matrix[row][column] for row in rows) == column_total
+    for row in rows:
+        for column in columns:
+            ideal = rows[row] * columns[column] / total if total else 0
+            assert floor(ideal) <= matrix[row][column] <= ceil(ideal)
+
+
+def test_proportional_split_is_exact_when_divisible():
+    matrix = allocate_matrix({"mcq": 4, "sdq": 2}, {"Easy": 3, "Hard": 3})
+    assert matrix == {"mcq": {"Easy": 2, "Hard": 2}, "sdq": {"Easy": 1, "Hard": 1}}
+
+
+def test_rounding_matches_both_marginals():
+    rows = {"mcq": 5, "msq": 1, "sdq": 1, "ldq": 1}
+    columns = {"Easy": 3, "Medium": 3, "Hard": 2}
+    check_allocation(rows, columns, allocate_matrix(rows, columns))
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_random_marginals_keep_invariants(seed):
+    rng = random.Random(seed)
+    rows = {f"type{i}": rng.randint(0, 12) for i in range(rng.randint(1, 5))}
+    total = sum(rows.values())
+    cuts = sorted(rng.randint(0, total) for _ in range(rng.randint(0, 3)))
+    bounds = [0, *cuts, total]
+    columns = {f"level{i}": bounds[i + 1] - bounds[i] for i in range(len(bounds) - 1)}
+    check_allocation(rows, columns, allocate_matrix(rows, columns))
+
+
+def test_zero_total_gives_empty_matrix():
+    assert allocate_matrix({"mcq": 0}, {"Easy": 0, "Hard": 0}) == {"mcq": {"Easy": 0, "Hard": 0}}
+
+
+def test_mismatched_totals_are_rejected():
+    with pytest.raises(ValueError, match="does not match"):
+        allocate_matrix({"mcq": 3}, {"Easy": 2})
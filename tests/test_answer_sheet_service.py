@@ -0,0 +1,139 @@
+# tests/test_answer_sheet_service.py
+import asyncio
+import io
+import json
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from config.settings import settings
+from models.evaluation_models import AnswerKeyItem, EvaluationMode
+from services.answer_sheet_service import AnswerSheetService
+from services.llm_scheduler import llm_scheduler
+from utils.exceptions import PayloadTooLargeError, ValidationError
+
+
+class StubBackend:
+    def chat(self, messages=None, **kwargs):
+        answers = [{"question_number": 1, "answer": "force"}] if messages[-1].get("images") else None
+        if answers is not None:
+            return {"message": {"content": json.dumps(answers)}}
+        return {"message": {"content": json.dumps({"reasoning": "stub", "score": 80})}}
+
+
+@pytest.fixture(autouse=True)
+def backend(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "client", StubBackend())
+
+
+def image_bytes(frames=1, format="PNG"):
+    images = [Image.new("RGB", (40, 30), "white") for _ in range(frames)]
+    buffer = io.BytesIO()
+    images[0].save(buffer, format=format, save_all=frames > 1, append_images=images[1:])
+    return buffer.getvalue()
+
+
+def upload(filename, data):
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+
+def run_sheets(service, sheets):
+    key = [AnswerKeyItem(question_number=1, expected_answer="force")]
+
+    async def collect():
+        return [record async for record in service.process_sheets(sheets, key)]
+
+    return asyncio.run(collect())
+
+
+def test_store_uploads_copies_files():
+    work_dir, sheets = asyncio.run(AnswerSheetService().store_uploads([upload("a.png", b"abc"), upload("b.PDF", b"d")]))
+    try:
+        assert [name for name, _ in sheets] == ["a.png", "b.PDF"]
+        assert [path.read_bytes() for _, path in sheets] == [b"abc", b"d"]
+        assert sheets[1][1].suffix == ".pdf"
+    finally:
+        for _, path in sheets:
+            path.unlink()
+        work_dir.rmdir()
+
+
+def test_store_uploads_rejects_unsupported_types():
+    with pytest.raises(ValidationError):
+        asyncio.run(AnswerSheetService().store_uploads([upload("notes.txt", b"abc")]))
+
+
+@pytest.mark.parametrize("setting", ["ANSWER_SHEET_MAX_FILE_MB", "ANSWER_SHEET_MAX_TOTAL_MB"])
+def test_store_uploads_enforces_size_limits_and_cleans_up(monkeypatch, tmp_path, setting):
+    monkeypatch.setattr(settings, setting, 1)
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    uploads = [upload("a.png", b"x" * (700 * 1024)), upload("b.png", b"x" * (700 * 1024))]
+    if setting == "ANSWER_SHEET_MAX_FILE_MB":
+        uploads = [upload("big.png", b"x" * (1024 * 1024 + 1))]
+
+    with pytest.raises(PayloadTooLargeError) as error:
+        asyncio.run(AnswerSheetService().store_uploads(uploads))
+    assert error.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unreadable_sheet_reports_filename_not_temp_path():
+    service = AnswerSheetService()
+    work_dir, sheets = asyncio.run(service.store_uploads([upload("student-7.png", b"not an image")]))
+    try:
+        result, summary = run_sheets(service, sheets)
+    finally:
+        for _, path in sheets:
+            path.unlink()
+        work_dir.rmdir()
+
+    assert result["status"] == "failed"
+    assert "student-7.png" in result["error"]
+    assert str(work_dir) not in result["error"]
+    assert summary["failed"] == 1
+
+
+def test_sheet_over_page_limit_fails(monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_SHEET_MAX_PAGES", 2)
+    service = AnswerSheetService()
+    work_dir, sheets = asyncio.run(service.store_uploads([
+        upload("long.tiff", image_bytes(frames=3, format="TIFF")),
+        upload("short.tiff", image_bytes(frames=2, format="TIFF"))
+    ]))
+    try:
+        records = run_sheets(service, sheets)
+    finally:
+        for _, path in sheets:
+            path.unlink()
+        work_dir.rmdir()
+
+    results = {record["filename"]: record for record in records if record["event"] == "result"}
+    assert results["long.tiff"]["status"] == "failed"
+    assert results["long.tiff"]["error"] == "Sheet has more than 2 pages"
+    assert results["short.tiff"]["status"] == "completed"
+    assert results["short.tiff"]["pages"] == 2
+
+
+def test_answer_sheet_route_cleans_up_without_reading_the_body(monkeypatch):
+    from api.evaluation_routes import evaluate_answer_sheets
+    work_dirs = []
+    store_uploads = AnswerSheetService.store_uploads
+
+    async def recording_store_uploads(self, files):
+        work_dir, sheets = await store_uploads(self, files)
+        work_dirs.append(work_dir)
+        return work_dir, sheets
+
+    monkeypatch.setattr(AnswerSheetService, "store_uploads", recording_store_uploads)
+
+    async def run():
+        response = await evaluate_answer_sheets(
+            files=[upload("a.png", image_bytes())],
+            answer_key=json.dumps([{"question_number": 1, "expected_answer": "force"}]),
+            mode=EvaluationMode.SINGLE
+        )
+        assert work_dirs[0].exists()
+        # Starlette runs the background task even when the client leaves before the body starts
+        await response.background()
+
+    asyncio.run(run())
+    assert not work_dirs[0].exists()
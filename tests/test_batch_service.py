@@ -0,0 +1,126 @@
+# tests/test_batch_service.py
+import asyncio
+import pytest
+from models.question_models import QuestionRequest
+from services.batch_service import BatchGenerationService
+from services.llm_scheduler import llm_scheduler
+from services.question_service import QuestionService
+from utils.exceptions import QuestionGenerationError
+
+TEXTS = [
+    "What is the SI unit of force and how is it defined?",
+    "Explain the process of photosynthesis in green plants.",
+    "State Newton's third law of motion with an example.",
+    "Describe the structure of a plant cell with a diagram."
+]
+
+
+class StubBackend:
+    """Stub LLM client answering every call at once."""
+    def chat(self, **kwargs):
+        return {"message": {"content": "ok"}, "prompt_eval_count": 3, "eval_count": 2}
+
+
+class StubQuestionService(QuestionService):
+    """Question service whose LLM steps call the stub backend and return scripted results."""
+    def __init__(self, delays=None, failing=()):
+        super().__init__()
+        self.delays = delays or {}
+        self.failing = failing
+        self.extractions = []
+        self.issued = {}
+
+    async def get_chapter_context(self, request, on_image_processed=None):
+        self.extractions.append(request.chapter)
+        await llm_scheduler.chat(task="context_extraction", model=self.model, messages=[])
+        if request.chapter == "Missing":
+            raise QuestionGenerationError("No images found for the specified chapter")
+        return f"context for {request.chapter}"
+
+    async def _generate_questions_for_type(self, context, q_type, n, request, difficulty, exclude_questions=None):
+        await llm_scheduler.chat(task="question_generation", model=self.model, messages=[])
+        await asyncio.sleep(self.delays.get(request.chapter, 0))
+        if request.chapter in self.failing:
+            return []
+        start = self.issued.get(request.request_id, 0)
+        self.issued[request.request_id] = start + n
+        return [
+            {"type": q_type, "difficulty": difficulty, "question": text}
+            for text in TEXTS[start:start + n]
+        ]
+
+
+def request(chapter, **overrides):
+    fields = {
+        "standard": "9",
+        "subject": "Science",
+        "chapter": chapter,
+        "question_distribution": {"multiple_choice": 2, "multiple_select": 0, "short_descriptive": 1, "long_descriptive": 0},
+        "difficulty_distribution": {"easy": 2, "medium": 1, "hard": 0}
+    }
+    return QuestionRequest(**{**fields, **overrides})
+
+
+@pytest.fixture(autouse=True)
+def stub_llm(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "client", StubBackend())
+    # Each test runs its own event loop; the shared semaphore binds to the first one it waits on
+    monkeypatch.setattr(llm_scheduler, "_semaphore", asyncio.Semaphore(llm_scheduler.max_concurrency))
+
+
+def run_batch(question_service, requests, workers=2):
+    service = BatchGenerationService()
+    service.question_service = question_service
+    service.workers = workers
+
+    async def collect():
+        return [record async for record in service.generate_batch(requests)]
+
+    records = asyncio.run(collect())
+    return records[:-1], records[-1]
+
+
+def test_chapter_context_is_extracted_once_per_chapter():
+    question_service = StubQuestionService()
+    results, summary = run_batch(question_service, [request("Force"), request("Cells"), request("Force")])
+
+    assert sorted(question_service.extractions) == ["Cells", "Force"]
+    assert summary["chapter_extractions"] == 2
+    assert summary["completed"] == 3
+    assert all(record["status"] == "completed" for record in results)
+
+
+def test_results_are_yielded_in_completion_order():
+    question_service = StubQuestionService(delays={"Slow": 0.1})
+    # Enough workers for every bucket, so the slow paper cannot hold up the fast one
+    results, _ = run_batch(question_service, [request("Slow"), request("Fast")], workers=6)
+
+    assert [record["index"] for record in results] == [1, 0]
+    assert [record["result"]["metadata"]["chapter"] for record in results] == ["Fast", "Slow"]
+
+
+def test_failed_requests_do_not_affect_others():
+    question_service = StubQuestionService(failing={"Empty"})
+    requests = [request("Missing"), request("Force"), request("Empty")]
+    results, summary = run_batch(question_service, requests)
+
+    by_index = {record["index"]: record for record in results}
+    assert by_index[0]["status"] == "failed"
+    assert "No images found" in by_index[0]["error"]
+    assert by_index[1]["status"] == "completed"
+    assert len(by_index[1]["result"]["questions"]) == 3
+    assert by_index[2]["status"] == "failed"
+    assert by_index[2]["request_id"] == requests[2].request_id
+    assert (summary["completed"], summary["failed"]) == (1, 2)
+
+
+def test_papers_report_their_llm_usage():
+    question_service = StubQuestionService(delays={"Force": 0.01})
+    results, _ = run_batch(question_service, [request("Force"), request("Force")])
+
+    calls = sorted(record["result"]["metadata"]["llm_usage"]["calls"] for record in results)
+    buckets = len(question_service.plan_buckets(request("Force")))
+    # The shared extraction is counted once, for the request that started it
+    assert calls == [buckets, buckets + 1]
+    usage = results[0]["result"]["metadata"]["llm_usage"]
+    assert usage["prompt_tokens"] == 3 * usage["calls"]
@@ -0,0 +1,146 @@
+# tests/test_dedup_service.py
+import asyncio
+import pytest
+from models.question_models import QuestionRequest
+from services.dedup_service import DedupService
+from services.question_service import QuestionService
+from utils.exceptions import QuestionGenerationError
+
+TEXTS = [
+    "What is the SI unit of force and how is it defined?",
+    "Explain the process of photosynthesis in green plants.",
+    "State Newton's third law of motion with an example.",
+    "Describe the structure of a plant cell with a diagram."
+]
+HINDI_MALAYALAM = [
+    "प्रकाश संश्लेषण क्या है? समझाइए।",
+    "न्यूटन के गति के तीसरे नियम को उदाहरण सहित लिखिए।",
+    "പ്രകാശസംശ്ലേഷണം എന്താണ്? വിശദീകരിക്കുക."
+]
+
+
+def question(text, q_type="Multiple Choice", difficulty="Easy"):
+    return {"type": q_type, "difficulty": difficulty, "question": text}
+
+
+def request(**overrides):
+    fields = {
+        "standard": "9",
+        "subject": "Science",
+        "chapter": "Force",
+        "question_distribution": {"multiple_choice": 2, "multiple_select": 0, "short_descriptive": 1, "long_descriptive": 0},
+        "difficulty_distribution": {"easy": 2, "medium": 1, "hard": 0}
+    }
+    return QuestionRequest(**{**fields, **overrides})
+
+
+def test_question_text_is_normalized():
+    assert DedupService.question_text({"question": "  What's  the\nSI unit?"}) == "what s the si unit"
+
+
+def test_question_text_keeps_non_latin_scripts():
+    assert DedupService.question_text({"question": "प्रकाश संश्लेषण क्या है?"}) == "प्रकाश संश्लेषण क्या है"
+    assert DedupService.question_text({"question": "ÉNERGIE cinétique ?"}) == "énergie cinétique"
+
+
+def test_non_latin_questions_are_not_duplicates_of_each_other():
+    questions = [question(text) for text in HINDI_MALAYALAM]
+    assert DedupService().find_duplicates(questions) == []
+    assert DedupService().find_duplicates(questions + [question(HINDI_MALAYALAM[0])]) == [3]
+
+
+def test_near_empty_questions_are_never_duplicates():
+    questions = [question("?"), question("!!"), question("ab"), question("ab")]
+    assert DedupService().find_duplicates(questions, history=["", "ab"]) == []
+
+
+def test_signatures_are_stable_across_instances():
+    assert (DedupService().signatures(TEXTS) == DedupService().signatures(TEXTS)).all()
+
+
+def test_similarity_estimates_jaccard():
+    service = DedupService()
+    signatures = service.signatures([TEXTS[0], TEXTS[0], TEXTS[1]])
+    similarity = service.similarity_matrix(signatures, signatures)
+    assert similarity[0, 1] == 1.0
+    assert similarity[0, 2] < 0.3
+    assert service.similarity_matrix(signatures, signatures[:0]).shape == (3, 0)
+
+
+def test_near_duplicates_are_found_and_earlier_question_wins():
+    questions = [question(text) for text in TEXTS]
+    questions.append(question("What is the SI unit of force, and how is it defined?"))
+    questions.insert(1, question(TEXTS[2].upper()))
+    assert DedupService().find_duplicates(questions) == [3, 5]
+
+
+def test_distinct_questions_are_kept():
+    assert DedupService().find_duplicates([question(text) for text in TEXTS]) == []
+
+
+def test_history_duplicates_respect_protected_questions():
+    service = DedupService()
+    questions = [question(text) for text in TEXTS]
+    history = [service.question_text(questions[0]), service.question_text(questions[2])]
+    assert service.find_duplicates(questions, history) == [0, 2]
+    assert service.find_duplicates(questions, history, protected=1) == [2]
+
+
+def test_history_round_trip(tmp_path):
+    service = DedupService()
+    service.history_dir = tmp_path
+    paper = request()
+    assert service.load_history(paper) == []
+    service.save_history(paper, [question(text) for text in TEXTS[:2]])
+    # A later paper for the same chapter appends to the same history
+    service.save_history(request(), [question(TEXTS[2])])
+    assert service.load_history(paper) == [service.question_text(question(text)) for text in TEXTS[:3]]
+    assert service.load_history(request(chapter="Motion")) == []
+
+
+def test_plan_replacements_groups_slots_by_bucket():
+    buckets = [("mcq", "Easy"), ("mcq", "Easy"), ("sdq", "Hard"), ("mcq", "Easy")]
+    assert DedupService.plan_replacements(buckets, [1, 2, 3]) == {
+        ("mcq", "Easy"): [1, 3],
+        ("sdq", "Hard"): [2]
+    }
+
+
+class StubQuestionService(QuestionService):
+    """Question service whose generation returns scripted candidates per bucket."""
+    def __init__(self, candidates):
+        super().__init__()
+        self.candidates = candidates
+        self.calls = []
+
+    async def _generate_questions_for_type(self, context, q_type, n, request, difficulty, exclude_questions=None):
+        self.calls.append((q_type, difficulty, n))
+        return [question(text, q_type, difficulty) for text in self.candidates.pop(0)][:n]
+
+
+def test_only_duplicate_slots_are_regenerated_in_place():
+    service = StubQuestionService([
+        # First round: one candidate still duplicates the paper
+        [TEXTS[0]],
+        ["What is the chemical formula of water and its molar mass?"]
+    ])
+    questions = [question(TEXTS[0]), question(TEXTS[0]), question(TEXTS[1], "Short Descriptive Answer", "Medium")]
+    buckets = [("Multiple Choice", "Easy"), ("Multiple Choice", "Easy"), ("Short Descriptive Answer", "Medium")]
+
+    result = asyncio.run(service._deduplicate_questions(questions, buckets, "context", request()))
+
+    assert service.calls == [("Multiple Choice", "Easy", 1), ("Multiple Choice", "Easy", 1)]
+    assert [q["question"] for q in result] == [
+        TEXTS[0],
+        "What is the chemical formula of water and its molar mass?",
+        TEXTS[1]
+    ]
+
+
+def test_unreplaceable_duplicates_raise():
+    service = StubQuestionService([[TEXTS[0]], [TEXTS[0]], [TEXTS[0]]])
+    questions = [question(TEXTS[0]), question(TEXTS[0])]
+    buckets = [("Multiple Choice", "Easy")] * 2
+
+    with pytest.raises(QuestionGenerationError):
+        asyncio.run(service._deduplicate_questions(questions, buckets, "context", request()))
@@ -0,0 +1,77 @@
+# tests/test_evaluation_cache.py
+import asyncio
+from models.evaluation_models import EvaluationResult
+from services.evaluation_cache import EvaluationCache, normalize_answer
+
+
+def result(score):
+    return EvaluationResult(score=score, justification=f"score {score}")
+
+
+def test_normalize_answer_ignores_case_punctuation_and_spacing():
+    assert normalize_answer("  Force = Mass x  Acceleration! ") == normalize_answer("force mass x acceleration")
+
+
+def test_make_key_depends_on_prompt_and_model():
+    key = EvaluationCache.make_key("Key.", "Answer", "prompt-v1", "model")
+    assert key == EvaluationCache.make_key("key", "answer!", "prompt-v1", "model")
+    assert key != EvaluationCache.make_key("key", "answer", "prompt-v2", "model")
+    assert key != EvaluationCache.make_key("key", "answer", "prompt-v1", "other")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = EvaluationCache(max_entries=2)
+
+    async def run():
+        await cache.set("a", result(1))
+        await cache.set("b", result(2))
+        assert await cache.get("a") is not None
+        await cache.set("c", result(3))
+        return await cache.get_many(["a", "b", "c"])
+
+    found = asyncio.run(run())
+    assert sorted(found) == ["a", "c"]
+    assert cache.stats()["entries"] == 2
+
+
+def test_counters_track_hits_and_misses():
+    cache = EvaluationCache(max_entries=10)
+
+    async def run():
+        await cache.set("a", result(1))
+        await cache.get_many(["a", "b"])
+        await cache.get("c")
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["disk_hits"]) == (1, 2, 0)
+    assert stats["hit_ratio"] == round(1 / 3, 4)
+    cache.reset()
+    assert cache.stats()["hits"] == 0
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    db_path = tmp_path / "cache.db"
+
+    async def run():
+        await EvaluationCache(max_entries=10, db_path=db_path).set_many({"a": result(1), "b": result(2)})
+        cache = EvaluationCache(max_entries=10, db_path=db_path)
+        found = await cache.get_many(["a", "b", "c"])
+        return cache, found
+
+    cache, found = asyncio.run(run())
+    assert {key: value.score for key, value in found.items()} == {"a": 1.0, "b": 2.0}
+    assert (cache.disk_hits, cache.misses) == (2, 1)
+    # Disk hits are promoted into memory
+    assert cache.stats()["entries"] == 2
+
+
+def test_disk_lookups_are_chunked(tmp_path):
+    cache = EvaluationCache(max_entries=1, db_path=tmp_path / "cache.db")
+    results = {f"key-{i}": result(i % 100) for i in range(EvaluationCache._DISK_BATCH * 2 + 5)}
+
+    async def run():
+        await cache.set_many(results)
+        return await cache.get_many(list(results))
+
+    assert len(asyncio.run(run())) == len(results)
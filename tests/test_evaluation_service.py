@@ -0,0 +1,98 @@
+# tests/test_evaluation_service.py
+import asyncio
+import json
+import re
+import pytest
+from models.evaluation_models import AnswerPair, EvaluationMode
+from services.evaluation_cache import evaluation_cache
+from services.evaluation_services import EvaluationService
+from services.llm_scheduler import llm_scheduler
+
+
+class StubBackend:
+    """Stub ollama client that scores every pair 40 and records the prompts."""
+    def __init__(self, score: float = 40):
+        self.score = score
+        self.prompts = []
+
+    def chat(self, messages=None, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        return {"message": {"content": json.dumps({"reasoning": "stub", "score": self.score})}}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = StubBackend()
+    monkeypatch.setattr(llm_scheduler, "client", backend)
+    evaluation_cache.reset()
+    yield backend
+    evaluation_cache.reset()
+
+
+def pairs():
+    return [
+        AnswerPair(expected_answer="Force equals mass times acceleration", student_answer="Forces depend on mass",
+                   keywords=["force", "mass"]),
+        AnswerPair(expected_answer="Force equals mass times acceleration", student_answer="It moves fast",
+                   keywords=["force", "mass"])
+    ]
+
+
+def test_rubric_mode_ignores_cached_llm_results(backend):
+    service = EvaluationService()
+    llm_results, _ = asyncio.run(service.evaluate_pairs(pairs(), EvaluationMode.SINGLE))
+    assert [result.score for result in llm_results] == [40.0, 40.0]
+
+    rubric_results, timings = asyncio.run(service.evaluate_pairs(pairs(), EvaluationMode.RUBRIC))
+    assert [result.score for result in rubric_results] == [100.0, 0.0]
+    assert [timing["tier"] for timing in timings] == ["rubric", "rubric"]
+    assert len(backend.prompts) == 2
+
+
+def test_single_mode_reuses_cached_results(backend):
+    service = EvaluationService()
+    asyncio.run(service.evaluate_pairs(pairs(), EvaluationMode.SINGLE))
+    results, timings = asyncio.run(service.evaluate_pairs(pairs(), EvaluationMode.SINGLE))
+    assert [result.score for result in results] == [40.0, 40.0]
+    assert [timing["tier"] for timing in timings] == ["cache", "cache"]
+    assert len(backend.prompts) == 2
+
+
+def test_identical_pairs_are_evaluated_once(backend):
+    pair = pairs()[1]
+    results, timings = asyncio.run(EvaluationService().evaluate_pairs([pair, pair, pair], EvaluationMode.SINGLE))
+    assert [result.score for result in results] == [40.0, 40.0, 40.0]
+    assert [timing["tier"] for timing in timings] == ["llm", "cache", "cache"]
+    assert len(backend.prompts) == 1
+
+
+class BatchBackend(StubBackend):
+    """Stub backend whose batch answers leave out the second pair."""
+    def chat(self, messages=None, **kwargs):
+        content = messages[-1]["content"]
+        self.prompts.append(content)
+        match = re.search(r"following (\d+) pairs", content)
+        if match is None:
+            return {"message": {"content": json.dumps({"reasoning": "single", "score": 20})}}
+        return {"message": {"content": json.dumps([
+            {"pair": k + 1, "reasoning": "batch", "score": 70} for k in range(int(match.group(1))) if k != 1
+        ])}}
+
+
+def test_batch_fallback_is_not_cached_as_batch_result(monkeypatch):
+    backend = BatchBackend()
+    monkeypatch.setattr(llm_scheduler, "client", backend)
+    evaluation_cache.reset()
+    service = EvaluationService()
+    batch = [AnswerPair(expected_answer="Key", student_answer=f"answer {i}") for i in range(3)]
+
+    results, timings = asyncio.run(service.evaluate_pairs(batch, EvaluationMode.BATCH))
+    assert [result.score for result in results] == [70.0, 20.0, 70.0]
+    assert timings[1].get("fallback") is True
+
+    # The fallback pair goes back to the batch; the single-pair result is reused in single mode
+    _, timings = asyncio.run(service.evaluate_pairs(batch, EvaluationMode.BATCH))
+    assert [timing["tier"] for timing in timings] == ["cache", "llm", "cache"]
+    _, timings = asyncio.run(service.evaluate_pairs(batch[1:2], EvaluationMode.SINGLE))
+    assert timings[0]["tier"] == "cache"
+    evaluation_cache.reset()
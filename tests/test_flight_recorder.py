@@ -0,0 +1,51 @@
+# tests/test_flight_recorder.py
+import asyncio
+import json
+import threading
+from utils.flight_recorder import FlightRecorder
+
+
+def trace(trace_id, duration_ms):
+    return {
+        "trace_id": trace_id,
+        "name": "GET /slow",
+        "timestamp": 0.0,
+        "duration_ms": duration_ms,
+        "status": "ok",
+        "attributes": {},
+        "stages": {},
+        "spans": [],
+        "dropped_spans": 0
+    }
+
+
+def make_recorder(tmp_path, max_bytes=1024 * 1024):
+    return FlightRecorder(size=10, slow_threshold_ms=100, slow_log_path=tmp_path / "slow.jsonl", slow_log_max_bytes=max_bytes)
+
+
+def test_slow_requests_are_written_off_the_event_loop(tmp_path, monkeypatch):
+    recorder = make_recorder(tmp_path)
+    threads = []
+    write_slow = recorder._write_slow
+    monkeypatch.setattr(recorder, "_write_slow", lambda line: (threads.append(threading.get_ident()), write_slow(line)))
+
+    async def run():
+        recorder.export(trace("fast", 5))
+        recorder.export(trace("slow", 500))
+        assert not recorder.slow_log_path.exists()
+        await asyncio.gather(*recorder._pending)
+
+    asyncio.run(run())
+    assert len(threads) == 1 and threads[0] != threading.get_ident()
+    assert [json.loads(line)["trace_id"] for line in recorder.slow_log_path.read_text().splitlines()] == ["slow"]
+    assert [entry["trace_id"] for entry in recorder.dump(10)] == ["slow", "fast"]
+
+
+def test_slow_request_log_rotates(tmp_path):
+    recorder = make_recorder(tmp_path, max_bytes=1)
+    recorder.export(trace("first", 500))
+    recorder.export(trace("second", 500))
+
+    rotated = tmp_path / "slow.jsonl.1"
+    assert json.loads(rotated.read_text())["trace_id"] == "first"
+    assert json.loads(recorder.slow_log_path.read_text())["trace_id"] == "second"
@@ -0,0 +1,189 @@
+# tests/test_job_service.py
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+import pytest
+from models.job_models import JobStatus
+from services.job_service import JobService
+
+
+async def wait_for_status(service, job_id, *statuses, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        job = service.get(job_id)
+        if job.status in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {service.get(job_id).status}")
+
+
+def insert_job(service, job_id, status, owner_pid=None, payload=None):
+    now = datetime.utcnow().isoformat()
+    conn = service._connect()
+    conn.execute(
+        "INSERT INTO jobs (job_id, kind, status, payload, created_at, updated_at, owner_pid) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (job_id, "echo", status.value, json.dumps(payload or {}), now, now, owner_pid)
+    )
+    conn.commit()
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = JobService(tmp_path / "jobs.db", workers=2)
+    calls = []
+
+    async def echo(payload, report_progress):
+        calls.append(payload)
+        report_progress({"done": 1})
+        await asyncio.sleep(payload.get("sleep", 0))
+        return {"echo": payload}
+
+    service.register_handler("echo", echo)
+    service.calls = calls
+    return service
+
+
+def test_submit_runs_job_to_completion(service):
+    async def run():
+        await service.start()
+        job = service.submit("echo", {"value": 1})
+        assert job.status == JobStatus.QUEUED
+        job = await wait_for_status(service, job.job_id, JobStatus.COMPLETED)
+        await service.stop()
+        return job
+
+    job = asyncio.run(run())
+    assert job.result == {"echo": {"value": 1}}
+    assert job.progress == {"done": 1}
+    assert service.calls == [{"value": 1}]
+
+
+def test_submit_rejects_unknown_kind(service):
+    with pytest.raises(ValueError):
+        service.submit("missing", {})
+
+
+def test_cancel_queued_job_is_never_run(service):
+    async def run():
+        job = service.submit("echo", {"value": 1})
+        service.cancel(job.job_id)
+        await service.start()
+        await asyncio.sleep(0.05)
+        job = service.get(job.job_id)
+        await service.stop()
+        return job
+
+    job = asyncio.run(run())
+    assert job.status == JobStatus.CANCELLED
+    assert service.calls == []
+
+
+def test_cancel_running_job(service):
+    async def run():
+        await service.start()
+        job = service.submit("echo", {"sleep": 5})
+        await wait_for_status(service, job.job_id, JobStatus.RUNNING)
+        await asyncio.sleep(0.01)
+        service.cancel(job.job_id)
+        await asyncio.sleep(0.05)
+        job = service.get(job.job_id)
+        await service.stop()
+        return job
+
+    job = asyncio.run(run())
+    assert job.status == JobStatus.CANCELLED
+    assert job.result is None
+
+
+def test_start_requeues_only_stale_running_jobs(service):
+    insert_job(service, "stale", JobStatus.RUNNING, owner_pid=dead_pid(), payload={"job": "stale"})
+    insert_job(service, "orphan", JobStatus.RUNNING, owner_pid=None, payload={"job": "orphan"})
+    # The parent process is alive, so its job is left to it
+    insert_job(service, "live", JobStatus.RUNNING, owner_pid=os.getppid(), payload={"job": "live"})
+
+    async def run():
+        await service.start()
+        await wait_for_status(service, "stale", JobStatus.COMPLETED)
+        await wait_for_status(service, "orphan", JobStatus.COMPLETED)
+        live = service.get("live")
+        await service.stop()
+        return live
+
+    live = asyncio.run(run())
+    assert live.status == JobStatus.RUNNING
+    assert sorted(call["job"] for call in service.calls) == ["orphan", "stale"]
+
+
+def test_job_is_claimed_once_across_processes(service, tmp_path):
+    other = JobService(tmp_path / "jobs.db", workers=1)
+    insert_job(service, "shared", JobStatus.QUEUED)
+
+    assert service._claim("shared") is True
+    assert other._claim("shared") is False
+    assert service.get("shared").status == JobStatus.RUNNING
+
+
+def test_queued_job_runs_once_with_two_services(service, tmp_path):
+    other = JobService(tmp_path / "jobs.db", workers=2)
+    other.register_handler("echo", service._handlers["echo"])
+    for i in range(5):
+        insert_job(service, f"job-{i}", JobStatus.QUEUED, payload={"job": i, "sleep": 0.01})
+
+    async def run():
+        # Both queue every pending job; neither has claimed one before the other starts
+        await service.start()
+        await other.start()
+        for i in range(5):
+            await wait_for_status(service, f"job-{i}", JobStatus.COMPLETED)
+        await service.stop()
+        await other.stop()
+
+    asyncio.run(run())
+    assert sorted(call["job"] for call in service.calls) == list(range(5))
+
+
+@pytest.mark.parametrize("reports_progress", [True, False])
+def test_cancel_from_another_service_stops_owner(service, tmp_path, monkeypatch, reports_progress):
+    from services import job_service
+    monkeypatch.setattr(job_service.settings, "JOB_CANCEL_POLL_INTERVAL", 0.02)
+    other = JobService(tmp_path / "jobs.db", workers=1)
+    steps = []
+
+    async def slow(payload, report_progress):
+        for step in range(50):
+            steps.append(step)
+            if reports_progress:
+                report_progress({"step": step})
+            await asyncio.sleep(0.01)
+        return {"ok": 1}
+
+    service.register_handler("slow", slow)
+
+    async def run():
+        await service.start()
+        job = service.submit("slow", {})
+        await wait_for_status(service, job.job_id, JobStatus.RUNNING)
+        await asyncio.sleep(0.05)
+        assert other.cancel(job.job_id).status == JobStatus.CANCELLED
+        await asyncio.sleep(0.1)
+        ran = len(steps)
+        await asyncio.sleep(0.6)
+        job = service.get(job.job_id)
+        running = dict(service._running)
+        await service.stop()
+        return job, ran, running
+
+    job, ran, running = asyncio.run(run())
+    assert job.status == JobStatus.CANCELLED
+    assert job.result is None
+    assert running == {}
+    assert len(steps) == ran < 50
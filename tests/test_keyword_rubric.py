@@ -0,0 +1,82 @@
+# tests/test_keyword_rubric.py
+import pytest
+from utils.keyword_rubric import KeywordRubric, get_rubric, stem, tokenize
+
+
+@pytest.mark.parametrize("singular, plural", [
+    ("force", "forces"),
+    ("process", "processes"),
+    ("class", "classes"),
+    ("case", "cases"),
+    ("type", "types"),
+    ("body", "bodies"),
+    ("box", "boxes"),
+    ("gas", "gases"),
+    ("tree", "trees"),
+    ("use", "uses"),
+    ("molecule", "molecules"),
+])
+def test_singular_and_plural_share_a_stem(singular, plural):
+    assert stem(singular) == stem(plural)
+
+
+@pytest.mark.parametrize("word", ["forced", "forcing", "forces"])
+def test_inflections_share_a_stem(word):
+    assert stem(word) == stem("force")
+
+
+def test_stem_keeps_three_characters():
+    assert stem("is") == "is"
+    assert stem("ring") == "ring"
+    assert stem("the") == "the"
+
+
+def test_tokenize_lowercases_and_stems():
+    assert tokenize("Forces, PROCESSES!") == [stem("force"), stem("process")]
+
+
+@pytest.mark.parametrize("keyword, answer", [
+    ("force", "Two forces act on the block"),
+    ("forces", "A force acts on the block"),
+    ("process", "Several processes run at once"),
+    ("processes", "The process is repeated"),
+    ("molecule", "Water molecules are polar"),
+])
+def test_plural_and_singular_keywords_match(keyword, answer):
+    match = KeywordRubric((keyword,)).score(answer)
+    assert match.matched == [keyword]
+    assert match.score == 100.0
+
+
+def test_score_is_share_of_matched_keywords():
+    rubric = KeywordRubric(("photosynthesis", "chlorophyll", "carbon dioxide", "oxygen"))
+    match = rubric.score("Photosynthesis uses chlorophyll to turn carbon dioxide into sugar")
+    assert match.matched == ["photosynthesis", "chlorophyll", "carbon dioxide"]
+    assert match.missing == ["oxygen"]
+    assert match.score == 75.0
+
+
+def test_phrase_needs_adjacent_tokens():
+    rubric = KeywordRubric(("carbon dioxide",))
+    assert rubric.score("carbon and dioxide").matched == []
+    assert rubric.score("carbon dioxides").matched == ["carbon dioxide"]
+
+
+def test_overlapping_keywords_all_match():
+    rubric = KeywordRubric(("newton", "newton third law", "third law"))
+    assert rubric.score("By Newton third law").score == 100.0
+
+
+def test_misspelling_within_one_edit_matches_long_tokens():
+    rubric = KeywordRubric(("chlorophyll",))
+    assert rubric.score("it contains chlorophyl").matched == ["chlorophyll"]
+    # Short tokens are not snapped, to avoid false matches
+    assert KeywordRubric(("cell",)).score("a call").matched == []
+
+
+def test_empty_rubric_scores_zero():
+    assert KeywordRubric(()).score("anything").score == 0.0
+
+
+def test_get_rubric_compiles_once_per_keyword_list():
+    assert get_rubric(["force", "mass"]) is get_rubric(["force", "mass"])
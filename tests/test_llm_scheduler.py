@@ -0,0 +1,84 @@
+# tests/test_llm_scheduler.py
+import asyncio
+import threading
+import time
+from services.llm_scheduler import LLMScheduler
+
+
+class SlowBackend:
+    """Stub client whose calls block for a while and record peak concurrency."""
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def chat(self, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+        finally:
+            with self._lock:
+                self.active -= 1
+        return {"message": {"content": "ok"}, "prompt_eval_count": 3, "eval_count": 2}
+
+
+def test_chat_returns_response_and_frees_slot():
+    backend = SlowBackend(0.01)
+    scheduler = LLMScheduler(1, client=backend)
+
+    response = asyncio.run(scheduler.chat(task="test", model="stub", messages=[]))
+
+    assert response["message"]["content"] == "ok"
+    assert scheduler.in_flight == 0
+    assert scheduler.waiting == 0
+
+
+def test_concurrency_is_bounded():
+    backend = SlowBackend(0.02)
+    scheduler = LLMScheduler(2, client=backend)
+
+    async def run():
+        await asyncio.gather(*(scheduler.chat(task="test", model="stub", messages=[]) for _ in range(6)))
+
+    asyncio.run(run())
+    assert backend.peak == 2
+
+
+def test_cancelled_call_keeps_slot_until_thread_finishes():
+    backend = SlowBackend(0.2)
+    scheduler = LLMScheduler(1, client=backend)
+
+    async def run():
+        first = asyncio.create_task(scheduler.chat(task="test", model="stub", messages=[]))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        second = asyncio.create_task(scheduler.chat(task="test", model="stub", messages=[]))
+        await asyncio.sleep(0.05)
+        # The cancelled call's thread is still running, so the second one waits
+        assert scheduler.in_flight == 1
+        assert scheduler.waiting == 1
+        await second
+        assert first.cancelled()
+
+    asyncio.run(run())
+    assert backend.peak == 1
+    assert scheduler.in_flight == 0
+
+
+def test_timed_out_call_keeps_slot():
+    backend = SlowBackend(0.15)
+    scheduler = LLMScheduler(1, client=backend)
+
+    async def run():
+        calls = [
+            asyncio.wait_for(scheduler.chat(task="test", model="stub", messages=[]), timeout=0.05)
+            for _ in range(3)
+        ]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+    assert backend.peak == 1
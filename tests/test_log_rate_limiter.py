@@ -0,0 +1,72 @@
+# tests/test_log_rate_limiter.py
+import asyncio
+import importlib
+import logging
+import pydantic
+import pytest
+from api.middleware import MetricsMiddleware
+from config.settings import Settings
+
+logger_module = importlib.import_module("utils.logger")
+LogRateLimiter = logger_module.LogRateLimiter
+log_route_var = logger_module.log_route_var
+
+
+def allow_on(limiter, route, level=logging.INFO, site="site"):
+    token = log_route_var.set(route)
+    try:
+        return limiter.allow(site, level, "message")[0]
+    finally:
+        log_route_var.reset(token)
+
+
+def test_first_matching_rule_applies():
+    limiter = LogRateLimiter([
+        {"route": "/health", "level": "INFO", "sample_rate": 0.0},
+        {"route": "*", "level": "DEBUG", "sample_rate": 0.0}
+    ], summary_interval=60)
+
+    assert allow_on(limiter, "/health") is False
+    assert allow_on(limiter, "/evaluation") is True
+    assert allow_on(limiter, "/evaluation", level=logging.DEBUG) is False
+    assert allow_on(limiter, "/health", level=logging.WARNING) is True
+
+
+def test_token_bucket_suppresses_and_reports_count():
+    limiter = LogRateLimiter([{"route": "job:*", "level": "INFO", "per_second": 0.001, "burst": 2}], summary_interval=60)
+
+    assert [allow_on(limiter, "job:bulk") for _ in range(4)] == [True, True, False, False]
+    summary = limiter.take_summary(force=True)
+    assert summary["suppressed"] == 2
+    assert summary["sites"]["site"]["count"] == 2
+
+
+def test_metrics_middleware_sets_log_route():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(log_route_var.get())
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/health", "headers": []}
+    asyncio.run(MetricsMiddleware(app)(scope, receive, send))
+    assert seen == ["/health"]
+    assert log_route_var.get() != "/health"
+
+
+def test_settings_reject_unknown_rule_level(monkeypatch):
+    monkeypatch.setenv("LOG_RATE_LIMIT_RULES", '[{"route": "*", "level": "INFX"}]')
+    with pytest.raises(pydantic.ValidationError, match=r"LOG_RATE_LIMIT_RULES\[0\] has unknown level 'INFX'"):
+        Settings()
+
+
+def test_settings_accept_lower_case_rule_level(monkeypatch):
+    monkeypatch.setenv("LOG_RATE_LIMIT_RULES", '[{"route": "*", "level": "warning"}]')
+    assert Settings().LOG_RATE_LIMIT_RULES[0]["level"] == "warning"
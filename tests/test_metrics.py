@@ -0,0 +1,53 @@
+# tests/test_metrics.py
+import asyncio
+import json
+import os
+from config.settings import settings
+from utils.metrics import MetricsRegistry
+
+
+def make_registry(tmp_path):
+    registry = MetricsRegistry(tmp_path, [0.1, 1.0])
+    registry.counter("requests_total", "Requests")
+    registry.histogram("latency_seconds", "Latency")
+    return registry
+
+
+def test_snapshot_is_a_copy(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.inc("requests_total", route="/a")
+    registry.observe("latency_seconds", 0.5, route="/a")
+    snapshot = registry.snapshot()
+
+    # Later updates on the loop must not reach a snapshot being written in a thread
+    registry.inc("requests_total", route="/b")
+    registry.observe("latency_seconds", 0.5, route="/a")
+    registry.write_snapshot(snapshot)
+
+    written = json.loads((tmp_path / f"{os.getpid()}.json").read_text())
+    assert written["counters"]["requests_total"] == [[[["route", "/a"]], 1.0]]
+    assert written["histograms"]["latency_seconds"][0][1][-1] == 1
+
+
+def test_snapshot_loop_survives_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_SNAPSHOT_INTERVAL", 0.01)
+    registry = make_registry(tmp_path)
+    write_snapshot = registry.write_snapshot
+    calls = []
+
+    def flaky(snapshot):
+        calls.append(snapshot)
+        if len(calls) == 1:
+            raise RuntimeError("dictionary changed size during iteration")
+        write_snapshot(snapshot)
+
+    monkeypatch.setattr(registry, "write_snapshot", flaky)
+
+    async def run():
+        registry.start()
+        await asyncio.sleep(0.1)
+        assert not registry._task.done()
+        await registry.stop()
+
+    asyncio.run(run())
+    assert len(calls) > 1
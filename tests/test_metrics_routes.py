@@ -0,0 +1,31 @@
+# tests/test_metrics_routes.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api.metrics_routes import metrics_router
+from config.settings import settings
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    app = FastAPI()
+    app.include_router(metrics_router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/traces", "/traces/unknown", "/llm/status"])
+def test_internal_endpoints_require_admin_token(client, path):
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_internal_endpoints_accept_admin_token(client):
+    headers = {"X-Admin-Token": "secret"}
+    assert client.get("/traces", headers=headers).status_code == 200
+    assert client.get("/traces/unknown", headers=headers).status_code == 404
+    assert client.get("/llm/status", headers=headers).json()["in_flight"] == 0
+
+
+def test_metrics_stay_public(client):
+    assert client.get("/metrics").status_code == 200
@@ -0,0 +1,29 @@
+# tests/test_tracing.py
+import asyncio
+import json
+import threading
+from utils.tracing import JsonFileTraceExporter
+
+
+def test_trace_file_is_written_off_the_event_loop(tmp_path, monkeypatch):
+    exporter = JsonFileTraceExporter(tmp_path / "traces.jsonl")
+    threads = []
+    write = exporter._write
+    monkeypatch.setattr(exporter, "_write", lambda line: (threads.append(threading.get_ident()), write(line)))
+
+    async def run():
+        exporter.export({"trace_id": "a"})
+        # Nothing is written on the loop itself
+        assert not exporter.path.exists()
+        await asyncio.gather(*exporter._pending)
+
+    asyncio.run(run())
+    assert len(threads) == 1 and threads[0] != threading.get_ident()
+    assert [json.loads(line)["trace_id"] for line in exporter.path.read_text().splitlines()] == ["a"]
+
+
+def test_trace_file_is_written_directly_without_a_loop(tmp_path):
+    exporter = JsonFileTraceExporter(tmp_path / "traces.jsonl")
+    exporter.export({"trace_id": "a"})
+    exporter.export({"trace_id": "b"})
+    assert [json.loads(line)["trace_id"] for line in exporter.path.read_text().splitlines()] == ["a", "b"]
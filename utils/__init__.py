@@ -13,7 +13,8 @@ from .validators import (
     validate_request, 
     validate_questions,
     _validate_mcq,
-    _validate_descriptive
+    _validate_descriptive,
+    validate_admin_token
 )
 from .helpers import (
     format_prompt,
@@ -23,6 +24,10 @@ from .helpers import (
     validate_file_path,
     get_images
 )
+from .allocation import allocate_matrix
+from .prompts import PromptTemplate, PROMPT_REGISTRY, register_prompt, get_prompt
+from .keyword_rubric import KeywordRubric, RubricMatch, get_rubric
+from .tracing import Tracer, tracer, trace_buffer
 
 __all__ = [
     # Logging
@@ -44,6 +49,7 @@ __all__ = [
     "validate_questions",
     "_validate_mcq",
     "_validate_descriptive",
+    "validate_admin_token",
     
     # Helpers
     "format_prompt",
@@ -51,5 +57,24 @@ __all__ = [
 
     "format_question_response",
     "validate_file_path",
-    "get_images"
+    "get_images",
+
+    # Allocation
+    "allocate_matrix",
+
+    # Prompts
+    "PromptTemplate",
+    "PROMPT_REGISTRY",
+    "register_prompt",
+    "get_prompt",
+
+    # Keyword rubric
+    "KeywordRubric",
+    "RubricMatch",
+    "get_rubric",
+
+    # Tracing
+    "Tracer",
+    "tracer",
+    "trace_buffer"
 ]
\ No newline at end of file
@@ -0,0 +1,89 @@
+# src/utils/allocation.py
+from math import floor
+from typing import Dict, List
+
+def allocate_matrix(row_totals: Dict[str, int], column_totals: Dict[str, int]) -> Dict[str, Dict[str, int]]:
+    """
+    Round the proportional row x column allocation to integers that match both marginals.
+
+    Every cell starts at the floor of ``row * column / total``. The leftover units are
+    then placed with a small max-flow over cells that have a fractional part, which
+    always has an exact solution (controlled rounding). Cells with larger fractional
+    parts are tried first, so the result stays as close to proportional as possible
+    and every cell is either the floor or the ceiling of its ideal value.
+
+    Args:
+        row_totals: Required total of each row (e.g. questions per type)
+        column_totals: Required total of each column (e.g. questions per difficulty)
+
+    Returns:
+        Dict[str, Dict[str, int]]: Allocation matrix keyed by row then column
+
+    Raises:
+        ValueError: If the two marginals do not have the same total
+    """
+    total = sum(row_totals.values())
+    if total != sum(column_totals.values()):
+        raise ValueError(
+            f"Row total ({total}) does not match column total ({sum(column_totals.values())})"
+        )
+
+    rows = list(row_totals)
+    columns = list(column_totals)
+    matrix = {row: {column: 0 for column in columns} for row in rows}
+    if total == 0:
+        return matrix
+
+    fractions = {}
+    for row in rows:
+        for column in columns:
+            ideal = row_totals[row] * column_totals[column] / total
+            matrix[row][column] = floor(ideal)
+            fractions[(row, column)] = ideal - floor(ideal)
+
+    row_deficit = {row: row_totals[row] - sum(matrix[row].values()) for row in rows}
+    column_deficit = {
+        column: column_totals[column] - sum(matrix[row][column] for row in rows)
+        for column in columns
+    }
+
+    # Candidate cells per row, largest fractional part first
+    candidates: Dict[str, List[str]] = {
+        row: sorted(
+            (column for column in columns if fractions[(row, column)] > 1e-9),
+            key=lambda column: -fractions[(row, column)]
+        )
+        for row in rows
+    }
+    # Unit of leftover flow placed in (row, column)
+    bumped = {(row, column): False for row in rows for column in columns}
+
+    def augment(row: str, visited: set) -> bool:
+        """Find an alternating path from row to a column that still has a deficit."""
+        for column in candidates[row]:
+            if bumped[(row, column)] or column in visited:
+                continue
+            visited.add(column)
+            if column_deficit[column] > 0:
+                column_deficit[column] -= 1
+                bumped[(row, column)] = True
+                return True
+            # Column is full: try to move one of its units to another column
+            for other_row in rows:
+                if bumped[(other_row, column)] and augment(other_row, visited):
+                    bumped[(other_row, column)] = False
+                    bumped[(row, column)] = True
+                    return True
+        return False
+
+    for row in sorted(rows, key=lambda r: -row_deficit[r]):
+        while row_deficit[row] > 0:
+            if not augment(row, set()):
+                raise ValueError(f"Could not place remaining allocation for '{row}'")
+            row_deficit[row] -= 1
+
+    for (row, column), is_bumped in bumped.items():
+        if is_bumped:
+            matrix[row][column] += 1
+
+    return matrix
@@ -19,6 +19,13 @@ class ValidationError(BaseServiceError):
         self.status_code = 400
         self.error_code = "VALIDATION_ERROR"
 
+class PayloadTooLargeError(ValidationError):
+    """Exception raised when an upload exceeds a size limit."""
+    def __init__(self, message: str, details: Optional[List[str]] = None):
+        super().__init__(message=message, details=details)
+        self.status_code = 413
+        self.error_code = "PAYLOAD_TOO_LARGE"
+
 class LLMServiceError(BaseServiceError):
     """Exception raised for errors in LLM service."""
     def __init__(self, message: str, details: Optional[List[str]] = None):
@@ -0,0 +1,121 @@
+# src/utils/flight_recorder.py
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Set
+from config.settings import settings
+from utils.logger import logger
+
+
+class FlightRecorder:
+    """
+    Ring buffer of the last finished requests and jobs.
+
+    It is fed by the tracer as an exporter, so every traced HTTP request and
+    background job is recorded: its stage timings, a summary of its LLM calls
+    and its payload sizes. The ring only holds summaries; traces slower than
+    SLOW_REQUEST_THRESHOLD_MS are also appended in full (with all spans) to the
+    slow-request log, a JSON-lines file rotated once it reaches
+    SLOW_REQUEST_LOG_MAX_MB. Those writes happen in a worker thread when called
+    from the event loop.
+    """
+    def __init__(self, size: int, slow_threshold_ms: float, slow_log_path: Path, slow_log_max_bytes: int):
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self.slow_threshold_ms = slow_threshold_ms
+        self.slow_log_path = Path(slow_log_path)
+        self.slow_log_max_bytes = slow_log_max_bytes
+        self._lock = threading.Lock()
+        self._pending: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _llm_summary(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Sum the LLM call spans of a trace per task and keep the slowest calls."""
+        calls = [span for span in spans if span["name"].startswith("llm.")]
+        by_task: Dict[str, Dict[str, Any]] = {}
+        for span in calls:
+            attributes = span["attributes"]
+            task = by_task.setdefault(span["name"][len("llm."):], {
+                "calls": 0, "errors": 0, "queue_wait_ms": 0.0, "inference_ms": 0.0,
+                "load_ms": 0.0, "prompt_tokens": 0, "generated_tokens": 0
+            })
+            task["calls"] += 1
+            task["errors"] += span["status"] != "ok"
+            for field in ("queue_wait_ms", "inference_ms", "load_ms", "prompt_tokens", "generated_tokens"):
+                task[field] += attributes.get(field, 0)
+        for task in by_task.values():
+            for field in ("queue_wait_ms", "inference_ms", "load_ms"):
+                task[field] = round(task[field], 2)
+
+        slowest = sorted(calls, key=lambda span: span["duration_ms"] or 0, reverse=True)[:5]
+        return {
+            "calls": len(calls),
+            "by_task": by_task,
+            "slowest": [
+                {"task": span["name"][len("llm."):], "duration_ms": span["duration_ms"], **span["attributes"]}
+                for span in slowest
+            ]
+        }
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        duration_ms = trace["duration_ms"] or 0
+        entry = {
+            "trace_id": trace["trace_id"],
+            "name": trace["name"],
+            "timestamp": trace["timestamp"],
+            "duration_ms": duration_ms,
+            "status": trace["status"],
+            "slow": duration_ms >= self.slow_threshold_ms,
+            "attributes": trace["attributes"],
+            "stages": trace["stages"],
+            "llm": self._llm_summary(trace["spans"]),
+            "dropped_spans": trace["dropped_spans"]
+        }
+        self._entries.append(entry)
+
+        if entry["slow"]:
+            logger.warning("Slow request recorded", {
+                "trace_id": entry["trace_id"],
+                "name": entry["name"],
+                "duration_ms": duration_ms,
+                "threshold_ms": self.slow_threshold_ms
+            })
+            line = json.dumps(dict(entry, spans=trace["spans"]), default=str) + "\n"
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._write_slow(line)
+                return
+            task = loop.create_task(asyncio.to_thread(self._write_slow, line))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    def _write_slow(self, line: str) -> None:
+        """Append a line to the slow-request log, rotating it first if it is full."""
+        try:
+            with self._lock:
+                self.slow_log_path.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    if self.slow_log_path.stat().st_size >= self.slow_log_max_bytes:
+                        os.replace(self.slow_log_path, self.slow_log_path.with_suffix(self.slow_log_path.suffix + ".1"))
+                except FileNotFoundError:
+                    pass
+                with open(self.slow_log_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            logger.error("Failed to write slow-request log", {"path": str(self.slow_log_path), "error": str(e)})
+
+    def dump(self, limit: int, slow_only: bool = False) -> List[Dict[str, Any]]:
+        """Get the recorded entries, newest first."""
+        entries = [entry for entry in reversed(self._entries) if entry["slow"] or not slow_only]
+        return entries[:limit]
+
+
+flight_recorder = FlightRecorder(
+    size=settings.FLIGHT_RECORDER_SIZE,
+    slow_threshold_ms=settings.SLOW_REQUEST_THRESHOLD_MS,
+    slow_log_path=settings.SLOW_REQUEST_LOG_FILE,
+    slow_log_max_bytes=settings.SLOW_REQUEST_LOG_MAX_MB * 1024 * 1024
+)
@@ -3,8 +3,9 @@ import os
 from pathlib import Path
 import base64
 from typing import Any, Dict, List, Optional
-from models.question_models import QuestionRequest, QuestionType
+from models.question_models import QuestionRequest
 from utils.logger import logger
+from utils.prompts import QUESTION_GENERATION_PROMPT
 
 def encode_image_to_base64(image_path: str) -> Optional[str]:
     """
@@ -89,99 +90,21 @@ def format_prompt(context: str, question_type: str, count: int, request: Questio
         difficulty_level: Difficulty level for questions
         
     Returns:
-        str: Formatted prompt for the LLM
+        str: Formatted prompt for the LLM, rendered from the registered question_generation template
     """
-    prompt = f"""Generate EXACTLY {count} NEW {question_type} questions at {difficulty_level} level based on the following context:
-
-    {context}
-
-    Chapter: {request.chapter}
-    {f'Topic: {request.topic}' if request.topic else 'Scope: Entire chapter'}
-
-    CRITICAL REQUIREMENTS:
-    1. Generate EXACTLY {count} questions - no more, no less
-    2. Each question must include all required fields
-    3. All content must be in {request.language}
-    4. All questions must be at {difficulty_level} difficulty level
-    5. Questions must be based on the provided context
-    """
-
-    if question_type == QuestionType.MCQ.value:
-        prompt += """
-        Requirements for Multiple Choice Questions:
-        - Include clear and unambiguous question text
-        - EXACTLY 4 options per question
-        - Only ONE correct answer
-        - All options must be plausible and related to the topic
-        Format:
-        {
-            "type": "Multiple Choice",
-            "difficulty": "Easy/Medium/Hard",
-            "question": "Question text",
-            "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
-            "correct_answer": "Correct option"
-        }
-        """
-    elif question_type == QuestionType.MSQ.value:
-        prompt += """
-        Requirements for Multiple Select Questions:
-        - Include clear question text indicating multiple selections
-        - EXACTLY 4 options per question
-        - EXACTLY 2 correct answers
-        - All options must be plausible and related to the topic
-        Format:
-        {
-            "type": "Multiple Select",
-            "difficulty": "Easy/Medium/Hard",
-            "question": "Question text",
-            "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
-            "correct_answers": ["Correct option 1", "Correct option 2"]
-        }
-        """
-    elif question_type == QuestionType.SDQ.value:
-        prompt += """
-        Requirements for Short Descriptive Questions:
-        - Questions should require 1-2 sentence answers
-        - Include 3-5 relevant keywords
-        - Answers should be concise and focused
-        Format:
-        {
-            "type": "Short Descriptive Answer",
-            "difficulty": "Easy/Medium/Hard",
-            "question": "Question text",
-            "answer": "1-2 sentence answer",
-            "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5"]
-        }
-        """
-    else:  # LDQ
-        prompt += """
-        Requirements for Long Descriptive Questions:
-        - Questions should require detailed explanations
-        - Include 5-7 relevant keywords
-        - Answers should be comprehensive paragraphs
-        Format:
-        {
-            "type": "Long Descriptive Answer",
-            "difficulty": "Easy/Medium/Hard",
-            "question": "Question text",
-            "answer": "Detailed paragraph answer",
-            "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5", "keyword6", "keyword7"]
-        }
-        """
-
-    prompt += """
-    FINAL CHECKLIST:
-    1. Verify EXACTLY the requested number of questions are generated
-    2. Each question has all required fields
-    3. Correct number of options/keywords as specified
-    4. No duplicate questions
-    5. All questions are at the specified difficulty level
-    6. All content in specified language
-    7. Questions should be challenging but fair for the given difficulty level
-
-    Return ONLY a JSON array of questions without prefixes or decorators.
-    """
-    return prompt
+    return QUESTION_GENERATION_PROMPT.render(
+        context=context.strip(),
+        count=count,
+        question_type=question_type,
+        difficulty_level=difficulty_level,
+        syllabus=request.syllabus,
+        standard=request.standard,
+        subject=request.subject,
+        chapter=request.chapter,
+        scope=f"Topic: {request.topic}" if request.topic else "Scope: Entire chapter",
+        language=request.language,
+        exclusions=""
+    )
 
 def format_question_response(questions: List[Dict[str, Any]], request: QuestionRequest) -> Dict[str, Any]:
     """
@@ -0,0 +1,147 @@
+# src/utils/keyword_rubric.py
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SUFFIXES = (
+    "ational", "ization", "fulness", "ousness", "iveness",
+    "ations", "ation", "ments", "ment", "ness", "ities", "ity",
+    "ingly", "ings", "ing", "edly", "ed", "ies", "es", "ly", "s"
+)
+
+
+def stem(word: str) -> str:
+    """
+    Light suffix-stripping stemmer; keeps at least three characters of the stem.
+
+    A trailing "e" is dropped after suffix removal, so "force", "forces" and
+    "forced" all stem to "forc"; a final "ss" is never stripped ("process").
+    """
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith("ss"):
+                break
+            word = word[:-len(suffix)]
+            if suffix == "ies":
+                word += "y"
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case, split into word tokens and stem them."""
+    return [stem(token) for token in _TOKEN.findall(text.lower())]
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True when a and b differ by at most one insertion, deletion or substitution."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = j = edits = 0
+    while i < len(a) and j < len(b):
+        if a[i] != b[j]:
+            edits += 1
+            if edits > 1:
+                return False
+            if len(a) == len(b):
+                i += 1
+        else:
+            i += 1
+        j += 1
+    return edits + (len(b) - j) <= 1
+
+
+class RubricMatch(NamedTuple):
+    score: float
+    matched: List[str]
+    missing: List[str]
+
+
+class KeywordRubric:
+    """
+    Precompiled keyword rubric for lexical scoring of an answer.
+
+    Keywords (single words or phrases) are stemmed and compiled into a token-level
+    Aho-Corasick automaton, so an answer is scanned once regardless of how many
+    keywords there are. Answer tokens that are not in the rubric vocabulary are
+    snapped to a vocabulary token within one edit, which tolerates common
+    misspellings.
+    """
+    FUZZY_MIN_LENGTH = 5
+
+    def __init__(self, keywords: Tuple[str, ...]):
+        self.keywords = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[int]] = [set()]
+        self.vocabulary: Set[str] = set()
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            tokens = tokenize(keyword)
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens:
+                self.vocabulary.add(token)
+                if token not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                    self._goto[state][token] = len(self._goto) - 1
+                state = self._goto[state][token]
+            self._output[state].add(keyword_id)
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+        self._fuzzy_vocabulary = [token for token in self.vocabulary if len(token) >= self.FUZZY_MIN_LENGTH]
+
+    def _canonical(self, token: str) -> str:
+        if token in self.vocabulary or len(token) < self.FUZZY_MIN_LENGTH:
+            return token
+        for candidate in self._fuzzy_vocabulary:
+            if _within_one_edit(token, candidate):
+                return candidate
+        return token
+
+    def score(self, answer: str) -> RubricMatch:
+        """Score an answer by the share of rubric keywords it contains (0-100)."""
+        found: Set[int] = set()
+        state = 0
+        for token in tokenize(answer):
+            token = self._canonical(token)
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            found |= self._output[state]
+
+        matched = [keyword for i, keyword in enumerate(self.keywords) if i in found]
+        missing = [keyword for i, keyword in enumerate(self.keywords) if i not in found]
+        score = round(100 * len(matched) / len(self.keywords), 2) if self.keywords else 0.0
+        return RubricMatch(score, matched, missing)
+
+
+@lru_cache(maxsize=1024)
+def _compile(keywords: Tuple[str, ...]) -> KeywordRubric:
+    return KeywordRubric(keywords)
+
+
+def get_rubric(keywords: List[str]) -> KeywordRubric:
+    """Get the compiled rubric for a keyword list, compiling it once per distinct list."""
+    return _compile(tuple(keywords))
@@ -1,28 +1,67 @@
 # src/utils/logger.py
+import atexit
+import fnmatch
 import logging
 import logging.handlers
 import json
+import queue
+import random
+import re
+import sys
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 import traceback
+from contextvars import ContextVar
 from functools import wraps
 import time
 from config.settings import settings
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Id of the HTTP request being served, set by RequestLoggingMiddleware
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# Path of the HTTP request (or ``job:<kind>``) being served, used by LogRateLimiter rules
+log_route_var: ContextVar[str] = ContextVar("log_route", default="")
+
+
+def dumps_json(data: Any) -> str:
+    """Serialize to compact JSON with orjson when installed, else the stdlib encoder."""
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, default=str, separators=(",", ":"))
+
 class CustomJSONFormatter(logging.Formatter):
     """
     Custom JSON formatter for structured logging.
+
+    Each record is serialized once and the result is cached on the record, so the
+    console, file and error handlers all reuse the same string. The timestamp is
+    the record's creation time rather than the time it was formatted, and the
+    request id is the one captured when the record was logged.
     """
+    CACHE_ATTRIBUTE = "_formatted_json"
+
     def format(self, record: logging.LogRecord) -> str:
+        cached = getattr(record, self.CACHE_ATTRIBUTE, None)
+        if cached is not None:
+            return cached
+
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
             "level": record.levelname,
             "module": record.module,
             "function": record.funcName,
             "line": record.lineno,
             "message": record.getMessage()
         }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            log_data["request_id"] = request_id
 
         # Add exception info if present
         if record.exc_info:
@@ -36,15 +75,214 @@ class CustomJSONFormatter(logging.Formatter):
         if hasattr(record, "extra_data"):
             log_data["extra"] = record.extra_data
 
-        return json.dumps(log_data)
+        formatted = dumps_json(log_data)
+        setattr(record, self.CACHE_ATTRIBUTE, formatted)
+        return formatted
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler with a bounded queue and an explicit overflow policy.
+
+    Records are only prepared on the calling thread; formatting and writing
+    happen on the QueueListener's thread. When the queue is full the record is
+    handled by ``overflow``:
+
+    - ``drop_new``: discard the incoming record
+    - ``drop_oldest``: discard the oldest queued record to make room
+    - ``block``: wait up to ``block_timeout`` seconds, then discard the record
+
+    ERROR and CRITICAL records always wait up to ``block_timeout`` before the
+    policy applies, so they are the last to be lost. Discarded records are
+    counted, and a warning with the count is queued as soon as there is room
+    again.
+    """
+    POLICIES = ("drop_new", "drop_oldest", "block")
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "drop_new", block_timeout: float = 0.05):
+        super().__init__(log_queue)
+        if overflow not in self.POLICIES:
+            raise ValueError(f"Unknown log queue overflow policy '{overflow}'")
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._reported = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now so the record no longer depends on caller-owned objects;
+        # the JSON formatting itself is left to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        if hasattr(record, "extra_data") and isinstance(record.extra_data, dict):
+            record.extra_data = dict(record.extra_data)
+        return record
+
+    def _put(self, record: logging.LogRecord) -> bool:
+        try:
+            if self.overflow == "block" or record.levelno >= logging.ERROR:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            pass
+
+        if self.overflow == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+                self.queue.put_nowait(record)
+                return True
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+        return False
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        with self._lock:
+            if not self._put(record) or self.dropped == self._reported:
+                return
+            dropped, self._reported = self.dropped - self._reported, self.dropped
+
+        summary = logging.LogRecord(
+            name="app.logging",
+            level=logging.WARNING,
+            pathname=__file__,
+            lineno=0,
+            msg=f"Dropped {dropped} log records because the log queue was full",
+            args=(),
+            exc_info=None
+        )
+        summary.extra_data = {"dropped": dropped, "total_dropped": self.dropped, "overflow": self.overflow}
+        try:
+            self.queue.put_nowait(summary)
+        except queue.Full:
+            pass
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() waits for room in a full queue instead of failing."""
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+class LogRateLimiter:
+    """
+    Rate limiting and sampling of log records per call site.
+
+    A call site is the source line that logs (or an explicit site name, such as
+    the decorated function for the logging decorators). Each record is matched
+    against LOG_RATE_LIMIT_RULES in order; the first rule whose ``route`` glob
+    matches the current route and whose ``level`` is at or above the record's
+    level applies:
+
+    - ``sample_rate``: share of records kept (default 1.0)
+    - ``per_second`` / ``burst``: token bucket per call site and rule; records
+      beyond it are suppressed (no limit when ``per_second`` is unset)
+
+    Records no rule matches are never limited. Suppressed records are counted
+    per site; the next record a site is allowed to log carries the count in
+    ``suppressed_since_last``, and counts of sites that stay quiet are reported
+    in a summary record at most every LOG_RATE_LIMIT_SUMMARY_INTERVAL seconds.
+    """
+    def __init__(self, rules: List[Dict[str, Any]], summary_interval: float):
+        self.rules = [
+            {
+                "route": rule.get("route", "*"),
+                "level": logging.getLevelName(str(rule.get("level", "INFO")).upper()),
+                "sample_rate": float(rule.get("sample_rate", 1.0)),
+                "per_second": float(rule["per_second"]) if rule.get("per_second") else None,
+                "burst": float(rule.get("burst") or max(rule.get("per_second") or 1, 1))
+            }
+            for rule in rules
+        ]
+        self.summary_interval = summary_interval
+        self.total_suppressed = 0
+        self._buckets: Dict[Tuple[int, str], List[float]] = {}
+        self._suppressed: Dict[str, List[Any]] = {}
+        self._last_summary = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _rule(self, route: str, level: int) -> Tuple[int, Optional[Dict[str, Any]]]:
+        for index, rule in enumerate(self.rules):
+            if level <= rule["level"] and fnmatch.fnmatchcase(route, rule["route"]):
+                return index, rule
+        return -1, None
+
+    def applies(self, level: int) -> bool:
+        """Check whether any rule could limit records at this level."""
+        return any(level <= rule["level"] for rule in self.rules)
+
+    def allow(self, site: str, level: int, message: str) -> Tuple[bool, int]:
+        """
+        Decide whether a record from a call site is emitted.
+
+        Returns:
+            Tuple of (allowed, records suppressed at this site since it last logged)
+        """
+        index, rule = self._rule(log_route_var.get(), level)
+        if rule is None:
+            return True, 0
+
+        with self._lock:
+            allowed = rule["sample_rate"] >= 1 or random.random() < rule["sample_rate"]
+            if allowed and rule["per_second"] is not None:
+                now = time.monotonic()
+                bucket = self._buckets.get((index, site))
+                if bucket is None:
+                    bucket = self._buckets[(index, site)] = [rule["burst"], now]
+                bucket[0] = min(rule["burst"], bucket[0] + (now - bucket[1]) * rule["per_second"])
+                bucket[1] = now
+                allowed = bucket[0] >= 1
+                if allowed:
+                    bucket[0] -= 1
+
+            if allowed:
+                suppressed = self._suppressed.pop(site, None)
+                return True, suppressed[0] if suppressed else 0
+
+            self.total_suppressed += 1
+            entry = self._suppressed.setdefault(site, [0, message])
+            entry[0] += 1
+            return False, 0
+
+    def take_summary(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Collect the suppressed counts not reported yet, once per summary interval."""
+        now = time.monotonic()
+        if not force and now - self._last_summary < self.summary_interval:
+            return None
+        with self._lock:
+            self._last_summary = now
+            if not self._suppressed:
+                return None
+            sites, self._suppressed = self._suppressed, {}
+        return {
+            "suppressed": sum(count for count, _ in sites.values()),
+            "total_suppressed": self.total_suppressed,
+            "sites": {
+                site: {"count": count, "last_message": message[:120]}
+                for site, (count, message) in sorted(sites.items(), key=lambda item: item[1][0], reverse=True)
+            }
+        }
+
 
 class Logger:
     """
     Custom logger class with enhanced functionality.
+
+    The root logger only gets a BoundedQueueHandler. The console and rotating
+    file handlers are served by a QueueListener on a background thread, so
+    formatting, writing and file rotation never run on the event loop.
     """
     def __init__(self):
+        self.listener = None
+        self._handlers = []
+        self._queue_handler = None
+        self.rate_limiter = LogRateLimiter(
+            settings.LOG_RATE_LIMIT_RULES,
+            settings.LOG_RATE_LIMIT_SUMMARY_INTERVAL
+        ) if settings.LOG_RATE_LIMIT_ENABLED and settings.LOG_RATE_LIMIT_RULES else None
         self._setup_logging()
         self.logger = logging.getLogger("app")
+        atexit.register(self.shutdown)
 
     def _setup_logging(self) -> None:
         """
@@ -56,12 +294,11 @@ class Logger:
 
         # Create root logger
         logger = logging.getLogger()
-        logger.setLevel(logging.INFO)
+        logger.setLevel(settings.LOG_LEVEL.upper())
 
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(CustomJSONFormatter())
-        logger.addHandler(console_handler)
 
         # File handler
         file_handler = logging.handlers.RotatingFileHandler(
@@ -71,7 +308,6 @@ class Logger:
             encoding='utf-8'
         )
         file_handler.setFormatter(CustomJSONFormatter())
-        logger.addHandler(file_handler)
 
         # Error file handler
         error_handler = logging.handlers.RotatingFileHandler(
@@ -82,14 +318,100 @@ class Logger:
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(CustomJSONFormatter())
-        logger.addHandler(error_handler)
 
-    def log_with_context(self, level: int, message: str, extra: Dict[str, Any] = None) -> None:
+        # Every handler runs on the listener thread behind a bounded queue
+        self._handlers = [console_handler, file_handler, error_handler]
+        self._queue_handler = BoundedQueueHandler(
+            queue.Queue(maxsize=settings.LOG_QUEUE_SIZE),
+            overflow=settings.LOG_QUEUE_OVERFLOW,
+            block_timeout=settings.LOG_QUEUE_BLOCK_TIMEOUT
+        )
+        logger.addHandler(self._queue_handler)
+        self.listener = FlushingQueueListener(
+            self._queue_handler.queue,
+            *self._handlers,
+            respect_handler_level=True
+        )
+        self.listener.start()
+
+    def shutdown(self) -> None:
+        """
+        Flush queued records and stop the listener thread.
+
+        Records logged afterwards are written synchronously by the handlers.
+        """
+        if self.listener is None:
+            return
+        self._emit_suppressed_summary(force=True)
+        self.listener.stop()
+        self.listener = None
+
+        root = logging.getLogger()
+        root.removeHandler(self._queue_handler)
+        for handler in self._handlers:
+            root.addHandler(handler)
+            handler.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the log queue depth and how many records were dropped."""
+        return {
+            "queue_depth": self._queue_handler.queue.qsize(),
+            "queue_size": settings.LOG_QUEUE_SIZE,
+            "overflow": self._queue_handler.overflow,
+            "dropped": self._queue_handler.dropped,
+            "suppressed": self.rate_limiter.total_suppressed if self.rate_limiter else 0
+        }
+
+    def is_enabled_for(self, level: int) -> bool:
+        """Check whether records at this level would be emitted."""
+        return self.logger.isEnabledFor(level)
+
+    def _emit_suppressed_summary(self, force: bool = False) -> None:
+        summary = self.rate_limiter.take_summary(force) if self.rate_limiter else None
+        if summary is None:
+            return
+        record = logging.LogRecord(
+            name="app.logging",
+            level=logging.INFO,
+            pathname=__file__,
+            lineno=0,
+            msg=f"Suppressed {summary['suppressed']} log records by rate limiting",
+            args=(),
+            exc_info=None
+        )
+        record.extra_data = summary
+        self.logger.handle(record)
+
+    def log_with_context(
+        self,
+        level: int,
+        message: str,
+        extra: Dict[str, Any] = None,
+        site: Optional[str] = None,
+        depth: int = 1
+    ) -> None:
         """
         Logs a message with additional context.
+
+        Records below the configured level are skipped before any work is done,
+        and the rest pass through the rate limiter, keyed by ``site`` or else by
+        the calling source line (``depth`` frames up).
         """
+        if not self.logger.isEnabledFor(level):
+            return
         if extra is None:
             extra = {}
+
+        if self.rate_limiter is not None and self.rate_limiter.applies(level):
+            if site is None:
+                frame = sys._getframe(depth)
+                site = f"{Path(frame.f_code.co_filename).stem}:{frame.f_lineno}"
+            allowed, suppressed = self.rate_limiter.allow(site, level, message)
+            self._emit_suppressed_summary()
+            if not allowed:
+                return
+            if suppressed:
+                extra = {**extra, "suppressed_since_last": suppressed}
         
         record = logging.LogRecord(
             name="app",
@@ -101,54 +423,129 @@ class Logger:
             exc_info=None
         )
         record.extra_data = extra
+        record.request_id = request_id_var.get()
         
         self.logger.handle(record)
 
     def info(self, message: str, extra: Dict[str, Any] = None) -> None:
         """Log info message with context."""
-        self.log_with_context(logging.INFO, message, extra)
+        self.log_with_context(logging.INFO, message, extra, depth=2)
 
     def error(self, message: str, extra: Dict[str, Any] = None) -> None:
         """Log error message with context."""
-        self.log_with_context(logging.ERROR, message, extra)
+        self.log_with_context(logging.ERROR, message, extra, depth=2)
 
     def warning(self, message: str, extra: Dict[str, Any] = None) -> None:
         """Log warning message with context."""
-        self.log_with_context(logging.WARNING, message, extra)
+        self.log_with_context(logging.WARNING, message, extra, depth=2)
 
     def debug(self, message: str, extra: Dict[str, Any] = None) -> None:
         """Log debug message with context."""
-        self.log_with_context(logging.DEBUG, message, extra)
+        self.log_with_context(logging.DEBUG, message, extra, depth=2)
 
 # Create logger instance
 logger = Logger()
 
+_BASE64 = re.compile(r"^[A-Za-z0-9+/]+={0,2}$")
+_REDACT_KEYS = {key.lower() for key in settings.LOG_REDACT_KEYS}
+
+def summarize_value(value: Any, depth: int = 0) -> Any:
+    """
+    Get a bounded, log-safe view of a value.
+
+    Long strings are truncated and base64 payloads replaced by their length,
+    bytes are reduced to their length, collections are capped at
+    LOG_ARG_MAX_ITEMS items, keys listed in LOG_REDACT_KEYS are masked and
+    nesting is cut off after two levels.
+    """
+    max_length = settings.LOG_ARG_MAX_LENGTH
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) <= max_length:
+            return value
+        if _BASE64.match(value[:256]):
+            return f"<base64 len={len(value)}>"
+        return f"{value[:max_length]}...(+{len(value) - max_length} chars)"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    if depth >= 2:
+        return f"<{type(value).__name__}>"
+    if hasattr(value, "model_dump"):
+        value = {"__type__": type(value).__name__, **value.model_dump()}
+    if isinstance(value, dict):
+        items = list(value.items())
+        summary = {
+            str(key): "***" if str(key).lower() in _REDACT_KEYS else summarize_value(item, depth + 1)
+            for key, item in items[:settings.LOG_ARG_MAX_ITEMS]
+        }
+        if len(items) > settings.LOG_ARG_MAX_ITEMS:
+            summary["..."] = f"+{len(items) - settings.LOG_ARG_MAX_ITEMS} keys"
+        return summary
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value)
+        summary = [summarize_value(item, depth + 1) for item in items[:settings.LOG_ARG_MAX_ITEMS]]
+        if len(items) > settings.LOG_ARG_MAX_ITEMS:
+            summary.append(f"...(+{len(items) - settings.LOG_ARG_MAX_ITEMS} items)")
+        return summary
+    # Services and other objects (including ``self``) are named, not rendered
+    return f"<{type(value).__name__}>"
+
+def _call_arguments(args: tuple, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Summarize call arguments, only when DEBUG logging is enabled."""
+    if not logger.is_enabled_for(logging.DEBUG):
+        return None
+    return {
+        "args": [summarize_value(arg) for arg in args],
+        "kwargs": {
+            key: "***" if key.lower() in _REDACT_KEYS else summarize_value(value)
+            for key, value in kwargs.items()
+        }
+    }
+
+def _sampled() -> bool:
+    """Decide whether a successful call is logged (failures always are)."""
+    rate = settings.LOG_CALL_SAMPLE_RATE
+    return rate >= 1 or random.random() < rate
+
 # Decorators for logging
 def log_function_call(func):
     """
     Decorator to log function calls with timing.
+
+    Call and completion lines are sampled at LOG_CALL_SAMPLE_RATE and arguments
+    are only rendered (summarized) at DEBUG level; failures are always logged.
+    Each decorated function is its own call site for LOG_RATE_LIMIT_RULES.
     """
     @wraps(func)
     def wrapper(*args, **kwargs):
         start_time = time.time()
         func_name = func.__name__
-        
-        logger.info(
-            f"Calling function: {func_name}",
-            {"arguments": {"args": str(args), "kwargs": str(kwargs)}}
-        )
+        sampled = _sampled()
+
+        if sampled:
+            arguments = _call_arguments(args, kwargs)
+            logger.log_with_context(
+                logging.INFO,
+                f"Calling function: {func_name}",
+                {"arguments": arguments} if arguments is not None else {},
+                site=f"call:{func.__qualname__}"
+            )
         
         try:
             result = func(*args, **kwargs)
             execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
             
-            logger.info(
-                f"Function {func_name} completed",
-                {
-                    "execution_time_ms": execution_time,
-                    "success": True
-                }
-            )
+            if sampled:
+                logger.log_with_context(
+                    logging.INFO,
+                    f"Function {func_name} completed",
+                    {
+                        "execution_time_ms": execution_time,
+                        "success": True
+                    },
+                    site=f"completed:{func.__qualname__}"
+                )
             return result
             
         except Exception as e:
@@ -168,28 +565,38 @@ def log_function_call(func):
 def log_async_function_call(func):
     """
     Decorator to log async function calls with timing.
+
+    Sampling and argument rendering follow the same rules as log_function_call.
     """
     @wraps(func)
     async def wrapper(*args, **kwargs):
         start_time = time.time()
         func_name = func.__name__
-        
-        logger.info(
-            f"Calling async function: {func_name}",
-            {"arguments": {"args": str(args), "kwargs": str(kwargs)}}
-        )
+        sampled = _sampled()
+
+        if sampled:
+            arguments = _call_arguments(args, kwargs)
+            logger.log_with_context(
+                logging.INFO,
+                f"Calling async function: {func_name}",
+                {"arguments": arguments} if arguments is not None else {},
+                site=f"call:{func.__qualname__}"
+            )
         
         try:
             result = await func(*args, **kwargs)
             execution_time = (time.time() - start_time) * 1000
             
-            logger.info(
-                f"Async function {func_name} completed",
-                {
-                    "execution_time_ms": execution_time,
-                    "success": True
-                }
-            )
+            if sampled:
+                logger.log_with_context(
+                    logging.INFO,
+                    f"Async function {func_name} completed",
+                    {
+                        "execution_time_ms": execution_time,
+                        "success": True
+                    },
+                    site=f"completed:{func.__qualname__}"
+                )
             return result
             
         except Exception as e:
@@ -0,0 +1,255 @@
+# src/utils/metrics.py
+import asyncio
+import json
+import os
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from config.settings import settings
+from utils.logger import logger
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _render_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class MetricsRegistry:
+    """
+    Per-process metrics with Prometheus text rendering.
+
+    Counters and histograms are plain dicts updated from the event loop thread,
+    so recording a value takes no locks; snapshots are therefore also taken on
+    the loop thread, and only the file I/O is handed to a worker thread. Gauges
+    are read from callbacks at snapshot time. To cover several uvicorn
+    workers, each process writes its snapshot to ``METRICS_DIR/<pid>.json``
+    every METRICS_SNAPSHOT_INTERVAL seconds (and on scrape); a scrape merges
+    the snapshots of all live workers, summing counters, histograms and gauges.
+    """
+    def __init__(self, snapshot_dir: Path, buckets: List[float]):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.buckets = sorted(buckets)
+        self.help: Dict[str, Tuple[str, str]] = {}
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, List[float]]] = {}
+        self._gauges: Dict[str, Callable[[], Dict[Labels, float]]] = {}
+        self._derived: Dict[str, Callable[[Dict[str, Dict[str, Dict[Labels, object]]]], Dict[Labels, float]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def counter(self, name: str, description: str) -> None:
+        self.help[name] = ("counter", description)
+        self.counters.setdefault(name, {})
+
+    def histogram(self, name: str, description: str) -> None:
+        self.help[name] = ("histogram", description)
+        self.histograms.setdefault(name, {})
+
+    def gauge(self, name: str, description: str, collect: Callable[[], Dict[Labels, float]]) -> None:
+        """Register a gauge whose values are read from ``collect`` at snapshot time."""
+        self.help[name] = ("gauge", description)
+        self._gauges[name] = collect
+
+    def derived(
+        self,
+        name: str,
+        description: str,
+        compute: Callable[[Dict[str, Dict[str, Dict[Labels, object]]]], Dict[Labels, float]]
+    ) -> None:
+        """Register a gauge computed from the merged metrics of all workers at scrape time."""
+        self.help[name] = ("gauge", description)
+        self._derived[name] = compute
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        series = self.counters[name]
+        key = _labels(labels)
+        series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        series = self.histograms[name]
+        key = _labels(labels)
+        # One slot per bucket plus +Inf, then sum and count
+        state = series.get(key)
+        if state is None:
+            state = series[key] = [0.0] * (len(self.buckets) + 3)
+        state[bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, list]]:
+        """
+        Get a copy of this process's metrics as JSON-serializable data.
+
+        Must run on the event loop thread, which is the only one mutating the
+        series dicts.
+        """
+        gauges = {}
+        for name, collect in self._gauges.items():
+            try:
+                gauges[name] = collect()
+            except Exception as e:
+                logger.error("Metrics gauge collection failed", {"gauge": name, "error": str(e)})
+        return {
+            kind: {
+                name: [[list(map(list, key)), list(value) if isinstance(value, list) else value] for key, value in series.items()]
+                for name, series in data.items()
+            }
+            for kind, data in (("counters", self.counters), ("histograms", self.histograms), ("gauges", gauges))
+        }
+
+    def write_snapshot(self, snapshot: Optional[Dict[str, Dict[str, list]]] = None) -> None:
+        """Atomically write this process's snapshot file, taking a snapshot unless one is given."""
+        snapshot = snapshot if snapshot is not None else self.snapshot()
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        path = self.snapshot_dir / f"{os.getpid()}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(snapshot))
+        os.replace(tmp_path, path)
+
+    def _read_snapshots(self) -> List[Dict[str, Dict[str, list]]]:
+        snapshots = []
+        for path in self.snapshot_dir.glob("*.json"):
+            pid = int(path.stem) if path.stem.isdigit() else None
+            if pid is not None and pid != os.getpid():
+                try:
+                    os.kill(pid, 0)
+                except ProcessLookupError:
+                    # Worker is gone; its counters reset like any restarted process
+                    path.unlink(missing_ok=True)
+                    continue
+                except PermissionError:
+                    pass
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, json.JSONDecodeError):
+                continue
+        return snapshots
+
+    def collect(self, snapshot: Optional[Dict[str, Dict[str, list]]] = None) -> Dict[str, Dict[str, Dict[Labels, object]]]:
+        """Merge the snapshots of every live worker, writing this worker's first."""
+        self.write_snapshot(snapshot)
+        merged: Dict[str, Dict[str, Dict[Labels, object]]] = {"counters": {}, "histograms": {}, "gauges": {}}
+        for snapshot in self._read_snapshots():
+            for kind, data in snapshot.items():
+                for name, series in data.items():
+                    target = merged[kind].setdefault(name, {})
+                    for key, value in series:
+                        key = tuple(map(tuple, key))
+                        if kind == "histograms":
+                            current = target.get(key)
+                            target[key] = [a + b for a, b in zip(current, value)] if current else list(value)
+                        else:
+                            target[key] = target.get(key, 0.0) + value
+        return merged
+
+    def render(
+        self,
+        merged: Optional[Dict[str, Dict[str, Dict[Labels, object]]]] = None,
+        snapshot: Optional[Dict[str, Dict[str, list]]] = None
+    ) -> str:
+        """
+        Render metrics in the Prometheus text exposition format.
+
+        When run off the event loop thread, pass a ``snapshot`` taken on it.
+        """
+        merged = merged or self.collect(snapshot)
+        lines = []
+        for name, (kind, description) in self.help.items():
+            if name in self._derived:
+                series = self._derived[name](merged)
+            else:
+                series = merged[kind + "s"].get(name, {})
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(series.items()):
+                if kind != "histogram":
+                    lines.append(f"{name}{_render_labels(labels)} {value}")
+                    continue
+                cumulative = 0.0
+                for bound, count in zip(self.buckets + [float("inf")], value[:-2]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_render_labels(labels, ('le', le))} {cumulative}")
+                lines.append(f"{name}_sum{_render_labels(labels)} {value[-2]}")
+                lines.append(f"{name}_count{_render_labels(labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+    async def _snapshot_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.METRICS_SNAPSHOT_INTERVAL)
+            try:
+                await asyncio.to_thread(self.write_snapshot, self.snapshot())
+            except Exception as e:
+                # Keep snapshotting; a dead loop would leave /metrics silently stale
+                logger.error("Failed to write metrics snapshot", {"error": str(e)})
+
+    def start(self) -> None:
+        """Start writing periodic snapshots for this worker."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._snapshot_loop())
+
+    async def stop(self) -> None:
+        """Stop the snapshot task and remove this worker's snapshot file."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        (self.snapshot_dir / f"{os.getpid()}.json").unlink(missing_ok=True)
+
+
+metrics = MetricsRegistry(settings.METRICS_DIR, settings.METRICS_LATENCY_BUCKETS)
+
+metrics.histogram("http_request_duration_seconds", "HTTP request latency by route")
+metrics.counter("http_requests_total", "HTTP requests by route and status")
+metrics.histogram("llm_request_duration_seconds", "LLM call latency (excluding queue wait) by task and model")
+metrics.histogram("llm_queue_wait_seconds", "Time LLM calls waited for a scheduler slot by task")
+metrics.counter("llm_requests_total", "LLM calls by task, model and outcome")
+metrics.counter("llm_prompt_tokens_total", "Prompt tokens evaluated by Ollama")
+metrics.counter("llm_generated_tokens_total", "Tokens generated by Ollama")
+metrics.counter("llm_generation_seconds_total", "Ollama-reported generation time")
+metrics.counter("llm_prompt_eval_seconds_total", "Ollama-reported prompt evaluation time")
+metrics.counter("llm_load_seconds_total", "Ollama-reported model load time")
+
+
+def _ratio(merged, numerator: str, denominator: str, kind: str = "counters") -> Dict[Labels, float]:
+    top = merged[kind].get(numerator, {})
+    bottom = merged[kind].get(denominator, {})
+    return {labels: round(top.get(labels, 0.0) / value, 4) for labels, value in bottom.items() if value}
+
+
+metrics.derived(
+    "llm_tokens_per_second",
+    "Ollama-reported generation throughput by model since worker start",
+    lambda merged: _ratio(merged, "llm_generated_tokens_total", "llm_generation_seconds_total")
+)
+metrics.derived(
+    "llm_prompt_tokens_per_second",
+    "Ollama-reported prompt evaluation throughput by model since worker start",
+    lambda merged: _ratio(merged, "llm_prompt_tokens_total", "llm_prompt_eval_seconds_total")
+)
+metrics.gauge(
+    "log_queue_depth",
+    "Log records waiting for the log listener thread",
+    lambda: {(): float(logger.stats()["queue_depth"])}
+)
+metrics.gauge(
+    "log_records_suppressed",
+    "Log records suppressed by per-site rate limiting and sampling",
+    lambda: {(): float(logger.stats()["suppressed"])}
+)
+metrics.gauge(
+    "log_records_dropped",
+    "Log records dropped because the log queue was full",
+    lambda: {(): float(logger.stats()["dropped"])}
+)
@@ -0,0 +1,93 @@
+# src/utils/profiling.py
+import cProfile
+import io
+import json
+import pstats
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from config.settings import settings
+from utils.logger import logger
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class RequestProfiler:
+    """
+    Runs single requests under cProfile and keeps the results on disk.
+
+    Each profile is written to ``PROFILE_DIR/<profile_id>.prof`` (loadable with
+    ``pstats``, snakeviz or similar) next to a small JSON file describing the
+    request. Only the newest PROFILE_MAX_FILES profiles are kept.
+
+    cProfile follows the event loop thread, so it also records whatever other
+    requests run on the loop meanwhile, and misses work handed to threads
+    (``asyncio.to_thread``). Only one request per process is profiled at a time.
+    """
+    def __init__(self, directory: Path, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self.active = False
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Start profiling, or return None when another request is being profiled."""
+        if self.active:
+            return None
+        self.active = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop(self, profile: cProfile.Profile) -> None:
+        profile.disable()
+        self.active = False
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def save(self, profile_id: str, profile: cProfile.Profile, details: Dict[str, Any]) -> None:
+        """Write a finished profile and the details of its request."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(str(self.directory / f"{profile_id}.prof"))
+        details = {"profile_id": profile_id, "created_at": time.time(), **details}
+        (self.directory / f"{profile_id}.json").write_text(json.dumps(details, default=str))
+        self._prune()
+
+    def _prune(self) -> None:
+        profiles = sorted(self.directory.glob("*.prof"), key=lambda path: path.stat().st_mtime)
+        for path in profiles[:max(len(profiles) - self.max_files, 0)]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".json").unlink(missing_ok=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Get the details of every stored profile, newest first."""
+        profiles = []
+        for path in self.directory.glob("*.json"):
+            try:
+                profiles.append(json.loads(path.read_text()))
+            except (OSError, json.JSONDecodeError):
+                logger.warning("Unreadable profile details", {"path": str(path)})
+        return sorted(profiles, key=lambda details: details.get("created_at", 0), reverse=True)
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """Get the pstats file of a profile, or None if it does not exist."""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.prof"
+        return path if path.exists() else None
+
+    def summary(self, profile_id: str, sort: str = "cumulative", limit: int = 50) -> Optional[str]:
+        """Render the top functions of a profile as pstats text."""
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        output = io.StringIO()
+        stats = pstats.Stats(str(path), stream=output)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+request_profiler = RequestProfiler(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
@@ -0,0 +1,263 @@
+# src/utils/prompts.py
+import hashlib
+import textwrap
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class PromptTemplate:
+    """
+    Versioned prompt made of a byte-stable static prefix and a variable suffix.
+
+    The static parts are dedented and joined once at import time, so every call
+    sends exactly the same leading bytes. Ollama reuses its KV cache for a
+    matching prefix, so the shared instructions are only evaluated once per
+    loaded model instead of once per bucket or request.
+    """
+    def __init__(
+        self,
+        name: str,
+        version: str,
+        static: str,
+        variable: str,
+        system: Optional[str] = None
+    ):
+        self.name = name
+        self.version = version
+        self.system = textwrap.dedent(system).strip() if system else None
+        self.static = textwrap.dedent(static).strip() + "\n\n"
+        self.variable = textwrap.dedent(variable).strip()
+
+        digest = hashlib.sha256(
+            "\x00".join([self.system or "", self.static, self.variable]).encode("utf-8")
+        ).hexdigest()[:12]
+        self.cache_key = f"{name}:{version}:{digest}"
+
+    def render(self, **values: Any) -> str:
+        """Render the user prompt: static prefix followed by the filled variable part."""
+        return self.static + self.variable.format(**values).rstrip()
+
+    def split_at(self, field: str, **values: Any) -> Tuple[str, str]:
+        """
+        Render the prompt around one unfilled field.
+
+        Returns the text before and after ``field`` so that the part shared by many
+        calls (everything but that field) is rendered once; joining the two halves
+        around a value gives exactly ``render(field=value, **values)``.
+        """
+        marker = f"\x00{field}\x00"
+        head, tail = self.render(**values, **{field: marker}).split(marker, 1)
+        return head, tail
+
+    def messages(self, **values: Any) -> List[Dict[str, str]]:
+        """Render the chat messages, with the static system message first when present."""
+        messages = []
+        if self.system:
+            messages.append({"role": "system", "content": self.system})
+        messages.append({"role": "user", "content": self.render(**values)})
+        return messages
+
+
+PROMPT_REGISTRY: Dict[str, PromptTemplate] = {}
+
+
+def register_prompt(template: PromptTemplate) -> PromptTemplate:
+    """Add a template to the registry, keyed by name."""
+    PROMPT_REGISTRY[template.name] = template
+    return template
+
+
+def get_prompt(name: str) -> PromptTemplate:
+    """Get a registered template by name."""
+    try:
+        return PROMPT_REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"Prompt template '{name}' is not registered")
+
+
+QUESTION_GENERATION_PROMPT = register_prompt(PromptTemplate(
+    name="question_generation",
+    version="2",
+    system="""
+        You are an expert in creating educational assessment questions.
+        You always return questions in proper JSON format.
+    """,
+    static="""
+        You will generate assessment questions from the chapter context given below.
+
+        CRITICAL REQUIREMENTS:
+        1. Generate EXACTLY the requested number of questions - no more, no less
+        2. Each question must include all required fields
+        3. All content must be in the requested language
+        4. All questions must be at the requested difficulty level
+        5. Questions must be based on the provided context
+
+        QUESTION FORMATS:
+
+        Multiple Choice:
+        - Include clear and unambiguous question text
+        - EXACTLY 4 options per question
+        - Only ONE correct answer
+        - All options must be plausible and related to the topic
+        Format:
+        {
+            "type": "Multiple Choice",
+            "difficulty": "Easy/Medium/Hard",
+            "question": "Question text",
+            "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
+            "correct_answer": "Correct option"
+        }
+
+        Multiple Select:
+        - Include clear question text indicating multiple selections
+        - EXACTLY 4 options per question
+        - EXACTLY 2 correct answers
+        - All options must be plausible and related to the topic
+        Format:
+        {
+            "type": "Multiple Select",
+            "difficulty": "Easy/Medium/Hard",
+            "question": "Question text",
+            "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
+            "correct_answers": ["Correct option 1", "Correct option 2"]
+        }
+
+        Short Descriptive Answer:
+        - Questions should require 1-2 sentence answers
+        - Include 3-5 relevant keywords
+        - Answers should be concise and focused
+        Format:
+        {
+            "type": "Short Descriptive Answer",
+            "difficulty": "Easy/Medium/Hard",
+            "question": "Question text",
+            "answer": "1-2 sentence answer",
+            "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5"]
+        }
+
+        Long Descriptive Answer:
+        - Questions should require detailed explanations
+        - Include 5-7 relevant keywords
+        - Answers should be comprehensive paragraphs
+        Format:
+        {
+            "type": "Long Descriptive Answer",
+            "difficulty": "Easy/Medium/Hard",
+            "question": "Question text",
+            "answer": "Detailed paragraph answer",
+            "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5", "keyword6", "keyword7"]
+        }
+
+        FINAL CHECKLIST:
+        1. Verify EXACTLY the requested number of questions are generated
+        2. Each question has all required fields
+        3. Correct number of options/keywords as specified
+        4. No duplicate questions
+        5. All questions are at the specified difficulty level
+        6. All content in specified language
+        7. Questions should be challenging but fair for the given difficulty level
+
+        Return ONLY a JSON array of questions without prefixes or decorators.
+    """,
+    variable="""
+        Context:
+        {context}
+
+        TASK:
+        Generate EXACTLY {count} NEW {question_type} questions for {syllabus} {standard} {subject} at {difficulty_level} level.
+        Chapter: {chapter}
+        {scope}
+        Language: {language}
+        Use the "{question_type}" format above with "difficulty" set to "{difficulty_level}".
+        {exclusions}
+    """
+))
+
+_EVALUATION_INSTRUCTIONS = textwrap.dedent("""
+        You are an AI assistant tasked with comparing student answers with key answers and provide a precise evaluation score (0-100) indicating how well the actual answer
+        matches the expected answer semantically. Use the examples below as guidance.
+""").strip()
+
+_EVALUATION_EXAMPLES = textwrap.dedent("""
+        Example 1 (10% similarity):
+        Key answer: "The Big Bang Theory explains that the universe began as a singularity, which then rapidly expanded, leading to the formation of matter, galaxies, and eventually stars and planets."
+        Student answer: "The Earth is part of the Milky Way galaxy, which contains billions of stars and planets."
+        Result: 10% semantically similar.
+
+        Example 2 (30% similarity):
+        Key answer: "According to the Big Bang Theory, the universe expanded from an extremely hot and dense state approximately 13.8 billion years ago, giving rise to galaxies, stars, and planets."
+        Student answer: "Stars and planets formed from clouds of gas and dust, with gravity playing a key role in their creation and development over billions of years."
+        Result: 30% semantically similar.
+
+        Example 3 (50% similarity):
+        Key answer: "The Big Bang Theory explains the origin of the universe as a rapid expansion from a very hot, dense singularity that gave rise to galaxies, stars, and planets, forming the universe as we know it."
+        Student answer: "The universe began with a massive expansion from a singularity, and over time, galaxies, stars, and planets formed, shaping the cosmos."
+        Result: 50% semantically similar.
+
+        Example 4 (70% similarity):
+        Key answer: "The Big Bang Theory proposes that the universe began as a singular point that expanded rapidly, resulting in the cooling and formation of matter, which later formed stars and galaxies."
+        Student answer: "The Big Bang was a rapid expansion of a singular point, leading to the cooling of the universe and the creation of matter, stars, and galaxies."
+        Result: 70% semantically similar.
+
+        Example 5 (90% similarity):
+        Key answer: "The Big Bang Theory states that the universe began as an extremely hot and dense singularity that expanded, cooling over time and allowing matter to form stars, galaxies, and the large-scale structure we see today."
+        Student answer: "According to the Big Bang Theory, the universe started from a very hot, dense singularity, expanding and cooling over time, leading to the formation of stars, galaxies, and the universe's structure."
+        Result: 90% semantically similar.
+""").strip()
+
+ANSWER_EVALUATION_PROMPT = register_prompt(PromptTemplate(
+    name="answer_evaluation",
+    version="1",
+    static=_EVALUATION_INSTRUCTIONS + "\n\n" + _EVALUATION_EXAMPLES + """
+
+Return the result in the following JSON format without prefixing with the word 'json':
+{"reasoning": "...", "score": ...}""",
+    variable="""
+        Now, evaluate the following:
+        Key answer: "{expected_answer}"
+        Student answer: "{student_answer}"
+
+        What is the percentage of semantic similarity between the key answer and the student answer? Please provide reasoning and the percentage similarity score.
+    """
+))
+
+BATCH_EVALUATION_PROMPT = register_prompt(PromptTemplate(
+    name="answer_evaluation_batch",
+    version="1",
+    static=_EVALUATION_INSTRUCTIONS + "\n\n" + _EVALUATION_EXAMPLES + """
+
+You will be given several numbered pairs. Evaluate every pair independently, exactly as you would evaluate it on its own.
+
+Return ONLY a JSON array with one object per pair, in the same order, without prefixing with the word 'json':
+[{"pair": 1, "reasoning": "...", "score": ...}, {"pair": 2, "reasoning": "...", "score": ...}]""",
+    variable="""
+        Now, evaluate the following {count} pairs:
+
+        {pairs}
+
+        For each pair, what is the percentage of semantic similarity between the key answer and the student answer? Provide reasoning and the percentage similarity score for every pair.
+    """
+))
+
+BATCH_EVALUATION_PAIR = 'Pair {number}:\nKey answer: "{expected_answer}"\nStudent answer: "{student_answer}"'
+
+ANSWER_SHEET_EXTRACTION_PROMPT = register_prompt(PromptTemplate(
+    name="answer_sheet_extraction",
+    version="1",
+    static="""
+        This image is one page of a student's handwritten answer sheet.
+        Transcribe the student's answers exactly as written, without correcting spelling, grammar or facts.
+
+        RULES:
+        1. Answers are labelled with their question number (for example "1.", "Q1", "Ans 1")
+        2. An answer may continue from a previous page; transcribe what is on this page
+        3. Ignore crossed-out text, margins, headers and page numbers
+        4. Skip questions that are not answered on this page
+        5. Do not add, summarize or explain anything
+
+        Return ONLY a JSON object in the following format without prefixing with the word 'json':
+        {"answers": [{"question_number": 1, "answer": "..."}]}
+    """,
+    variable="""
+        Question numbers on this exam: {question_numbers}
+    """
+))
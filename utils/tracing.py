@@ -0,0 +1,278 @@
+# src/utils/tracing.py
+import asyncio
+import functools
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set
+from config.settings import settings
+from utils.logger import logger
+from utils.flight_recorder import flight_recorder
+
+
+class Span:
+    """One timed stage of a trace."""
+    __slots__ = ("name", "span_id", "parent_id", "started_at", "duration_ms", "attributes", "status")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.started_at = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set(self, **attributes: Any) -> None:
+        """Add attributes to the span."""
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        self.duration_ms = round((time.perf_counter() - self.started_at) * 1000, 3)
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((self.started_at - origin) * 1000, 3),
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class Trace:
+    """
+    The spans recorded for one request or job.
+
+    Spans are kept in completion order. At most TRACE_MAX_SPANS are kept, so a
+    bulk job with thousands of LLM calls cannot grow a trace without bound; the
+    rest are only counted.
+    """
+    def __init__(self, name: str, max_spans: int):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.timestamp = time.time()
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.root: Optional[Span] = None
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped_spans += 1
+
+    def stages(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize the finished spans per name: call count, total and slowest duration.
+
+        Concurrent spans overlap, so totals can add up to more than the wall time.
+        """
+        stages: Dict[str, Dict[str, Any]] = {}
+        for span in self.spans:
+            if span is self.root:
+                continue
+            stage = stages.setdefault(span.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+            stage["count"] += 1
+            stage["total_ms"] += span.duration_ms
+            stage["max_ms"] = max(stage["max_ms"], span.duration_ms)
+            stage["errors"] += span.status != "ok"
+        for stage in stages.values():
+            stage["total_ms"] = round(stage["total_ms"], 3)
+        return dict(sorted(stages.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Get the per-stage timing of the trace so far."""
+        return {
+            "trace_id": self.trace_id,
+            "elapsed_ms": round((time.perf_counter() - self.root.started_at) * 1000, 3) if self.root else None,
+            "stages": self.stages(),
+            "dropped_spans": self.dropped_spans
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        origin = self.root.started_at if self.root else 0.0
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "timestamp": self.timestamp,
+            "duration_ms": self.root.duration_ms if self.root else None,
+            "status": self.root.status if self.root else "ok",
+            "attributes": self.root.attributes if self.root else {},
+            "stages": self.stages(),
+            "spans": [span.to_dict(origin) for span in self.spans],
+            "dropped_spans": self.dropped_spans
+        }
+
+
+class InMemoryTraceExporter:
+    """Keeps the most recent finished traces in a ring buffer."""
+    def __init__(self, size: int):
+        self._traces: Deque[Dict[str, Any]] = deque(maxlen=size)
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        self._traces.append(trace)
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """Get the latest traces, newest first, without their spans and stages."""
+        return [
+            {key: value for key, value in trace.items() if key not in ("spans", "stages")}
+            for trace in list(self._traces)[::-1][:limit]
+        ]
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        return next((trace for trace in self._traces if trace["trace_id"] == trace_id), None)
+
+
+class JsonFileTraceExporter:
+    """
+    Appends each finished trace to a JSON-lines file.
+
+    Traces finish on the event loop, so the append runs in a worker thread;
+    without a running loop it is written directly.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._pending: Set[asyncio.Task] = set()
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        line = json.dumps(trace, default=str) + "\n"
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(line)
+            return
+        task = loop.create_task(asyncio.to_thread(self._write, line))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _write(self, line: str) -> None:
+        try:
+            with self._lock:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            logger.error("Failed to write trace file", {"path": str(self.path), "error": str(e)})
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Lightweight in-process tracer.
+
+    The active trace and span live in context variables, so they follow a request
+    through awaits, ``asyncio.gather``/``create_task`` and ``asyncio.to_thread``
+    without being passed around. Code outside a trace pays only a context
+    variable lookup per span.
+    """
+    def __init__(self, enabled: bool, max_spans: int, exporters: List[Any]):
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.exporters = exporters
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Start a new trace with a root span, exported when the block exits.
+
+        Inside an existing trace this only opens a child span.
+        """
+        if not self.enabled or _current_trace.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        trace = Trace(name, self.max_spans)
+        trace_token = _current_trace.set(trace)
+        try:
+            with self.span(name, **attributes) as root:
+                trace.root = root
+                yield root
+        finally:
+            _current_trace.reset(trace_token)
+            self._export(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Time a block as a child of the current span; a no-op outside a trace."""
+        trace = _current_trace.get()
+        if trace is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(name, parent.span_id if parent else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error_type"] = type(e).__name__
+            raise
+        finally:
+            span.finish()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Exited from another context (e.g. an async generator resumed elsewhere)
+                _current_span.set(parent)
+            trace.add(span)
+
+    def traced(self, name: str) -> Callable:
+        """Decorator that wraps each call of a sync or async function in a span."""
+        def decorator(func: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current_trace(self) -> Optional[Trace]:
+        return _current_trace.get()
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def breakdown(self) -> Optional[Dict[str, Any]]:
+        """Get the per-stage timing of the current trace so far, if one is active."""
+        trace = _current_trace.get()
+        return trace.breakdown() if trace else None
+
+    def _export(self, trace: Trace) -> None:
+        data = trace.to_dict()
+        for exporter in self.exporters:
+            try:
+                exporter.export(data)
+            except Exception as e:
+                logger.error("Trace export failed", {
+                    "exporter": type(exporter).__name__,
+                    "error": str(e)
+                })
+
+
+trace_buffer = InMemoryTraceExporter(settings.TRACE_BUFFER_SIZE)
+tracer = Tracer(
+    enabled=settings.TRACING_ENABLED,
+    max_spans=settings.TRACE_MAX_SPANS,
+    exporters=[trace_buffer, flight_recorder] + ([JsonFileTraceExporter(settings.TRACE_FILE)] if settings.TRACE_FILE_ENABLED else [])
+)
@@ -1,5 +1,6 @@
 # src/utils/validators.py
-from typing import List, Dict
+import secrets
+from typing import List, Dict, Optional
 from pathlib import Path
 from models.question_models import (
     QuestionRequest,
@@ -151,4 +152,10 @@ def _validate_descriptive(question: Dict, idx: int, errors: List[str], short: bo
     elif short and not (3 <= len(question['keywords']) <= 5):
         errors.append(f"Question {idx}: Short descriptive must have 3-5 keywords")
     elif not short and not (5 <= len(question['keywords']) <= 7):
-        errors.append(f"Question {idx}: Long descriptive must have 5-7 keywords")
\ No newline at end of file
+        errors.append(f"Question {idx}: Long descriptive must have 5-7 keywords")
+
+def validate_admin_token(token: Optional[str]) -> bool:
+    """Check a token against ADMIN_TOKEN; always False when no admin token is configured."""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return secrets.compare_digest(token.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8"))